@@ -0,0 +1,54 @@
+"""
+截图后端基准测试 - 报告每个可用后端的截图延迟和吞吐量
+
+用法:
+    python benchmarks/bench_capture.py [--samples 20] [--region 0,0,800,600] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# 确保src目录在Python路径中
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.utils.capture import benchmark_backends
+
+
+def parse_region(value):
+    """解析 left,top,right,bottom 格式的区域参数"""
+    parts = [int(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("区域格式应为 left,top,right,bottom")
+    return tuple(parts)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="截图后端基准测试")
+    parser.add_argument("--samples", type=int, default=20, help="每个后端的截图次数")
+    parser.add_argument("--region", type=parse_region, default=None, help="截取区域，默认全屏")
+    parser.add_argument("--no-fake", action="store_true", help="不测试内存假后端")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    results = benchmark_backends(samples=args.samples, bbox=args.region, include_fake=not args.no_fake)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'后端':<12}{'尺寸':>12}{'平均(ms)':>10}{'P50(ms)':>10}{'P95(ms)':>10}{'FPS':>8}{'MP/s':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:<12}  失败: {result['error']}")
+            continue
+        size = f"{result['width']}x{result['height']}"
+        print(f"{result['backend']:<12}{size:>12}{result['mean_ms']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['fps']:>8}{result['mpixels_per_s']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+基准测试公用工具 - 计时统计、合成记录库和合成截图
+
+所有数据都在内存或临时目录中生成，不读写应用的数据目录，也不需要图形界面。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import datetime
+import statistics
+
+# 确保src目录在Python路径中
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from PIL import Image, ImageDraw
+
+from src.config import APP_VERSION
+from src.utils.perf_trace import default_tracer
+
+# 只测量被测代码本身，关闭应用内的性能追踪
+default_tracer.enabled = False
+
+# 合成记录库的规模
+STORE_SIZES = (1000, 10000, 100000)
+# 合成截图的分辨率
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+    "5K": (5120, 2880),
+}
+
+TASK_WORDS = ["需求评审", "接口联调", "周报", "测试用例", "部署上线", "bug修复", "会议纪要", "代码审查",
+              "report", "design", "deploy", "review", "meeting", "refactor", "invoice", "support"]
+
+
+def measure(func, repeat=10, setup=None, warmup=1):
+    """
+    多次执行函数并统计耗时
+
+    Args:
+        func: 被测函数，接收 setup 的返回值（没有 setup 时不传参数）
+        repeat: 计时次数
+        setup: 每次执行前调用的准备函数，不计入耗时
+        warmup: 预热次数，不计入统计
+
+    Returns:
+        dict: 耗时统计（毫秒），包括 mean/p50/p95/min/max
+    """
+    def run_once():
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        if setup:
+            func(arg)
+        else:
+            func()
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        run_once()
+    return summarize([run_once() for _ in range(max(1, repeat))])
+
+
+def summarize(timings):
+    """
+    统计一组耗时
+
+    Args:
+        timings: 耗时列表（秒）
+
+    Returns:
+        dict: 耗时统计（毫秒），包括 mean/p50/p95/min/max
+    """
+    timings = sorted(timings)
+    return {
+        "samples": len(timings),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        "min_ms": round(timings[0] * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+    }
+
+
+def make_records(count, seed=0, image_dir="/tmp/liuhen_bench/screenshots"):
+    """
+    生成合成记录列表（字段与 DataManager 保存的记录一致）
+
+    Args:
+        count: 记录数
+        seed: 随机种子，相同种子生成相同数据
+        image_dir: 记录中图片路径所在目录（文件不会被创建）
+
+    Returns:
+        list: 记录字典列表，按ID升序
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2023, 1, 1, 9, 0, 0)
+    records = []
+    for record_id in range(1, count + 1):
+        # 平均每天约40条记录
+        when = start + datetime.timedelta(minutes=record_id * 36 + rng.randint(0, 30))
+        task = " ".join(rng.sample(TASK_WORDS, 2))
+        timestamp = when.isoformat()
+        records.append({
+            "id": record_id,
+            "task_name": task,
+            "image_path": f"{image_dir}/{when.strftime('%Y%m%d_%H%M%S')}_{task.replace(' ', '_')}.png",
+            "notes": rng.choice(["", "", "已完成", f"工单 #{rng.randint(1000, 9999)}", "需要跟进"]),
+            "timestamp": timestamp,
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        })
+    return records
+
+
+def write_store(path, count, seed=0):
+    """
+    生成合成记录库文件（与 records.json 格式相同）
+
+    Args:
+        path: 输出文件路径
+        count: 记录数
+        seed: 随机种子
+
+    Returns:
+        list: 写入的记录
+    """
+    records = make_records(count, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    return records
+
+
+def make_screenshot(width, height, seed=0):
+    """
+    生成近似真实桌面截图的合成图像：纯色背景、窗口、文字行和少量渐变色块
+
+    纯随机噪声的压缩特性与截图相差太远，这里用窗口和文字块模拟常见的办公界面。
+
+    Args:
+        width: 宽度
+        height: 高度
+        seed: 随机种子
+
+    Returns:
+        PIL.Image: RGB图像
+    """
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (236, 239, 244))
+    draw = ImageDraw.Draw(image)
+
+    # 任务栏
+    draw.rectangle([0, height - 40, width, height], fill=(32, 36, 44))
+
+    # 若干重叠窗口，每个窗口有标题栏和文字行
+    for _ in range(6):
+        w = rng.randint(width // 4, width // 2)
+        h = rng.randint(height // 4, height // 2)
+        x = rng.randint(0, width - w)
+        y = rng.randint(0, height - 40 - h)
+        draw.rectangle([x, y, x + w, y + h], fill=(255, 255, 255), outline=(180, 180, 180))
+        draw.rectangle([x, y, x + w, y + 28], fill=(rng.randint(40, 90), rng.randint(90, 140), 200))
+        for line_y in range(y + 40, y + h - 16, 18):
+            line_x = x + 12
+            while line_x < x + w - 40:
+                word = rng.randint(12, 70)
+                shade = rng.randint(30, 90)
+                draw.rectangle([line_x, line_y, min(line_x + word, x + w - 12), line_y + 9], fill=(shade, shade, shade))
+                line_x += word + rng.randint(5, 10)
+
+    # 图片类内容（渐变色块），压缩率比文字低
+    for _ in range(3):
+        w = rng.randint(width // 10, width // 5)
+        h = rng.randint(height // 10, height // 5)
+        x = rng.randint(0, width - w)
+        y = rng.randint(0, height - 40 - h)
+        gradient = Image.linear_gradient("L").resize((w, h))
+        tint = Image.merge("RGB", (gradient, gradient.rotate(90).resize((w, h)), Image.new("L", (w, h), rng.randint(0, 255))))
+        image.paste(tint, (x, y))
+
+    return image
+
+
+def environment_info():
+    """
+    收集运行环境信息，写入结果文件便于在不同版本之间比较
+
+    Returns:
+        dict: 版本和平台信息
+    """
+    import PIL
+    return {
+        "app_version": APP_VERSION,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def write_results(results, output):
+    """
+    输出基准测试结果JSON
+
+    Args:
+        results: 结果字典
+        output: 输出文件路径，为 "-" 时输出到标准输出
+    """
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if output == "-":
+        print(text)
+        return
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"结果已写入: {output}")
@@ -0,0 +1,195 @@
+"""
+并发压力测试 - 多个写线程和读线程同时操作同一个 DataManager，检查快照一致性并测量延迟
+
+写线程随机添加、更新、删除记录；读线程不断搜索和按ID查找，并检查读到的每个快照：
+ID 严格递增且不重复，压力测试写入的记录 task_name 与 notes 始终相同（更新会同时修改
+两个字段，读到不一致说明看到了写了一半的记录）。结束后重新加载记录文件，确认与内存
+中的记录一致、记录数等于 初始 + 添加 - 删除。
+
+用法:
+    python benchmarks/bench_concurrency.py [--records 2000] [--writers 4] [--readers 8] [--seconds 3] [--json]
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+from bench_common import summarize, write_store, environment_info, write_results
+
+from src.utils.data_manager import DataManager
+
+# 压力测试写入的记录使用的项目名称前缀
+STRESS_PREFIX = "stress:"
+# 读线程使用的搜索条件
+SEARCHES = [{}, {"keyword": "review"}, {"keyword": STRESS_PREFIX}, {"date_from": "2023-03-01", "date_to": "2023-03-31"}]
+
+
+def check_snapshot(records):
+    """
+    检查一次读取到的记录是否一致
+
+    Returns:
+        list: 发现的问题
+    """
+    problems = []
+    last_id = 0
+    for record in records:
+        if record["id"] <= last_id:
+            problems.append(f"ID顺序错误: {last_id} -> {record['id']}")
+        last_id = record["id"]
+        if record["task_name"].startswith(STRESS_PREFIX) and record["task_name"] != record["notes"]:
+            problems.append(f"记录 {record['id']} 不完整: {record['task_name']!r} / {record['notes']!r}")
+    return problems
+
+
+def writer(manager, index, stop, stats):
+    """写线程：随机添加、更新、删除自己写入的记录"""
+    rng = random.Random(index)
+    own = []
+    timings = []
+    counts = {"add": 0, "update": 0, "delete": 0}
+    while not stop.is_set():
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < 0.5 or not own:
+            token = f"{STRESS_PREFIX}{index}-{counts['add']}"
+            own.append(manager.add_record(token, "/tmp/liuhen_bench/stress.png", token))
+            counts["add"] += 1
+        elif roll < 0.85:
+            token = f"{STRESS_PREFIX}{index}-u{counts['update']}"
+            manager.update_record(rng.choice(own), task_name=token, notes=token)
+            counts["update"] += 1
+        else:
+            manager.delete_record(own.pop(rng.randrange(len(own))))
+            counts["delete"] += 1
+        timings.append(time.perf_counter() - start)
+    stats.append({"counts": counts, "timings": timings})
+
+
+def reader(manager, index, stop, stats):
+    """读线程：搜索并检查快照，偶尔按ID查找"""
+    rng = random.Random(1000 + index)
+    timings = []
+    problems = []
+    while not stop.is_set():
+        kwargs = rng.choice(SEARCHES)
+        start = time.perf_counter()
+        records = manager.search_records(**kwargs)
+        timings.append(time.perf_counter() - start)
+        problems.extend(check_snapshot(records))
+        if records:
+            record = manager.get_record_by_id(rng.choice(records)["id"])
+            if record is not None and record["task_name"].startswith(STRESS_PREFIX) \
+                    and record["task_name"] != record["notes"]:
+                problems.append(f"按ID读取到不完整的记录 {record['id']}")
+    stats.append({"timings": timings, "problems": problems})
+
+
+def run(records=2000, writers=4, readers=8, seconds=3.0):
+    """
+    运行并发压力测试
+
+    Args:
+        records: 初始记录数
+        writers: 写线程数
+        readers: 读线程数
+        seconds: 持续时间（秒）
+
+    Returns:
+        dict: 测试结果
+    """
+    with tempfile.TemporaryDirectory(prefix="liuhen_bench_") as temp_dir:
+        db_file = os.path.join(temp_dir, "records.json")
+        write_store(db_file, records)
+        manager = DataManager(db_file=db_file)
+
+        stop = threading.Event()
+        write_stats, read_stats, errors = [], [], []
+
+        def guarded(target, *args):
+            try:
+                target(*args)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                stop.set()
+
+        threads = [threading.Thread(target=guarded, args=(writer, manager, i, stop, write_stats))
+                   for i in range(writers)]
+        threads += [threading.Thread(target=guarded, args=(reader, manager, i, stop, read_stats))
+                    for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        counts = {"add": 0, "update": 0, "delete": 0}
+        for stat in write_stats:
+            for key, value in stat["counts"].items():
+                counts[key] += value
+        problems = [problem for stat in read_stats for problem in stat["problems"]]
+
+        # 记录文件必须与内存一致，记录数必须等于 初始 + 添加 - 删除
+        reloaded = DataManager(db_file=db_file).get_all_records()
+        expected = records + counts["add"] - counts["delete"]
+        if len(reloaded) != expected:
+            problems.append(f"记录数 {len(reloaded)}，应为 {expected}")
+        if reloaded != manager.get_all_records():
+            problems.append("记录文件与内存中的记录不一致")
+
+    write_timings = [t for stat in write_stats for t in stat["timings"]]
+    read_timings = [t for stat in read_stats for t in stat["timings"]]
+    return {
+        "records": records,
+        "writers": writers,
+        "readers": readers,
+        "seconds": seconds,
+        "operations": counts,
+        "write": summarize(write_timings) if write_timings else None,
+        "search": summarize(read_timings) if read_timings else None,
+        "searches": len(read_timings),
+        "errors": errors,
+        "problems": problems[:20],
+        "problem_count": len(problems),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="并发压力测试")
+    parser.add_argument("--records", type=int, default=2000, help="初始记录数")
+    parser.add_argument("--writers", type=int, default=4, help="写线程数")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--seconds", type=float, default=3.0, help="持续时间（秒）")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--output", help="把JSON结果写入文件")
+    args = parser.parse_args()
+
+    result = run(args.records, args.writers, args.readers, args.seconds)
+
+    if args.json or args.output:
+        write_results({"environment": environment_info(), "concurrency": result}, args.output or "-")
+    else:
+        operations = result["operations"]
+        print(f"写操作: 添加 {operations['add']}，更新 {operations['update']}，删除 {operations['delete']}")
+        if result["write"]:
+            print(f"写入延迟: p50 {result['write']['p50_ms']} ms，p95 {result['write']['p95_ms']} ms")
+        if result["search"]:
+            print(f"搜索 {result['searches']} 次，延迟: p50 {result['search']['p50_ms']} ms，"
+                  f"p95 {result['search']['p95_ms']} ms")
+        for error in result["errors"]:
+            print(f"错误: {error}")
+        for problem in result["problems"]:
+            print(f"问题: {problem}")
+        print("通过" if not result["errors"] and not result["problem_count"] else f"发现 {result['problem_count']} 个问题")
+
+    if result["errors"] or result["problem_count"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
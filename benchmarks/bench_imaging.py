@@ -0,0 +1,164 @@
+"""
+图像处理基准测试 - 在 1080p 到 5K 的合成截图上测量保存编码、预览缩放、马赛克、
+矩形高亮和撤销重放的耗时
+
+编辑器操作使用 src.core.annotations（与 ScreenshotEditor 相同的渲染代码），不创建窗口，
+无显示环境也能运行。
+
+用法:
+    python benchmarks/bench_imaging.py [--resolutions 1080p,4K] [--repeat 5] [--json] [--output result.json]
+"""
+
+import os
+import random
+import argparse
+import tempfile
+
+from bench_common import (
+    RESOLUTIONS, measure, make_screenshot, environment_info, write_results
+)
+
+from src.core.annotations import AnnotationLayer
+from src.core.screenshots import write_screenshot_file, scale_image_for_preview
+
+# 预览区域大小（主窗口预览区的典型尺寸）
+PREVIEW_SIZE = (900, 600)
+# 撤销重放测试中预先添加的标注数
+UNDO_ANNOTATIONS = 20
+
+
+def random_box(rng, width, height, min_size=120, max_size=600):
+    """生成图像范围内的随机矩形 (x0, y0, x1, y1)"""
+    w = rng.randint(min_size, max_size)
+    h = rng.randint(min_size, max_size)
+    x0 = rng.randint(0, width - w - 1)
+    y0 = rng.randint(0, height - h - 1)
+    return x0, y0, x0 + w, y0 + h
+
+
+def build_annotations(layer, count, rng):
+    """
+    在图层中添加一组混合标注（矩形、箭头、文字、马赛克涂抹）
+
+    Args:
+        layer: AnnotationLayer
+        count: 标注数
+        rng: 随机数生成器
+    """
+    width, height = layer.image.size
+    kinds = ["rect", "arrow", "text", "smear"]
+    for index in range(count):
+        kind = kinds[index % len(kinds)]
+        box = random_box(rng, width, height)
+        if kind == "rect":
+            layer.add_rectangle(*box, "#FF0000")
+        elif kind == "arrow":
+            layer.add_arrow(*box, "#0000FF")
+        elif kind == "text":
+            layer.add_text(box[0], box[1], "基准测试", "#000000")
+        else:
+            # 一笔涂抹约经过10个点
+            layer.begin_smear()
+            for step in range(10):
+                layer.smear(box[0] + step * 20, box[1] + step * 10)
+            layer.end_smear()
+
+
+def bench_resolution(label, size, repeat):
+    """
+    对指定分辨率执行全部图像基准
+
+    Args:
+        label: 分辨率名称
+        size: (宽, 高)
+        repeat: 计时次数
+
+    Returns:
+        dict: 操作名 -> 耗时统计
+    """
+    width, height = size
+    image = make_screenshot(width, height)
+    rng = random.Random(width)
+    result = {"resolution": label, "width": width, "height": height}
+
+    with tempfile.TemporaryDirectory(prefix="liuhen_bench_") as temp_dir:
+        paths = []
+
+        def encode():
+            paths.append(write_screenshot_file(image, "基准测试", save_dir=temp_dir))
+
+        result["encode"] = measure(encode, repeat=repeat)
+        result["encode"]["file_bytes"] = os.path.getsize(paths[-1])
+
+    result["preview_resize"] = measure(lambda: scale_image_for_preview(image, *PREVIEW_SIZE), repeat=repeat)
+
+    # 每次在新的图层上操作，避免前一次的结果影响后一次
+    def new_layer():
+        return AnnotationLayer(image)
+
+    mosaic_box = (width // 4, height // 4, width // 4 + 800, height // 4 + 500)
+    result["mosaic_800x500"] = measure(lambda layer: layer.add_mosaic(*mosaic_box), repeat=repeat, setup=new_layer)
+
+    result["mosaic_smear"] = measure(
+        lambda layer: layer.smear(width // 2, height // 2), repeat=repeat, setup=new_layer
+    )
+
+    # 大于100x100的矩形会叠加半透明高亮填充
+    highlight_box = (width // 5, height // 5, width // 5 + 600, height // 5 + 400)
+    result["rect_highlight"] = measure(
+        lambda layer: layer.add_rectangle(*highlight_box, "#FF0000"), repeat=repeat, setup=new_layer
+    )
+
+    def layer_with_annotations():
+        layer = AnnotationLayer(image)
+        build_annotations(layer, UNDO_ANNOTATIONS, random.Random(rng.random()))
+        return layer
+
+    result["undo_replay"] = measure(lambda layer: layer.undo(), repeat=repeat, setup=layer_with_annotations)
+    result["undo_replay"]["annotations"] = UNDO_ANNOTATIONS
+    return result
+
+
+def run(resolutions=tuple(RESOLUTIONS), repeat=5):
+    """
+    运行图像处理基准测试
+
+    Args:
+        resolutions: 分辨率名称列表（RESOLUTIONS 的键）
+        repeat: 计时次数
+
+    Returns:
+        list: 每种分辨率的结果
+    """
+    return [bench_resolution(label, RESOLUTIONS[label], repeat) for label in resolutions]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="图像处理基准测试")
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS),
+                        help=f"分辨率，逗号分隔（可选: {', '.join(RESOLUTIONS)}）")
+    parser.add_argument("--repeat", type=int, default=5, help="每项操作的计时次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--output", help="把JSON结果写入文件")
+    args = parser.parse_args()
+
+    labels = [label.strip() for label in args.resolutions.split(",") if label.strip()]
+    unknown = [label for label in labels if label not in RESOLUTIONS]
+    if unknown:
+        parser.error(f"未知的分辨率: {', '.join(unknown)}")
+
+    results = run(labels, args.repeat)
+
+    if args.json or args.output:
+        write_results({"environment": environment_info(), "imaging": results}, args.output or "-")
+        return
+
+    operations = ["encode", "preview_resize", "mosaic_800x500", "mosaic_smear", "rect_highlight", "undo_replay"]
+    print(f"{'操作':<18}" + "".join(f"{r['resolution'] + '(ms)':>14}" for r in results))
+    for operation in operations:
+        print(f"{operation:<18}" + "".join(f"{r[operation]['p50_ms']:>14}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
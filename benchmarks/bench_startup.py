@@ -0,0 +1,140 @@
+"""
+启动时间基准测试 - 对比延迟加载启动路径和原先全部预先加载的启动路径
+
+每次测量都在新的Python进程中进行，避免模块缓存影响结果。没有图形界面时
+（例如无 DISPLAY 的服务器）只测量导入和记录加载时间。
+
+用法:
+    python benchmarks/bench_startup.py [--runs 5] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# 确保src目录在Python路径中
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+MODES = ("lazy", "eager")
+
+
+def run_child(mode):
+    """
+    在子进程中执行一次启动并输出各阶段耗时（毫秒，JSON）
+
+    lazy: 当前启动路径，主窗口显示后在后台加载记录
+    eager: 原先的启动路径，先导入所有界面模块并同步加载记录
+    """
+    start = time.perf_counter()
+    result = {"mode": mode}
+
+    def elapsed():
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    # 屏蔽模块导入和初始化时的调试输出
+    devnull = open(os.devnull, "w", encoding="utf-8")
+    real_stdout = sys.stdout
+    sys.stdout = devnull
+    try:
+        import tkinter as tk
+        from src.gui.app import ActivityTrackerApp
+        if mode == "eager":
+            import src.gui.editor
+            import src.gui.records_view
+            import src.gui.config_window  # noqa: F401
+            try:
+                import pyautogui  # noqa: F401
+            except ImportError:
+                pass
+            from src.utils.data_manager import DataManager
+            DataManager()
+        result["import_ms"] = elapsed()
+
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            root = None
+            result["window_ms"] = None
+
+        if root is not None:
+            ActivityTrackerApp(root)
+            root.update()
+            result["window_ms"] = elapsed()
+
+            # 处理空闲回调，触发后台加载
+            root.update_idletasks()
+            root.update()
+
+        from src.utils.data_manager import DataManager
+        DataManager()
+        result["store_ready_ms"] = elapsed()
+
+        if root is not None:
+            root.destroy()
+    finally:
+        sys.stdout = real_stdout
+        devnull.close()
+
+    print(json.dumps(result))
+
+
+def measure(mode, runs):
+    """
+    多次启动子进程测量指定启动路径
+
+    Args:
+        mode: 启动路径 (lazy / eager)
+        runs: 测量次数
+
+    Returns:
+        dict: 各阶段耗时的中位数
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode],
+            capture_output=True, text=True, cwd=script_dir, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {"mode": mode, "runs": runs}
+    for key in ("import_ms", "window_ms", "store_ready_ms"):
+        values = [s[key] for s in samples if s.get(key) is not None]
+        summary[key] = round(statistics.median(values), 1) if values else None
+    return summary
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动时间基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="每种启动路径的测量次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    results = [measure(mode, args.runs) for mode in MODES]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    print(f"{'启动路径':<10}{'导入(ms)':>12}{'窗口显示(ms)':>14}{'记录就绪(ms)':>14}")
+    for result in results:
+        print(f"{result['mode']:<10}{fmt(result['import_ms']):>12}"
+              f"{fmt(result['window_ms']):>14}{fmt(result['store_ready_ms']):>14}")
+
+
+if __name__ == "__main__":
+    main()
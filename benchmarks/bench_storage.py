@@ -0,0 +1,114 @@
+"""
+记录存储基准测试 - 在 1k/10k/100k 条合成记录上测量 DataManager 的加载、增删改和搜索延迟
+
+记录库写在临时目录中，不影响应用数据。
+
+用法:
+    python benchmarks/bench_storage.py [--sizes 1000,10000] [--repeat 5] [--json] [--output result.json]
+"""
+
+import os
+import random
+import argparse
+import tempfile
+
+from bench_common import (
+    STORE_SIZES, measure, write_store, environment_info, write_results
+)
+
+from src.utils.data_manager import DataManager
+
+# 搜索场景：名称 -> search_records 参数
+SEARCHES = {
+    "search_all": {},
+    "search_keyword": {"keyword": "review"},
+    "search_date_range": {"date_from": "2023-03-01", "date_to": "2023-03-31"},
+    "search_keyword_date": {"keyword": "周报", "date_from": "2023-01-01", "date_to": "2023-06-30"},
+}
+
+
+def bench_store(size, repeat, search_repeat):
+    """
+    对指定规模的记录库执行全部存储基准
+
+    Args:
+        size: 记录数
+        repeat: 增删改和加载的计时次数（每次都会重写整个记录文件）
+        search_repeat: 搜索的计时次数
+
+    Returns:
+        dict: 操作名 -> 耗时统计
+    """
+    rng = random.Random(size)
+    with tempfile.TemporaryDirectory(prefix="liuhen_bench_") as temp_dir:
+        db_file = os.path.join(temp_dir, "records.json")
+        write_store(db_file, size)
+        result = {"records": size, "file_bytes": os.path.getsize(db_file)}
+
+        result["load"] = measure(lambda: DataManager(db_file=db_file), repeat=repeat)
+
+        manager = DataManager(db_file=db_file)
+        image_path = os.path.join(temp_dir, "bench.png")
+
+        result["add"] = measure(lambda: manager.add_record("基准测试", image_path, "合成记录"), repeat=repeat)
+
+        def pick_id():
+            return rng.choice(manager.records)["id"]
+
+        result["update"] = measure(
+            lambda record_id: manager.update_record(record_id, notes="已更新"),
+            repeat=repeat, setup=pick_id
+        )
+        result["delete"] = measure(manager.delete_record, repeat=repeat, setup=pick_id)
+
+        for name, kwargs in SEARCHES.items():
+            result[name] = measure(lambda: manager.search_records(**kwargs), repeat=search_repeat)
+            result[name]["matches"] = len(manager.search_records(**kwargs))
+
+        # 按ID查找（记录详情、编辑和删除都会用到）
+        result["get_by_id"] = measure(
+            manager.get_record_by_id, repeat=search_repeat, setup=pick_id
+        )
+    return result
+
+
+def run(sizes=STORE_SIZES, repeat=5, search_repeat=20):
+    """
+    运行存储基准测试
+
+    Args:
+        sizes: 记录库规模列表
+        repeat: 增删改和加载的计时次数
+        search_repeat: 搜索的计时次数
+
+    Returns:
+        list: 每种规模的结果
+    """
+    return [bench_store(size, repeat, search_repeat) for size in sizes]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="记录存储基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in STORE_SIZES), help="记录库规模，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="增删改和加载的计时次数")
+    parser.add_argument("--search-repeat", type=int, default=20, help="搜索的计时次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--output", help="把JSON结果写入文件")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run(sizes, args.repeat, args.search_repeat)
+
+    if args.json or args.output:
+        write_results({"environment": environment_info(), "storage": results}, args.output or "-")
+        return
+
+    operations = ["load", "add", "update", "delete", "get_by_id"] + list(SEARCHES)
+    print(f"{'操作':<22}" + "".join(f"{str(r['records']) + ' 条(ms)':>16}" for r in results))
+    for operation in operations:
+        print(f"{operation:<22}" + "".join(f"{r[operation]['p50_ms']:>16}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+运行全部基准测试并把结果写入JSON文件，可与之前版本的结果比较
+
+包括记录存储（bench_storage）、图像处理（bench_imaging）、多线程并发（bench_concurrency）
+和截图后端（无显示环境时只有内存假后端）。不需要图形界面。
+
+用法:
+    python benchmarks/run_all.py [--quick] [--output results.json] [--baseline old.json]
+"""
+
+import os
+import json
+import argparse
+
+from bench_common import (
+    STORE_SIZES, RESOLUTIONS, environment_info, write_results
+)
+
+import bench_storage
+import bench_imaging
+import bench_concurrency
+from src.utils.capture import benchmark_backends
+
+# 快速模式：只跑较小的规模，用于提交前的快速检查
+QUICK_SIZES = (1000, 10000)
+QUICK_RESOLUTIONS = ("1080p", "4K")
+# 比基线慢超过该比例时标记为退化
+REGRESSION_THRESHOLD = 1.2
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def default_output(environment):
+    """按版本和时间生成默认结果文件路径"""
+    stamp = environment["timestamp"].replace(":", "").replace("-", "")
+    return os.path.join(RESULTS_DIR, f"bench_{environment['app_version']}_{stamp}.json")
+
+
+def iter_timings(results):
+    """
+    遍历结果中所有的耗时统计
+
+    Yields:
+        tuple: (键, p50毫秒)，键形如 "storage/10000/add"
+    """
+    for result in results.get("storage", []):
+        for name, value in result.items():
+            if isinstance(value, dict) and "p50_ms" in value:
+                yield f"storage/{result['records']}/{name}", value["p50_ms"]
+    for result in results.get("imaging", []):
+        for name, value in result.items():
+            if isinstance(value, dict) and "p50_ms" in value:
+                yield f"imaging/{result['resolution']}/{name}", value["p50_ms"]
+    concurrency = results.get("concurrency") or {}
+    for name in ("write", "search"):
+        if concurrency.get(name):
+            yield f"concurrency/{name}", concurrency[name]["p50_ms"]
+    for result in results.get("capture", []):
+        if "p50_ms" in result:
+            yield f"capture/{result['backend']}", result["p50_ms"]
+
+
+def compare(results, baseline):
+    """
+    与基线结果比较各项的P50耗时
+
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+
+    Returns:
+        list: (键, 基线ms, 本次ms, 比值) 列表，只包含两边都有的项
+    """
+    old = dict(iter_timings(baseline))
+    rows = []
+    for key, value in iter_timings(results):
+        if key in old and old[key] > 0:
+            rows.append((key, old[key], value, value / old[key]))
+    return rows
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="运行全部基准测试")
+    parser.add_argument("--quick", action="store_true", help="只测试较小的记录库和分辨率")
+    parser.add_argument("--repeat", type=int, default=5, help="每项操作的计时次数")
+    parser.add_argument("--output", help="结果文件路径（默认写入 benchmarks/results/），为 - 时输出到标准输出")
+    parser.add_argument("--baseline", help="与之前的结果文件比较")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else STORE_SIZES
+    resolutions = QUICK_RESOLUTIONS if args.quick else tuple(RESOLUTIONS)
+
+    environment = environment_info()
+    results = {"environment": environment, "quick": args.quick}
+
+    print("记录存储...")
+    results["storage"] = bench_storage.run(sizes, args.repeat)
+    print("图像处理...")
+    results["imaging"] = bench_imaging.run(resolutions, args.repeat)
+    print("多线程并发...")
+    results["concurrency"] = bench_concurrency.run(seconds=1.0 if args.quick else 3.0)
+    if results["concurrency"]["problem_count"] or results["concurrency"]["errors"]:
+        print("  并发测试发现问题:", *results["concurrency"]["problems"], *results["concurrency"]["errors"], sep="\n  ")
+    print("截图后端...")
+    results["capture"] = benchmark_backends(samples=max(5, args.repeat))
+
+    output = args.output or default_output(environment)
+    if output != "-":
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    write_results(results, output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline)
+        print(f"\n{'项目':<40}{'基线(ms)':>12}{'本次(ms)':>12}{'比值':>8}")
+        for key, old, new, ratio in rows:
+            flag = "  退化" if ratio > REGRESSION_THRESHOLD else ""
+            print(f"{key:<40}{old:>12}{new:>12}{ratio:>8.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
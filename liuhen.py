@@ -0,0 +1,16 @@
+"""
+留痕软件 - 命令行入口
+
+不启动图形界面完成截图、批量导入、搜索和导出，详见 src/cli.py。
+"""
+
+import os
+import sys
+
+# 确保src目录在Python路径中
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
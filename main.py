@@ -7,8 +7,8 @@
 import tkinter as tk
 import sys
 import os
+import logging
 import traceback
-from PIL import Image
 
 # 检测是否为PyInstaller打包环境
 def is_pyinstaller():
@@ -24,31 +24,31 @@ def get_app_root():
 # 确保src目录在Python路径中
 app_root = get_app_root()
 sys.path.insert(0, app_root)
-print(f"应用根目录: {app_root}")
-print(f"Python路径: {sys.path}")
 
 def main():
     """程序主入口"""
     try:
-        print("开始加载模块...")
-        
         # 导入必要的模块
         from src.config import ensure_dirs, APP_NAME, APP_VERSION
-        print("成功导入config模块")
         
         # 导入配置管理器，预加载用户配置
         from src.utils.config_manager import default_config_manager
-        print("加载用户配置完成")
+        
+        # 按用户配置启用日志（调试模式、日志文件）
+        from src.utils.log_manager import get_logger, setup_logging
+        setup_logging()
+        logger = get_logger("main")
+        
+        from src.utils.perf_trace import default_tracer
+        default_tracer.enabled = default_config_manager.get_value("advanced", "perf_trace", False)
+        logger.debug("应用根目录: %s", app_root)
+        logger.debug("Python路径: %s", sys.path)
         
         from src.gui.app import ActivityTrackerApp
-        print("成功导入app模块")
         
-        print("创建必要的目录...")
         # 确保必要的目录存在
         ensure_dirs()
-        print("目录创建完成")
         
-        print("初始化Tkinter...")
         # 创建Tkinter根窗口
         root = tk.Tk()
         
@@ -61,7 +61,7 @@ def main():
             try:
                 root.iconbitmap(icon_path)
             except Exception as e:
-                print(f"设置图标失败: {e}")
+                logger.warning("设置图标失败: %s", e)
         
         # 获取用户界面配置
         startup_maximized = default_config_manager.get_value("ui", "startup_maximized", True)
@@ -79,9 +79,6 @@ def main():
             window_height = min(768, screen_height - 100)
             root.geometry(f"{window_width}x{window_height}+{(screen_width-window_width)//2}+{(screen_height-window_height)//2}")
             
-        print("Tkinter初始化完成")
-        
-        print("创建应用实例...")
         # 初始化应用
         app = ActivityTrackerApp(root)
         
@@ -90,14 +87,14 @@ def main():
         
         # 设置默认马赛克块大小
         app.mosaic_size = 40
-        print("应用实例创建完成")
+        logger.debug("应用实例创建完成")
         
-        print("启动主循环...")
         # 启动主循环
         root.mainloop()
     except ImportError as e:
         error_message = f"导入模块错误: {str(e)}\n{traceback.format_exc()}"
-        print(error_message)
+        # 日志尚未配置时由 logging 直接输出到标准错误
+        logging.getLogger("liuhen.main").error(error_message)
         try:
             from tkinter import messagebox
             messagebox.showerror("模块导入错误", error_message)
@@ -105,7 +102,7 @@ def main():
             pass
     except Exception as e:
         error_message = f"程序启动错误: {str(e)}\n{traceback.format_exc()}"
-        print(error_message)
+        logging.getLogger("liuhen.main").error(error_message)
         try:
             from tkinter import messagebox
             messagebox.showerror("启动错误", error_message)
@@ -115,7 +112,6 @@ def main():
 
 if __name__ == "__main__":
     try:
-        print("=== 留痕软件启动 ===")
         main()
     except Exception as e:
         print(f"未捕获的异常: {str(e)}")
@@ -0,0 +1,488 @@
+"""
+命令行接口 - 不启动图形界面完成截图、批量导入、搜索和导出
+
+用法:
+    python liuhen.py capture "周报" [--notes 说明] [--region l,t,r,b | --monitor primary|virtual] [--delay 秒]
+    python liuhen.py import 文件夹 [--task 名称] [--recursive] [--copy]
+    python liuhen.py merge 其他电脑的records.json [--images 截图文件夹] [--dedupe timestamp|hash|none] [--no-copy]
+    python liuhen.py check [--delete-orphans] [--remove-missing]
+    python liuhen.py layout date|flat [--dry-run]
+    python liuhen.py archive [--days 180] [--format webp|jpeg|png] [--max-dimension 像素] [--dry-run]
+    python liuhen.py pack [--keep-config]
+    python liuhen.py compact [--all]
+    python liuhen.py search [--keyword 关键词] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python liuhen.py export 输出文件 [--format csv|jsonl|xlsx|zip|tar] [--keyword ...] [--from ...] [--to ...]
+
+所有命令都可以用 --db 指定其他记录文件。搜索结果每行输出一条JSON记录，便于配合 jq 等工具处理。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+
+from src.config import APP_NAME, APP_VERSION, FILENAME_TIME_FORMAT
+from src.utils.log_manager import get_logger, setup_logging
+from src.utils.config_manager import default_config_manager
+from src.utils.perf_trace import default_tracer
+from src.utils.data_manager import DataManager
+from src.core.screenshots import IMAGE_EXTENSIONS, capture_date, get_save_dir, shard_dir, unique_path
+
+logger = get_logger(__name__)
+
+# 本软件保存的截图文件名：时间_项目名称.扩展名
+SCREENSHOT_NAME_PATTERN = re.compile(r"^(\d{8}_\d{6})_(.+)$")
+# 导入时每处理多少个文件输出一次进度
+PROGRESS_EVERY = 1000
+
+
+def parse_region(value):
+    """解析 left,top,right,bottom 格式的区域参数"""
+    try:
+        parts = [int(p) for p in value.split(",")]
+    except ValueError:
+        parts = []
+    if len(parts) != 4 or parts[2] <= parts[0] or parts[3] <= parts[1]:
+        raise argparse.ArgumentTypeError("区域格式应为 left,top,right,bottom")
+    return tuple(parts)
+
+
+def parse_date(value):
+    """校验 YYYY-MM-DD 格式的日期参数（空字符串表示不限）"""
+    if not value:
+        return value
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError("日期格式应为 YYYY-MM-DD")
+    return value
+
+
+def open_store(args):
+    """按 --db 参数打开记录存储，未指定时使用应用的记录文件"""
+    return DataManager(db_file=os.path.abspath(args.db)) if args.db else DataManager()
+
+
+def write_json_line(record, stream=None):
+    """输出一行JSON记录"""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(record, ensure_ascii=False))
+    stream.write("\n")
+
+
+def cmd_capture(args):
+    """截图并保存为记录"""
+    from src.core.screenshots import grab_screen, write_screenshot_file
+    from src.utils.capture import create_backend, set_capture_backend, get_capture_area
+
+    if args.backend:
+        backend = create_backend(args.backend)
+        if backend is None:
+            print(f"截图后端不可用: {args.backend}", file=sys.stderr)
+            return 1
+        set_capture_backend(backend)
+
+    if args.delay > 0:
+        time.sleep(args.delay)
+
+    bbox = args.region
+    if bbox is None:
+        # 没有窗口可用于获取鼠标位置，默认截取主显示器
+        bbox = get_capture_area(None, args.monitor)
+
+    try:
+        image = grab_screen(bbox)
+    except Exception as e:
+        print(f"截图失败: {e}", file=sys.stderr)
+        return 1
+
+    if not args.task.strip():
+        print("请输入项目/事务名称", file=sys.stderr)
+        return 1
+
+    store = open_store(args)
+    try:
+        filepath = write_screenshot_file(image, args.task)
+    except Exception as e:
+        print(f"保存截图时发生错误: {e}", file=sys.stderr)
+        return 1
+    record_id = store.add_record(args.task, filepath, args.notes)
+    write_json_line(store.get_record_by_id(record_id))
+    return 0
+
+
+def iter_image_files(folder, recursive=False):
+    """
+    列出文件夹中的图片文件（按路径排序）
+
+    Args:
+        folder: 文件夹路径
+        recursive: 是否包含子文件夹
+
+    Returns:
+        list: (路径, os.stat_result) 列表
+    """
+    found = []
+    pending = [folder]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    found.append((entry.path, entry.stat()))
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+def describe_image_file(path, stat, default_task=None):
+    """
+    从文件名和文件时间推断记录的项目名称和时间
+
+    本软件保存的截图（时间_项目名称.png）直接取文件名中的时间和名称；
+    其他文件使用 default_task（或文件名）和文件修改时间。
+
+    Returns:
+        tuple: (项目名称, ISO格式时间)
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = SCREENSHOT_NAME_PATTERN.match(stem)
+    if match:
+        try:
+            when = datetime.datetime.strptime(match.group(1), FILENAME_TIME_FORMAT)
+            return default_task or match.group(2).replace("_", " ").strip() or stem, when.isoformat()
+        except ValueError:
+            pass
+    when = datetime.datetime.fromtimestamp(stat.st_mtime)
+    return default_task or stem, when.replace(microsecond=0).isoformat()
+
+
+def cmd_import(args):
+    """把文件夹中的已有图片批量导入为记录"""
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        print(f"文件夹不存在: {folder}", file=sys.stderr)
+        return 1
+
+    files = iter_image_files(folder, args.recursive)
+    store = open_store(args)
+    save_dir = get_save_dir() if args.copy else None
+
+    imported = skipped = 0
+    start = time.perf_counter()
+    # 所有记录只在结束时写入一次记录文件
+    with store.batch():
+        # 已经在记录中的图片不重复导入
+        existing = {record.get("image_path") for record in store.records}
+        for index, (path, stat) in enumerate(files, 1):
+            task, timestamp = describe_image_file(path, stat, args.task)
+            if save_dir:
+                name = os.path.basename(path)
+                target_dir = shard_dir(save_dir, capture_date(name, timestamp))
+                target = os.path.join(target_dir, name)
+                if os.path.abspath(target).replace("\\", "/") in existing:
+                    skipped += 1
+                    continue
+                target = unique_path(target_dir, name)
+                shutil.copy2(path, target)
+                path = target
+            elif os.path.abspath(path).replace("\\", "/") in existing:
+                skipped += 1
+                continue
+            store.add_record(task, path, args.notes, timestamp=timestamp)
+            imported += 1
+            if index % PROGRESS_EVERY == 0:
+                print(f"已处理 {index}/{len(files)}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"导入 {imported} 条记录，跳过 {skipped} 个已存在的文件，用时 {elapsed:.2f} 秒", file=sys.stderr)
+    return 0
+
+
+def cmd_merge(args):
+    """合并其他电脑的记录文件和截图"""
+    from src.core.merge import merge_records
+
+    if not os.path.isfile(args.source):
+        print(f"记录文件不存在: {args.source}", file=sys.stderr)
+        return 1
+
+    store = open_store(args)
+    start = time.perf_counter()
+    try:
+        result = merge_records(
+            store, args.source, args.images, copy_images=not args.no_copy, dedupe=args.dedupe,
+            progress=lambda done, total: print(f"已处理 {done}/{total}", file=sys.stderr)
+        )
+    except (ValueError, OSError) as e:
+        print(f"合并失败: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - start
+    print(f"新增 {result.added} 条记录，跳过 {result.duplicates} 条重复记录，"
+          f"{result.missing_images} 条缺少截图，用时 {elapsed:.2f} 秒", file=sys.stderr)
+    return 0
+
+
+def cmd_check(args):
+    """检查截图目录与记录是否一致，可选批量修复"""
+    from src.core.integrity import scan_integrity, repair_integrity, format_size
+
+    store = open_store(args)
+    start = time.perf_counter()
+    report = scan_integrity(store, args.dir or None)
+    elapsed = time.perf_counter() - start
+
+    for path, size in report.orphans:
+        print(f"孤立文件\t{path}\t{size}")
+    for record_id in report.missing:
+        record = store.get_record_by_id(record_id) or {}
+        print(f"缺少图片\t{record_id}\t{record.get('image_path', '')}")
+    print(f"扫描 {len(report.directories)} 个目录，{report.files} 个文件（{format_size(report.total_bytes)}），"
+          f"孤立文件 {len(report.orphans)} 个（{format_size(report.orphan_bytes)}），"
+          f"缺少图片的记录 {len(report.missing)} 条，用时 {elapsed:.2f} 秒", file=sys.stderr)
+
+    if args.delete_orphans or args.remove_missing:
+        files, records, failures = repair_integrity(store, report, args.delete_orphans, args.remove_missing)
+        for failure in failures:
+            print(f"删除失败: {failure}", file=sys.stderr)
+        print(f"已删除 {files} 个孤立文件，{records} 条缺少图片的记录", file=sys.stderr)
+    return 0
+
+
+def cmd_layout(args):
+    """把已有截图迁移到指定目录结构，并设为以后保存截图使用的结构"""
+    from src.core.layout import migrate_layout
+
+    store = open_store(args)
+    start = time.perf_counter()
+    result = migrate_layout(store, args.layout, args.dir or None,
+                            progress=lambda done, total: print(f"已处理 {done}/{total}", file=sys.stderr),
+                            dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    for failure in result.failures:
+        print(f"移动失败: {failure}", file=sys.stderr)
+    if args.dry_run:
+        print(f"需要移动 {result.moved} 个文件，另有 {result.updated} 条记录只需修正路径（未做修改）", file=sys.stderr)
+        return 0
+    print(f"移动 {result.moved} 个文件，改写 {result.updated} 条记录路径，保持原位 {result.skipped} 条，"
+          f"缺少图片 {result.missing} 条，用时 {elapsed:.2f} 秒", file=sys.stderr)
+
+    if not args.keep_config:
+        default_config_manager.set_value("files", "directory_layout", args.layout)
+        default_config_manager.save_config()
+    return 1 if result.failures else 0
+
+
+def cmd_archive(args):
+    """把超过保留期的截图打包进归档文件，只保留预览图"""
+    from src.core.integrity import format_size
+    from src.core.tiering import archive_old_screenshots, load_policy
+
+    policy = load_policy()
+    overrides = {"archive_after_days": args.days, "image_format": args.format, "max_dimension": args.max_dimension}
+    policy = policy._replace(**{key: value for key, value in overrides.items() if value is not None})
+
+    store = open_store(args)
+    start = time.perf_counter()
+    result = archive_old_screenshots(
+        store, policy, args.dir or None,
+        progress=lambda done, total: print(f"已处理 {done}/{total}", file=sys.stderr),
+        dry_run=args.dry_run
+    )
+    elapsed = time.perf_counter() - start
+
+    for failure in result.failures:
+        print(f"归档失败: {failure}", file=sys.stderr)
+    if args.dry_run:
+        print(f"有 {result.archived} 个截图超过 {policy.archive_after_days} 天（{format_size(result.bytes_before)}），"
+              f"未做修改", file=sys.stderr)
+        return 0
+    for archive in result.archives:
+        print(archive)
+    print(f"归档 {result.archived} 个截图到 {len(result.archives)} 个归档文件，"
+          f"{format_size(result.bytes_before)} -> {format_size(result.bytes_after)}，用时 {elapsed:.2f} 秒",
+          file=sys.stderr)
+    return 1 if result.failures else 0
+
+
+def cmd_pack(args):
+    """把已有截图文件移入打包存储，并设为以后保存截图使用的存储方式"""
+    from src.core.packing import pack_existing_screenshots
+
+    store = open_store(args)
+    start = time.perf_counter()
+    result = pack_existing_screenshots(store, args.dir or None,
+                                       progress=lambda done, total: print(f"已处理 {done}/{total}", file=sys.stderr))
+    elapsed = time.perf_counter() - start
+
+    for failure in result.failures:
+        print(f"移入失败: {failure}", file=sys.stderr)
+    print(f"移入 {result.packed} 个截图，保持原位 {result.skipped} 条，缺少图片 {result.missing} 条，"
+          f"用时 {elapsed:.2f} 秒", file=sys.stderr)
+
+    if not args.keep_config:
+        default_config_manager.set_value("files", "storage_backend", "packed")
+        default_config_manager.save_config()
+    return 1 if result.failures else 0
+
+
+def cmd_compact(args):
+    """整理打包存储，回收已删除截图占用的空间"""
+    from src.core.integrity import format_size
+    from src.core.packing import compact_packs
+
+    store = open_store(args)
+    start = time.perf_counter()
+    result = compact_packs(store, args.dir or None, min_garbage_ratio=0 if args.all else None)
+    elapsed = time.perf_counter() - start
+    print(f"整理 {result.segments} 个段文件，丢弃 {result.dropped} 个没有记录引用的截图，"
+          f"回收 {format_size(result.reclaimed_bytes)}，用时 {elapsed:.2f} 秒", file=sys.stderr)
+    return 0
+
+
+def cmd_search(args):
+    """搜索记录，每行输出一条JSON"""
+    store = open_store(args)
+    count = 0
+    for record in store.iter_search(args.keyword, args.date_from, args.date_to):
+        write_json_line(record)
+        count += 1
+        if args.limit and count >= args.limit:
+            break
+    return 0
+
+
+def cmd_export(args):
+    """按筛选条件流式导出记录"""
+    from src.core.export import export_records, guess_format
+
+    store = open_store(args)
+    records = store.iter_search(args.keyword, args.date_from, args.date_to)
+    fmt = args.format or guess_format(args.output)
+    try:
+        count = export_records(records, args.output, fmt)
+    except (ValueError, OSError) as e:
+        print(f"导出失败: {e}", file=sys.stderr)
+        return 1
+
+    if args.output != "-":
+        print(f"已导出 {count} 条记录到 {args.output}", file=sys.stderr)
+    return 0
+
+
+def add_filter_arguments(parser):
+    """添加与 search_records 相同的筛选参数"""
+    parser.add_argument("--keyword", "-k", default="", help="在项目名称和说明中搜索的关键词")
+    parser.add_argument("--from", dest="date_from", type=parse_date, default="", help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", type=parse_date, default="", help="结束日期 YYYY-MM-DD")
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="liuhen", description=f"{APP_NAME}命令行工具")
+    parser.add_argument("--version", action="version", version=f"{APP_NAME} {APP_VERSION}")
+    parser.add_argument("--db", help="记录文件路径，默认使用应用的记录文件")
+    parser.add_argument("--verbose", "-v", action="store_true", help="输出调试日志")
+    subparsers = parser.add_subparsers(dest="command", metavar="命令")
+    subparsers.required = True
+
+    capture = subparsers.add_parser("capture", help="截图并保存为记录")
+    capture.add_argument("task", help="项目/事务名称")
+    capture.add_argument("--notes", default="", help="附加说明")
+    area = capture.add_mutually_exclusive_group()
+    area.add_argument("--region", type=parse_region, help="截取区域 left,top,right,bottom")
+    area.add_argument("--monitor", choices=["primary", "virtual"], default="primary", help="截取主显示器或全部显示器")
+    capture.add_argument("--delay", type=float, default=0, help="截图前等待的秒数")
+    capture.add_argument("--backend", help="截图后端名称（默认按配置或自动探测）")
+    capture.set_defaults(func=cmd_capture)
+
+    importer = subparsers.add_parser("import", help="把文件夹中的图片批量导入为记录")
+    importer.add_argument("folder", help="图片文件夹")
+    importer.add_argument("--task", help="项目名称，默认从文件名推断")
+    importer.add_argument("--notes", default="", help="附加说明")
+    importer.add_argument("--recursive", "-r", action="store_true", help="包含子文件夹")
+    importer.add_argument("--copy", action="store_true", help="把图片复制到截图保存目录，默认直接引用原文件")
+    importer.set_defaults(func=cmd_import)
+
+    merge = subparsers.add_parser("merge", help="合并其他电脑的 records.json 和截图")
+    merge.add_argument("source", help="要合并的 records.json")
+    merge.add_argument("--images", help="源截图文件夹，默认为记录文件旁边的 screenshots")
+    merge.add_argument("--dedupe", choices=["timestamp", "hash", "none"], default="timestamp",
+                       help="去重方式：时间和项目名称相同 / 截图内容相同 / 不去重")
+    merge.add_argument("--no-copy", action="store_true", help="不复制截图，直接引用源文件夹中的文件")
+    merge.set_defaults(func=cmd_merge)
+
+    check = subparsers.add_parser("check", help="检查孤立截图和缺少图片的记录")
+    check.add_argument("--dir", action="append", help="要扫描的目录（可多次指定），默认为截图保存目录")
+    check.add_argument("--delete-orphans", action="store_true", help="删除没有记录引用的截图文件")
+    check.add_argument("--remove-missing", action="store_true", help="删除图片文件不存在的记录")
+    check.set_defaults(func=cmd_check)
+
+    layout = subparsers.add_parser("layout", help="把已有截图迁移到 按日期分文件夹/平铺 的目录结构")
+    layout.add_argument("layout", choices=["date", "flat"], help="date: 保存目录/YYYY/MM/DD，flat: 全部放在保存目录")
+    layout.add_argument("--dir", action="append", help="截图保存目录（可多次指定），默认为当前配置的保存目录")
+    layout.add_argument("--dry-run", action="store_true", help="只统计需要移动的文件，不做修改")
+    layout.add_argument("--keep-config", action="store_true", help="只迁移已有截图，不修改以后保存截图使用的结构")
+    layout.set_defaults(func=cmd_layout)
+
+    archive = subparsers.add_parser("archive", help="把旧截图重新编码并打包进归档文件，只保留预览图")
+    archive.add_argument("--days", type=int, help="归档超过该天数的截图，默认按配置（180天）")
+    archive.add_argument("--format", choices=["webp", "jpeg", "png"], help="重新编码的格式，默认按配置")
+    archive.add_argument("--max-dimension", type=int, help="把长边缩小到该像素数，0 表示不缩小")
+    archive.add_argument("--dir", action="append", help="截图保存目录（可多次指定），默认为当前配置的保存目录")
+    archive.add_argument("--dry-run", action="store_true", help="只统计需要归档的截图，不做修改")
+    archive.set_defaults(func=cmd_archive)
+
+    pack = subparsers.add_parser("pack", help="把已有截图文件移入打包存储（保存目录下的 packs 文件夹）")
+    pack.add_argument("--dir", action="append", help="截图保存目录（可多次指定），默认为当前配置的保存目录")
+    pack.add_argument("--keep-config", action="store_true", help="只移入已有截图，新截图仍按原方式保存")
+    pack.set_defaults(func=cmd_pack)
+
+    compact = subparsers.add_parser("compact", help="整理打包存储，回收已删除截图占用的空间")
+    compact.add_argument("--dir", action="append", help="截图保存目录（可多次指定），默认为当前配置的保存目录")
+    compact.add_argument("--all", action="store_true", help="只要有可回收的空间就整理（默认无效数据超过30%%时才整理）")
+    compact.set_defaults(func=cmd_compact)
+
+    search = subparsers.add_parser("search", help="搜索记录，每行输出一条JSON")
+    add_filter_arguments(search)
+    search.add_argument("--limit", type=int, default=0, help="最多输出的记录数")
+    search.set_defaults(func=cmd_search)
+
+    export = subparsers.add_parser("export", help="导出记录")
+    export.add_argument("output", help="输出文件路径，- 表示标准输出")
+    export.add_argument("--format", choices=["csv", "jsonl", "xlsx", "zip", "tar"], help="导出格式，默认按扩展名判断；zip/tar 连同截图一起打包")
+    add_filter_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    Args:
+        argv: 参数列表，默认使用 sys.argv
+
+    Returns:
+        int: 退出码
+    """
+    args = build_parser().parse_args(argv)
+    # 日志写到标准错误，标准输出只留给 search、export - 等命令的结果
+    setup_logging(debug_mode=True if args.verbose else None, stream=sys.stderr)
+    default_tracer.enabled = args.verbose or default_config_manager.get_value("advanced", "perf_trace", False)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # 输出被 head 等命令提前关闭
+        return 0
+    except KeyboardInterrupt:
+        return 130
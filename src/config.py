@@ -4,6 +4,7 @@
 
 import os
 import sys
+import logging
 
 # 检测是否为PyInstaller打包环境
 def is_pyinstaller():
@@ -45,7 +46,7 @@ def ensure_dirs():
     for directory in [DATA_DIR, SCREENSHOT_DIR, LOG_DIR]:
         if not os.path.exists(directory):
             os.makedirs(directory)
-            print(f"创建目录: {directory}")
+            logging.getLogger("liuhen.config").info("创建目录: %s", directory)
 
 # 浅色主题颜色配置
 COLOR_PRIMARY = "#3498db"     # 主要颜色
@@ -94,10 +95,3 @@ TABLE_COLUMNS = [
     {"id": "task_name", "text": "项目/事务", "width": 200},
     {"id": "timestamp", "text": "时间", "width": 150},
 ]
-
-# 打印配置信息
-print(f"应用名称: {APP_NAME} v{APP_VERSION}")
-print(f"数据目录: {DATA_DIR}")
-print(f"日志目录: {LOG_DIR}")
-print(f"截图目录: {SCREENSHOT_DIR}")
-print(f"资源目录: {ASSETS_DIR}")
\ No newline at end of file
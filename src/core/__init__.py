@@ -0,0 +1,3 @@
+"""
+核心模块包 - 标注渲染、记录存储和截图文件处理，不依赖tkinter，可用于脚本和批处理
+"""
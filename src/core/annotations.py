@@ -0,0 +1,344 @@
+"""
+标注渲染模块 - 在PIL图像上绘制矩形、箭头、文字和马赛克，不依赖tkinter
+
+ScreenshotEditor 只负责交互和画布显示，图像上的标注都由 AnnotationLayer 渲染，
+批处理脚本和基准测试可以直接使用本模块。
+"""
+
+import math
+from typing import Any, List, NamedTuple, Optional
+
+from PIL import Image, ImageDraw
+
+from src.utils.font_manager import get_font
+from src.utils.perf_trace import traced
+
+# 标注类型
+ANNOTATION_RECT = "rect"
+ANNOTATION_ARROW = "arrow"
+ANNOTATION_TEXT = "text"
+ANNOTATION_MOSAIC = "mosaic"
+ANNOTATION_MOSAIC_SMEAR = "mosaic_smear"
+
+LINE_WIDTH = 4           # 矩形和箭头的线宽
+OUTLINE_WIDTH = 6        # 白色标注外侧黑色辅助线的线宽
+ARROW_HEAD_LENGTH = 20   # 箭头长度
+ARROW_HEAD_ANGLE = math.pi / 6  # 箭头角度（30度）
+# 宽高都超过该值的矩形视为表格区域，内部叠加半透明高亮
+HIGHLIGHT_MIN_SIZE = 100
+
+DEFAULT_FONT_SIZE = 20
+DEFAULT_MOSAIC_SIZE = 40
+
+
+class Annotation(NamedTuple):
+    """一个标注
+
+    coords 的含义随类型不同：rect/arrow/mosaic 为 (x0, y0, x1, y1)，text 为 (x, y)，
+    mosaic_smear 为涂抹经过的点列表 [(x, y), ...]。size 为文字字号或马赛克块大小。
+    """
+    kind: str
+    coords: Any
+    color: Optional[str] = None
+    text: Optional[str] = None
+    size: Optional[int] = None
+
+
+def highlight_color(color):
+    """
+    根据线条颜色获取适合的半透明填充色
+
+    Args:
+        color: HEX颜色，例如 "#FF4136"
+
+    Returns:
+        tuple: (r, g, b, alpha)
+    """
+    if color.startswith('#'):
+        r = int(color[1:3], 16)
+        g = int(color[3:5], 16)
+        b = int(color[5:7], 16)
+        # alpha为60表示透明度约75%
+        return (r, g, b, 60)
+    return (255, 255, 255, 40)  # 默认为半透明白色
+
+
+def draw_rectangle(image, draw, x0, y0, x1, y1, color):
+    """
+    绘制矩形，白色标注加黑色外框；较大的矩形内部叠加半透明高亮
+
+    高亮只在矩形区域内合成，不生成整幅图像大小的透明图层，图像模式保持不变。
+
+    Args:
+        image: 目标图像（原地修改）
+        draw: image 的 ImageDraw 对象
+        x0, y0, x1, y1: 矩形坐标
+        color: HEX颜色
+    """
+    x0, x1 = min(x0, x1), max(x0, x1)
+    y0, y1 = min(y0, y1), max(y0, y1)
+
+    if color.upper() == '#FFFFFF':
+        draw.rectangle([x0 - 1, y0 - 1, x1 + 1, y1 + 1], outline='#000000', width=LINE_WIDTH)
+
+    draw.rectangle([x0, y0, x1, y1], outline=color, width=LINE_WIDTH)
+
+    if abs(x1 - x0) > HIGHLIGHT_MIN_SIZE and abs(y1 - y0) > HIGHLIGHT_MIN_SIZE:
+        # 内部填充稍微缩小，不覆盖边框；ImageDraw 的矩形包含右下角像素
+        box = (
+            max(0, x0 + LINE_WIDTH), max(0, y0 + LINE_WIDTH),
+            min(image.width, x1 - LINE_WIDTH + 1), min(image.height, y1 - LINE_WIDTH + 1)
+        )
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return
+        region = image.crop(box)
+        mode = region.mode
+        overlay = Image.new('RGBA', region.size, highlight_color(color))
+        blended = Image.alpha_composite(region.convert('RGBA'), overlay)
+        image.paste(blended.convert(mode) if mode != 'RGBA' else blended, box[:2])
+
+
+def draw_arrow(draw, x1, y1, x2, y2, color):
+    """
+    绘制箭头，白色标注加黑色辅助线
+
+    Args:
+        draw: 目标图像的 ImageDraw 对象
+        x1, y1: 起点
+        x2, y2: 终点（箭头所在端）
+        color: HEX颜色
+    """
+    angle = math.atan2(y2 - y1, x2 - x1)
+    x3 = x2 - ARROW_HEAD_LENGTH * math.cos(angle + ARROW_HEAD_ANGLE)
+    y3 = y2 - ARROW_HEAD_LENGTH * math.sin(angle + ARROW_HEAD_ANGLE)
+    x4 = x2 - ARROW_HEAD_LENGTH * math.cos(angle - ARROW_HEAD_ANGLE)
+    y4 = y2 - ARROW_HEAD_LENGTH * math.sin(angle - ARROW_HEAD_ANGLE)
+    segments = ([x1, y1, x2, y2], [x2, y2, x3, y3], [x2, y2, x4, y4], [x3, y3, x4, y4])
+
+    if color.upper() == '#FFFFFF':
+        for segment in segments:
+            draw.line(segment, fill='#000000', width=OUTLINE_WIDTH)
+    for segment in segments:
+        draw.line(segment, fill=color, width=LINE_WIDTH)
+
+
+def draw_text(draw, x, y, text, color, font_size=DEFAULT_FONT_SIZE):
+    """
+    绘制文字（使用字体注册表中缓存的中文字体）
+
+    Args:
+        draw: 目标图像的 ImageDraw 对象
+        x, y: 左上角位置
+        text: 文字
+        color: HEX颜色
+        font_size: 字号
+    """
+    draw.text((x, y), text, fill=color, font=get_font(font_size))
+
+
+def pixelate(image, box, block_size):
+    """
+    把图像区域替换为按块平均的马赛克
+
+    先用 reduce 一次求出所有块的平均色，再用最近邻放大回原尺寸，
+    不需要逐块裁剪和缩放。
+
+    Args:
+        image: 目标图像（原地修改）
+        box: 区域 (x0, y0, x1, y1)，超出图像的部分会被裁掉
+        block_size: 马赛克块大小（像素）
+    """
+    x0, y0, x1, y1 = box
+    x0, x1 = max(0, min(x0, x1)), min(image.width, max(x0, x1))
+    y0, y1 = max(0, min(y0, y1)), min(image.height, max(y0, y1))
+    width, height = x1 - x0, y1 - y0
+    if width <= 0 or height <= 0:
+        return
+
+    block_size = max(1, int(block_size))
+    region = image.crop((x0, y0, x1, y1))
+    # 尺寸不能整除时 reduce 向上取整，最后一块是剩余像素的平均值
+    small = region.reduce(block_size) if block_size > 1 else region
+    blocks = small.resize((small.width * block_size, small.height * block_size), Image.NEAREST)
+    image.paste(blocks.crop((0, 0, width, height)), (x0, y0))
+
+
+@traced("annotate.mosaic", "editor")
+def apply_mosaic(image, x0, y0, x1, y1, mosaic_size=DEFAULT_MOSAIC_SIZE):
+    """
+    对矩形区域应用马赛克，块大小不超过区域短边的1/4
+
+    Args:
+        image: 目标图像（原地修改）
+        x0, y0, x1, y1: 区域坐标
+        mosaic_size: 马赛克块大小上限
+    """
+    short_side = min(abs(x1 - x0), abs(y1 - y0))
+    pixelate(image, (x0, y0, x1, y1), max(5, min(mosaic_size, short_side // 4)))
+
+
+def smear_box(image, x, y, mosaic_size):
+    """计算以 (x, y) 为中心的涂抹区域，裁剪到图像范围内"""
+    half = mosaic_size // 2
+    return (max(0, x - half), max(0, y - half),
+            min(image.width, x + half), min(image.height, y + half))
+
+
+@traced("annotate.smear", "editor")
+def apply_mosaic_smear(image, x, y, mosaic_size=DEFAULT_MOSAIC_SIZE):
+    """
+    在 (x, y) 处涂抹一块马赛克
+
+    Args:
+        image: 目标图像（原地修改）
+        x, y: 涂抹中心
+        mosaic_size: 涂抹块大小
+
+    Returns:
+        tuple: 实际修改的区域 (x0, y0, x1, y1)
+    """
+    box = smear_box(image, x, y, mosaic_size)
+    width, height = box[2] - box[0], box[3] - box[1]
+    pixelate(image, box, max(3, min(mosaic_size, min(width, height))))
+    return box
+
+
+class AnnotationLayer:
+    """标注图层类
+
+    保存原图和按顺序添加的标注。每个标注添加时直接画到当前图像上；
+    撤销时从原图重放剩余的标注。
+    """
+
+    def __init__(self, image, font_size=DEFAULT_FONT_SIZE, mosaic_size=DEFAULT_MOSAIC_SIZE):
+        """初始化标注图层
+
+        Args:
+            image: 原始图像（会被复制，不修改传入的图像）
+            font_size: 默认字号
+            mosaic_size: 默认马赛克块大小
+        """
+        self.original_image = image.copy()
+        self.image = image.copy()
+        self.draw = ImageDraw.Draw(self.image)
+        self.annotations: List[Annotation] = []
+        self.font_size = font_size
+        self.mosaic_size = mosaic_size
+        self._smear_points = None
+
+    def _render(self, annotation: Annotation) -> None:
+        """把一个标注画到当前图像上"""
+        kind, coords, color, text, size = annotation
+        if kind == ANNOTATION_RECT:
+            draw_rectangle(self.image, self.draw, *coords, color)
+        elif kind == ANNOTATION_ARROW:
+            draw_arrow(self.draw, *coords, color)
+        elif kind == ANNOTATION_TEXT:
+            draw_text(self.draw, *coords, text, color, size or self.font_size)
+        elif kind == ANNOTATION_MOSAIC:
+            apply_mosaic(self.image, *coords, mosaic_size=size or self.mosaic_size)
+        elif kind == ANNOTATION_MOSAIC_SMEAR:
+            for x, y in coords:
+                apply_mosaic_smear(self.image, x, y, size or self.mosaic_size)
+
+    def add(self, annotation: Annotation) -> Annotation:
+        """
+        添加并绘制标注
+
+        Args:
+            annotation: 标注
+
+        Returns:
+            Annotation: 添加的标注
+        """
+        self._render(annotation)
+        self.annotations.append(annotation)
+        return annotation
+
+    def add_rectangle(self, x0, y0, x1, y1, color) -> Annotation:
+        """添加矩形标注（坐标会规整为左上、右下）"""
+        coords = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        return self.add(Annotation(ANNOTATION_RECT, coords, color))
+
+    def add_arrow(self, x1, y1, x2, y2, color) -> Annotation:
+        """添加箭头标注，箭头在 (x2, y2) 一端"""
+        return self.add(Annotation(ANNOTATION_ARROW, (x1, y1, x2, y2), color))
+
+    def add_text(self, x, y, text, color, font_size=None) -> Annotation:
+        """添加文字标注，记录当时的字号以便撤销重放时保持一致"""
+        return self.add(Annotation(ANNOTATION_TEXT, (x, y), color, text, font_size or self.font_size))
+
+    def add_mosaic(self, x0, y0, x1, y1, mosaic_size=None) -> Annotation:
+        """添加矩形马赛克"""
+        return self.add(Annotation(ANNOTATION_MOSAIC, (x0, y0, x1, y1), size=mosaic_size or self.mosaic_size))
+
+    def begin_smear(self) -> None:
+        """开始一次马赛克涂抹（鼠标按下）"""
+        self._smear_points = []
+
+    def smear(self, x, y, mosaic_size=None):
+        """
+        在当前涂抹中添加一个点并立即绘制
+
+        Args:
+            x, y: 涂抹中心
+            mosaic_size: 涂抹块大小
+
+        Returns:
+            tuple: 修改的区域 (x0, y0, x1, y1)
+        """
+        if self._smear_points is None:
+            self.begin_smear()
+        self._smear_points.append((x, y))
+        return apply_mosaic_smear(self.image, x, y, mosaic_size or self.mosaic_size)
+
+    def end_smear(self, mosaic_size=None) -> Optional[Annotation]:
+        """
+        结束涂抹（鼠标释放），把经过的点作为一个标注保存，撤销时可以重放
+
+        Returns:
+            Annotation: 涂抹标注，没有涂抹任何点时返回None
+        """
+        points, self._smear_points = self._smear_points, None
+        if not points:
+            return None
+        annotation = Annotation(ANNOTATION_MOSAIC_SMEAR, points, size=mosaic_size or self.mosaic_size)
+        self.annotations.append(annotation)
+        return annotation
+
+    @traced("annotate.replay", "editor")
+    def replay(self) -> None:
+        """从原图重新绘制所有标注"""
+        self.image = self.original_image.copy()
+        self.draw = ImageDraw.Draw(self.image)
+        for annotation in self.annotations:
+            self._render(annotation)
+
+    def undo(self) -> Optional[Annotation]:
+        """
+        撤销最后一个标注
+
+        Returns:
+            Annotation: 被撤销的标注，没有标注时返回None
+        """
+        if not self.annotations:
+            return None
+        annotation = self.annotations.pop()
+        self.replay()
+        return annotation
+
+    def clear(self) -> None:
+        """清除所有标注，恢复原图"""
+        self.annotations.clear()
+        self._smear_points = None
+        self.image = self.original_image.copy()
+        self.draw = ImageDraw.Draw(self.image)
+
+    def render(self) -> Image.Image:
+        """
+        获取带标注的图像副本
+
+        Returns:
+            PIL.Image: 图像
+        """
+        return self.image.copy()
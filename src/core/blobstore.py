@@ -0,0 +1,454 @@
+"""
+打包存储模块 - 把截图追加写入少量大段文件，代替每张截图一个文件，不依赖tkinter
+
+Windows 和网络共享上创建、查找、删除大量小文件的元数据开销远大于写入本身；打包存储只追加写入
+当前段文件（默认每段 256MB），读取通过 mmap 直接按偏移量取出。
+
+目录结构（保存目录/packs/）:
+    segments.json   当前有效的段文件列表和上次整理时的写入位置（只在新建段和整理时改写）
+    seg-000001.pack 段文件，由连续的条目组成
+    lock            跨进程写锁
+
+每个条目为 头部 + 名称 + 内容，头部记录类型（写入/删除）、名称长度、内容长度和 CRC32，
+因此偏移索引（名称 -> 段、偏移、长度）可以随时从段文件重建，不需要单独的索引文件；
+写到一半的末尾条目在重建时被忽略并截断。删除只追加一个删除条目，空间由 compact() 回收：
+把仍然有效的条目复制到新段，更新段列表后删除旧段。
+"""
+
+import os
+import json
+import mmap
+import contextlib
+import zlib
+import struct
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.core.filelock import FileLock
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 段文件的最大大小，超过后新建一段
+SEGMENT_SIZE = 256 * 1024 * 1024
+# 无效数据（已删除或被覆盖的条目）超过该比例时整理
+COMPACT_GARBAGE_RATIO = 0.3
+MANIFEST_NAME = "segments.json"
+LOCK_NAME = "lock"
+SEGMENT_PATTERN = "seg-{:06d}.pack"
+
+# 条目头部：标识、类型、名称长度、内容长度、内容的 CRC32
+_HEADER = struct.Struct("<4sBHII")
+_MAGIC = b"LHB1"
+_PUT = 1
+_DELETE = 2
+
+
+def _entry_size(key: str, location: "BlobLocation") -> int:
+    """条目在段文件中占用的大小"""
+    return _HEADER.size + len(key.encode("utf-8")) + location.length
+
+
+class BlobLocation(NamedTuple):
+    """一个截图在段文件中的位置"""
+    segment: str                # 段文件名
+    offset: int                 # 内容在段文件中的偏移量
+    length: int                 # 内容长度
+    crc: int                    # 内容的 CRC32
+
+
+class CompactResult(NamedTuple):
+    """整理结果"""
+    segments: int               # 整理的段数
+    dropped: int                # 丢弃的截图数（已删除或没有记录引用）
+    reclaimed_bytes: int        # 回收的空间
+
+
+class BlobStore:
+    """一个打包存储目录，同一目录在进程内只应有一个实例（见 get_blob_store）"""
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE):
+        """
+        Args:
+            directory: 打包存储目录，不存在时在第一次写入时创建
+            segment_size: 段文件的最大大小
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(directory, LOCK_NAME))
+        self._index: Dict[str, BlobLocation] = {}
+        self._segments: List[str] = []
+        # 段文件名 -> 已扫描到的位置（其他进程追加的条目从这里继续扫描）
+        self._scanned: Dict[str, int] = {}
+        self._maps: Dict[str, Tuple[mmap.mmap, int]] = {}
+        self._manifest_stamp = None
+        # 上次整理时当前段写到的位置 (段文件名, 偏移量)，之前写入的截图至少经过了一个整理周期
+        self._checkpoint: Optional[Tuple[str, int]] = None
+        with self._lock:
+            self.refresh()
+
+    # ---- 段列表和索引 ----
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self) -> Tuple[List[str], Optional[Tuple[str, int]]]:
+        try:
+            with open(self._path(MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            checkpoint = manifest.get("checkpoint")
+            return list(manifest.get("segments", [])), tuple(checkpoint) if checkpoint else None
+        except FileNotFoundError:
+            return [], None
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            # 段列表损坏时按文件名找回所有段文件
+            logger.error("打包存储段列表损坏，按段文件重建: %s", e)
+            return sorted(name for name in os.listdir(self.directory)
+                          if name.startswith("seg-") and name.endswith(".pack")), None
+
+    def _write_manifest(self, segments: List[str]) -> None:
+        temp_path = self._path(MANIFEST_NAME + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": segments, "checkpoint": self._checkpoint}, f)
+        os.replace(temp_path, self._path(MANIFEST_NAME))
+
+    def _manifest_changed(self) -> bool:
+        try:
+            stat = os.stat(self._path(MANIFEST_NAME))
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            stamp = None
+        if stamp == self._manifest_stamp:
+            return False
+        self._manifest_stamp = stamp
+        return True
+
+    def _close_maps(self, names: Optional[Iterable[str]] = None) -> None:
+        for name in list(names if names is not None else self._maps):
+            entry = self._maps.pop(name, None)
+            if entry is not None:
+                entry[0].close()
+
+    def refresh(self) -> None:
+        """读取其他进程新写入的条目；段列表变化（其他进程整理过）时重建索引"""
+        with self._lock:
+            if self._manifest_changed():
+                self._close_maps()
+                self._index = {}
+                self._scanned = {}
+                self._segments, self._checkpoint = self._read_manifest()
+            for name in self._segments:
+                self._scan(name, truncate=False)
+
+    def _scan(self, name: str, truncate: bool) -> None:
+        """从上次扫描到的位置继续扫描段文件，更新索引"""
+        path = self._path(name)
+        start = self._scanned.get(name, 0)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size <= start:
+            return
+        offset = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            while offset + _HEADER.size <= size:
+                header = f.read(_HEADER.size)
+                magic, kind, key_length, length, crc = _HEADER.unpack(header)
+                end = offset + _HEADER.size + key_length + length
+                if magic != _MAGIC or kind not in (_PUT, _DELETE) or end > size:
+                    break
+                key = f.read(key_length).decode("utf-8")
+                if kind == _PUT:
+                    self._index[key] = BlobLocation(name, offset + _HEADER.size + key_length, length, crc)
+                else:
+                    self._index.pop(key, None)
+                f.seek(end)
+                offset = end
+        if offset < size and truncate:
+            # 写到一半（进程崩溃）的末尾条目，持有写锁时截断
+            logger.warning("打包存储段 %s 末尾有不完整的条目，已截断 %s 字节", name, size - offset)
+            self._close_maps([name])
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        self._scanned[name] = offset
+
+    # ---- 读取 ----
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains(key)
+
+    def contains(self, key: str) -> bool:
+        """是否有该名称的截图"""
+        with self._lock:
+            if key not in self._index:
+                self.refresh()
+            return key in self._index
+
+    def keys(self) -> List[str]:
+        """所有截图的名称"""
+        with self._lock:
+            self.refresh()
+            return list(self._index)
+
+    def _map(self, name: str, end: int) -> mmap.mmap:
+        """获取段文件的只读映射，文件变长后重新映射"""
+        entry = self._maps.get(name)
+        if entry is None or entry[1] < end:
+            self._close_maps([name])
+            with open(self._path(name), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                entry = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), size)
+            self._maps[name] = entry
+        return entry[0]
+
+    @traced("blobstore.get", "io")
+    def get(self, key: str) -> bytes:
+        """
+        读取截图内容
+
+        Raises:
+            KeyError: 没有该名称的截图
+            OSError: 段文件无法读取或内容校验失败
+        """
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                self.refresh()
+                location = self._index.get(key)
+            if location is None:
+                raise KeyError(key)
+            try:
+                view = self._map(location.segment, location.offset + location.length)
+            except FileNotFoundError:
+                # 其他进程刚整理过，段文件已删除
+                self._manifest_stamp = None
+                self.refresh()
+                location = self._index.get(key)
+                if location is None:
+                    raise KeyError(key)
+                view = self._map(location.segment, location.offset + location.length)
+            data = view[location.offset:location.offset + location.length]
+        if zlib.crc32(data) != location.crc:
+            raise OSError(f"打包存储中的截图已损坏: {key}")
+        return data
+
+    # ---- 写入 ----
+
+    def _active_segment(self, needed: int) -> str:
+        """当前追加写入的段，放不下时新建一段（需持有写锁）"""
+        if self._segments:
+            name = self._segments[-1]
+            try:
+                size = os.path.getsize(self._path(name))
+            except OSError:
+                size = 0
+            if size == 0 or size + needed <= self.segment_size:
+                return name
+        number = max((int(name[4:10]) for name in self._segments), default=0) + 1
+        name = SEGMENT_PATTERN.format(number)
+        self._segments.append(name)
+        self._write_manifest(self._segments)
+        self._manifest_changed()
+        return name
+
+    def _append(self, kind: int, key: str, data: bytes = b"") -> BlobLocation:
+        """在当前段末尾追加一个条目（需持有写锁）"""
+        key_bytes = key.encode("utf-8")
+        crc = zlib.crc32(data)
+        header = _HEADER.pack(_MAGIC, kind, len(key_bytes), len(data), crc)
+        name = self._active_segment(len(header) + len(key_bytes) + len(data))
+        with open(self._path(name), "ab") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(header + key_bytes + data)
+        end = offset + len(header) + len(key_bytes) + len(data)
+        self._scanned[name] = end
+        return BlobLocation(name, offset + len(header) + len(key_bytes), len(data), crc)
+
+    @contextlib.contextmanager
+    def _write_locked(self):
+        """进程内和跨进程的写锁，获得后先读取其他进程写入的条目，并截断崩溃留下的不完整条目"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with self._file_lock:
+                self.refresh()
+                if self._segments:
+                    self._scan(self._segments[-1], truncate=True)
+                yield
+
+    def unique_key(self, key: str) -> str:
+        """生成不与已有截图重名的名称（重名时在名称后加 _1、_2 …）"""
+        base, ext = os.path.splitext(key)
+        candidate = key
+        index = 1
+        with self._lock:
+            while candidate in self._index:
+                candidate = f"{base}_{index}{ext}"
+                index += 1
+        return candidate
+
+    @traced("blobstore.put", "io")
+    def put(self, key: str, data: bytes, unique: bool = True) -> str:
+        """
+        追加写入一个截图
+
+        Args:
+            key: 名称（通常为截图文件名）
+            data: 编码后的图片内容
+            unique: 重名时改用新名称；为False时覆盖同名截图
+
+        Returns:
+            str: 实际使用的名称
+        """
+        with self._write_locked():
+            if unique:
+                key = self.unique_key(key)
+            self._index[key] = self._append(_PUT, key, data)
+        return key
+
+    @traced("blobstore.delete", "io")
+    def delete(self, key: str) -> bool:
+        """
+        删除截图（追加删除条目，空间在整理时回收）
+
+        Returns:
+            bool: 是否有该截图
+        """
+        with self._write_locked():
+            if key not in self._index:
+                return False
+            self._append(_DELETE, key)
+            del self._index[key]
+        return True
+
+    # ---- 整理 ----
+
+    def garbage_ratio(self) -> float:
+        """段文件中无效数据所占的比例"""
+        with self._lock:
+            self.refresh()
+            total = sum(self._scanned.get(name, 0) for name in self._segments)
+            live = sum(_entry_size(key, location) for key, location in self._index.items())
+        return 1 - live / total if total else 0.0
+
+    @traced("blobstore.compact", "io")
+    def compact(self, live_keys: Optional[Set[str]] = None,
+                min_garbage_ratio: float = COMPACT_GARBAGE_RATIO) -> CompactResult:
+        """
+        回收已删除截图占用的空间
+
+        无效数据占全部段文件的比例达到 min_garbage_ratio 时，所有含无效数据的段都被整理：
+        仍然有效的截图复制到新段末尾，更新段列表后删除旧段。只整理部分段可能删掉删除条目
+        而留下被它删除的旧内容，重建索引时截图会重新出现，所以不按段单独判断。
+
+        Args:
+            live_keys: 仍被记录引用的名称；给出时不在其中的截图也会被丢弃。保存截图时先写入打包存储
+                再添加记录，刚写入的截图可能还没有记录，所以只丢弃上次整理之前写入的截图，
+                之后写入的在下一次整理时再判断
+            min_garbage_ratio: 整理的阈值，为0时只要有无效数据就整理
+
+        Returns:
+            CompactResult: 整理结果
+        """
+        with self._write_locked():
+            dropped = [key for key, location in self._index.items()
+                       if live_keys is not None and key not in live_keys and self._before_checkpoint(location)]
+            for key in dropped:
+                del self._index[key]
+            # 每个段中仍然有效的条目大小（头部 + 名称 + 内容），其余都是无效数据
+            live_by_segment: Dict[str, int] = {}
+            for key, location in self._index.items():
+                live_by_segment[location.segment] = live_by_segment.get(location.segment, 0) + _entry_size(key, location)
+
+            total = sum(self._scanned.get(name, 0) for name in self._segments)
+            live = sum(live_by_segment.values())
+            targets = [name for name in self._segments if self._scanned.get(name, 0) > live_by_segment.get(name, 0)]
+            if not targets or not total or (total - live) / total < min_garbage_ratio:
+                for key in dropped:
+                    self._append(_DELETE, key)
+                if live_keys is not None:
+                    self._set_checkpoint()
+                return CompactResult(0, len(dropped), 0)
+
+            old_size = sum(self._scanned.get(name, 0) for name in targets)
+            target_set = set(targets)
+            moving = sorted(((key, location) for key, location in self._index.items()
+                             if location.segment in target_set),
+                            key=lambda item: (item[1].segment, item[1].offset))
+            # 复制的条目写入新段；中途崩溃时新段在段列表最后，重建索引时覆盖旧段中的同名条目
+            self._segments.append(SEGMENT_PATTERN.format(max(int(name[4:10]) for name in self._segments) + 1))
+            self._write_manifest(self._segments)
+            for key, location in moving:
+                view = self._map(location.segment, location.offset + location.length)
+                self._index[key] = self._append(_PUT, key, view[location.offset:location.offset + location.length])
+            self._segments = [name for name in self._segments if name not in target_set]
+            if live_keys is not None:
+                self._checkpoint = (self._segments[-1], self._scanned.get(self._segments[-1], 0))
+            self._write_manifest(self._segments)
+            self._manifest_changed()
+            self._close_maps(targets)
+            for name in targets:
+                self._scanned.pop(name, None)
+                try:
+                    os.remove(self._path(name))
+                except OSError as e:
+                    # 其他进程仍在读取（Windows）时删除失败；段已不在列表中，下次整理时再删除
+                    logger.warning("删除打包存储旧段失败: %s (%s)", name, e)
+            self._remove_unlisted()
+        reclaimed = old_size - sum(_entry_size(key, location) for key, location in moving)
+        logger.info("打包存储整理：%s 个段，丢弃 %s 个截图，回收 %s 字节", len(targets), len(dropped), reclaimed)
+        return CompactResult(len(targets), len(dropped), reclaimed)
+
+    def _before_checkpoint(self, location: BlobLocation) -> bool:
+        """截图是否在上次整理之前写入（需持有写锁）"""
+        if self._checkpoint is None:
+            return False
+        segment, offset = self._checkpoint
+        if segment not in self._segments:
+            # 检查点所在的段已被不带 live_keys 的整理删除，无法判断先后，全部保留到下次整理
+            return False
+        position = self._segments.index(segment)
+        index = self._segments.index(location.segment)
+        return index < position or (index == position and location.offset < offset)
+
+    def _set_checkpoint(self) -> None:
+        """记录当前段写到的位置，下次整理时丢弃在此之前写入、仍没有记录引用的截图（需持有写锁）"""
+        segment = self._segments[-1] if self._segments else None
+        checkpoint = (segment, self._scanned.get(segment, 0)) if segment else None
+        if checkpoint != self._checkpoint:
+            self._checkpoint = checkpoint
+            self._write_manifest(self._segments)
+            self._manifest_changed()
+
+    def _remove_unlisted(self) -> None:
+        """删除之前没能删除、已不在段列表中的旧段"""
+        listed = set(self._segments)
+        for name in os.listdir(self.directory):
+            if name.startswith("seg-") and name.endswith(".pack") and name not in listed:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        """关闭所有映射"""
+        with self._lock:
+            self._close_maps()
+
+
+_stores: Dict[str, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(directory: str) -> BlobStore:
+    """获取目录对应的打包存储（同一目录在进程内共用一个实例）"""
+    key = os.path.normcase(os.path.abspath(directory))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BlobStore(directory)
+        return store
@@ -0,0 +1,372 @@
+"""
+记录导出模块 - 把记录流式写出为 CSV、JSON Lines、XLSX，或连同截图打包为 ZIP/TAR，不依赖tkinter
+
+记录以迭代器传入（通常是 RecordStore.iter_search 的结果），按块写出，不在内存中
+构造完整的表格；XLSX 用标准库 zipfile 直接写入工作表XML，不需要第三方库。
+打包导出时截图按文件分块复制进归档，PNG/JPEG 等已压缩格式直接存储不再压缩。
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import tarfile
+import zipfile
+import tempfile
+import datetime
+import threading
+import itertools
+from xml.sax.saxutils import escape
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.core.screenshots import read_image_bytes, resolve_image_path, split_archive_path
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 支持的导出格式（zip/tar 为包含截图的归档）
+EXPORT_FORMATS = ("csv", "jsonl", "xlsx", "zip", "tar")
+ARCHIVE_FORMATS = ("zip", "tar")
+# 导出的列：(记录字段, 表头)
+EXPORT_COLUMNS = [
+    ("id", "ID"),
+    ("task_name", "项目/事务"),
+    ("timestamp", "时间"),
+    ("notes", "附加说明"),
+    ("image_path", "图片路径"),
+    ("created_at", "创建时间"),
+    ("updated_at", "更新时间"),
+]
+# 归档中 records.csv 的列：在导出列之后加上截图在归档中的位置
+ARCHIVE_CSV_COLUMNS = EXPORT_COLUMNS + [
+    ("archive_path", "归档中的截图"),
+    ("missing", "截图缺失"),
+]
+# 每写出多少条记录报告一次进度并检查是否取消
+CHUNK_SIZE = 1000
+# 打包截图时每块的记录数（每条记录要复制一个文件，块小一些进度和取消更及时）
+ARCHIVE_CHUNK_SIZE = 20
+
+# 归档中已压缩的图片格式，直接存储（ZIP_STORED），再压缩只会浪费时间
+COMPRESSED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# 归档中的清单文件
+MANIFEST_NAME = "manifest.jsonl"
+RECORDS_CSV_NAME = "records.csv"
+# 清单超过该大小时才写入临时文件
+MANIFEST_SPOOL_BYTES = 4 * 1024 * 1024
+
+# XML 1.0 不允许的控制字符（制表符、换行、回车除外）
+_XML_ILLEGAL = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+
+
+def guess_format(path: str, default: str = "csv") -> str:
+    """按文件扩展名判断导出格式
+
+    Args:
+        path: 输出文件路径
+        default: 无法判断时使用的格式
+
+    Returns:
+        str: EXPORT_FORMATS 中的一种
+    """
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "json", "ndjson"):
+        return "jsonl"
+    if ext in ("xlsx", "csv", "zip", "tar"):
+        return ext
+    return default
+
+
+def iter_chunks(records: Iterable[Dict[str, Any]], size: int = CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """把记录迭代器切成固定大小的块"""
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _row_values(record: Dict[str, Any], columns=EXPORT_COLUMNS) -> List[Any]:
+    """按导出列取出记录的字段值"""
+    return [record.get(field, "") for field, _ in columns]
+
+
+def _write_csv(stream, chunks, on_chunk, columns=EXPORT_COLUMNS) -> None:
+    """写出CSV"""
+    writer = csv.writer(stream)
+    writer.writerow([label for _, label in columns])
+    for chunk in chunks:
+        writer.writerows(_row_values(record, columns) for record in chunk)
+        on_chunk(len(chunk))
+
+
+def _write_jsonl(stream, chunks, on_chunk) -> None:
+    """写出JSON Lines，每行一条完整记录"""
+    for chunk in chunks:
+        stream.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in chunk))
+        on_chunk(len(chunk))
+
+
+def _xlsx_cell(value: Any) -> str:
+    """生成一个工作表单元格，数字直接写值，其余写为内联字符串"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(str(value if value is not None else "").translate(_XML_ILLEGAL))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values: List[Any]) -> str:
+    """生成一行工作表XML"""
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="记录" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _write_xlsx(path: str, chunks, on_chunk) -> None:
+    """写出只有一个工作表的XLSX文件，工作表XML逐块压缩写入"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row([label for _, label in EXPORT_COLUMNS])
+            ).encode("utf-8"))
+            for chunk in chunks:
+                sheet.write("".join(_xlsx_row(_row_values(record)) for record in chunk).encode("utf-8"))
+                on_chunk(len(chunk))
+            sheet.write(b"</sheetData></worksheet>")
+
+
+def _archive_name(record: Dict[str, Any], used: set) -> str:
+    """生成截图在归档中的路径 images/YYYY-MM-DD/文件名，重名时加序号"""
+    day = str(record.get("timestamp", ""))[:10] or "unknown"
+    base, ext = os.path.splitext(os.path.basename(record.get("image_path", "")))
+    name = f"images/{day}/{base}{ext}"
+    index = 1
+    while name in used:
+        name = f"images/{day}/{base}_{index}{ext}"
+        index += 1
+    used.add(name)
+    return name
+
+
+def _write_archive(path: str, fmt: str, chunks, on_chunk) -> None:
+    """写出包含截图和清单的 ZIP/TAR 归档
+
+    截图按记录顺序逐个写入（zipfile/tarfile 分块读取源文件，不会整个读入内存）；
+    截图路径先用 resolve_image_path 查找，目录结构迁移后记录中的旧路径也能找到文件。
+    清单 manifest.jsonl 每行是一条完整记录，archive_path 为截图在归档中的路径，
+    截图文件不存在时为空并标记 missing。records.csv 是导出列加上 archive_path、missing
+    两列的表格，便于直接查看（记录中的其他字段只在清单中）。
+    """
+    used = set()
+    manifest = tempfile.SpooledTemporaryFile(MANIFEST_SPOOL_BYTES, mode="w+", encoding="utf-8", newline="")
+    if fmt == "zip":
+        archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+    else:
+        # TAR 不压缩，整个归档的大小与截图总大小相当
+        archive = tarfile.open(path, "w", format=tarfile.PAX_FORMAT)
+
+    def add_file(source, name):
+        if split_archive_path(source):
+            # 已归档的截图从归档文件中读出后写入
+            data = read_image_bytes(source)
+            if fmt == "zip":
+                archive.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        elif fmt == "zip":
+            ext = os.path.splitext(name)[1].lower()
+            compress = zipfile.ZIP_STORED if ext in COMPRESSED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            archive.write(source, name, compress_type=compress)
+        else:
+            archive.add(source, name, recursive=False)
+
+    try:
+        for chunk in chunks:
+            for record in chunk:
+                entry = dict(record)
+                source = resolve_image_path(record.get("image_path", ""), record.get("timestamp"))
+                if source:
+                    entry["archive_path"] = _archive_name(record, used)
+                    add_file(source, entry["archive_path"])
+                else:
+                    entry["archive_path"] = ""
+                    entry["missing"] = True
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            on_chunk(len(chunk))
+
+        with tempfile.TemporaryDirectory(prefix="liuhen_export_") as temp_dir:
+            manifest.seek(0)
+            manifest_path = os.path.join(temp_dir, MANIFEST_NAME)
+            with open(manifest_path, "w", encoding="utf-8", newline="") as f:
+                for line in manifest:
+                    f.write(line)
+            manifest.seek(0)
+            csv_path = os.path.join(temp_dir, RECORDS_CSV_NAME)
+            with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+                rows = (json.loads(line) for line in manifest)
+                _write_csv(f, iter_chunks(rows), lambda size: None, ARCHIVE_CSV_COLUMNS)
+            if fmt == "zip":
+                archive.write(manifest_path, MANIFEST_NAME)
+                archive.write(csv_path, RECORDS_CSV_NAME)
+            else:
+                archive.add(manifest_path, MANIFEST_NAME)
+                archive.add(csv_path, RECORDS_CSV_NAME)
+    finally:
+        archive.close()
+        manifest.close()
+
+
+@traced("export.records", "io")
+def export_records(records: Iterable[Dict[str, Any]], path: str, fmt: Optional[str] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> int:
+    """流式导出记录
+
+    先写入同目录下的临时文件，完成后替换目标文件；出错或取消时删除临时文件，
+    不会留下写了一半的导出文件。
+
+    Args:
+        records: 记录迭代器
+        path: 输出文件路径，为 - 时输出到标准输出（仅 CSV / JSON Lines）
+        fmt: 导出格式，为None时按扩展名判断
+        progress: 进度回调，参数为已导出的记录数，每写出一块调用一次（在调用线程中）
+        cancel_event: 设置后在下一块开始前停止并抛出 ExportCancelled
+
+    Returns:
+        int: 导出的记录数
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    count = 0
+
+    def on_chunk(size):
+        nonlocal count
+        count += size
+        if progress:
+            progress(count)
+
+    def checked_chunks():
+        size = ARCHIVE_CHUNK_SIZE if fmt in ARCHIVE_FORMATS else CHUNK_SIZE
+        for chunk in iter_chunks(records, size):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+            yield chunk
+
+    if path == "-":
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"{fmt.upper()}格式不能输出到标准输出")
+        writer = _write_csv if fmt == "csv" else _write_jsonl
+        writer(sys.stdout, checked_chunks(), on_chunk)
+        return count
+
+    temp_path = f"{path}.part"
+    try:
+        if fmt in ARCHIVE_FORMATS:
+            _write_archive(temp_path, fmt, checked_chunks(), on_chunk)
+        elif fmt == "xlsx":
+            _write_xlsx(temp_path, checked_chunks(), on_chunk)
+        else:
+            # CSV带BOM，Excel可以直接识别中文
+            encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+            with open(temp_path, "w", newline="", encoding=encoding) as f:
+                (_write_csv if fmt == "csv" else _write_jsonl)(f, checked_chunks(), on_chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logger.info("已导出 %s 条记录到 %s", count, path)
+    return count
+
+
+def export_in_background(records: Iterable[Dict[str, Any]], path: str, fmt: Optional[str] = None,
+                         progress: Optional[Callable[[int], None]] = None,
+                         done: Optional[Callable[[int, Optional[Exception]], None]] = None,
+                         cancel_event: Optional[threading.Event] = None) -> threading.Thread:
+    """在后台线程中导出记录
+
+    回调都在导出线程中调用，不能直接操作 Tk 控件；界面代码见 src.utils.ui_queue.UIEventQueue。
+
+    Args:
+        records: 记录迭代器（在导出线程中消费）
+        path: 输出文件路径
+        fmt: 导出格式，为None时按扩展名判断
+        progress: 进度回调，参数为已导出的记录数
+        done: 完成回调，参数为 (导出的记录数, 异常或None)；取消时异常为 ExportCancelled
+        cancel_event: 用于取消导出
+
+    Returns:
+        threading.Thread: 导出线程
+    """
+    def run():
+        try:
+            count = export_records(records, path, fmt, progress, cancel_event)
+        except Exception as e:
+            if not isinstance(e, ExportCancelled):
+                logger.error("导出记录失败: %s", e)
+            if done:
+                done(0, e)
+            return
+        if done:
+            done(count, None)
+
+    thread = threading.Thread(target=run, name="RecordsExport", daemon=True)
+    thread.start()
+    return thread
+
+
+def default_export_name(fmt: str = "csv") -> str:
+    """生成默认的导出文件名"""
+    return f"留痕记录_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
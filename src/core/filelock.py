@@ -0,0 +1,124 @@
+"""
+跨进程文件锁 - 多个程序实例或脚本同时读写同一个记录文件时串行化写操作，不依赖tkinter
+
+Windows 使用 msvcrt.locking，其他系统使用 fcntl.flock；锁加在单独的 .lock 文件上，
+进程退出（包括崩溃）时操作系统会自动释放。
+"""
+
+import os
+import sys
+import time
+import threading
+
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# 获取锁的默认超时（秒）
+DEFAULT_TIMEOUT = 10.0
+# 等待锁时的轮询间隔（秒）
+POLL_INTERVAL = 0.01
+
+
+class FileLockTimeout(TimeoutError):
+    """在超时时间内没有获得文件锁"""
+
+
+class FileLock:
+    """跨进程的排他文件锁，同一对象在同一线程中可重入
+
+    用法:
+        lock = FileLock("records.json.lock")
+        with lock:
+            ...
+    """
+
+    def __init__(self, path: str, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            path: 锁文件路径，不存在时自动创建
+            timeout: 获取锁的超时（秒）
+        """
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+        self._depth = 0
+        # 同一进程内的线程先在这里排队，再竞争文件锁
+        self._thread_lock = threading.RLock()
+
+    def _try_lock(self, fd) -> bool:
+        """尝试以非阻塞方式加锁"""
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(self, fd) -> None:
+        """释放文件锁"""
+        if sys.platform == "win32":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def acquire(self) -> None:
+        """获取锁
+
+        Raises:
+            FileLockTimeout: 超时仍未获得锁（另一个进程长时间持有）
+        """
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise FileLockTimeout(f"等待文件锁超时: {self.path}")
+        if self._depth:
+            self._depth += 1
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + self.timeout
+            while not self._try_lock(fd):
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise FileLockTimeout(f"等待文件锁超时: {self.path}")
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+        self._depth = 1
+
+    def release(self) -> None:
+        """释放锁"""
+        self._depth -= 1
+        if not self._depth:
+            fd, self._fd = self._fd, None
+            try:
+                self._unlock(fd)
+            except OSError as e:
+                logger.warning("释放文件锁失败: %s", e)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    @property
+    def is_held(self) -> bool:
+        """当前是否持有锁"""
+        return self._depth > 0
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -0,0 +1,261 @@
+"""
+截图完整性检查模块 - 找出没有记录引用的孤立截图和图片丢失的记录，并批量修复，不依赖tkinter
+
+扫描用 os.scandir 遍历截图目录（含子目录），与记录快照在一次遍历中比较；
+目录中的文件不再逐个 stat 检查是否存在，只有记录路径处没有文件的记录才用 resolve_image_path
+在另一种目录结构中查找；十万级文件也只需几秒，可在后台线程中运行。
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.config import SCREENSHOT_DIR
+from src.core.records import RecordStore
+from src.core.screenshots import (
+    ARCHIVE_DIR_NAME, IMAGE_EXTENSIONS, PACK_DIR_NAME, THUMBNAIL_DIR_NAME, get_save_dir, image_exists,
+    resolve_image_path, split_archive_path
+)
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 每扫描多少个文件报告一次进度并检查是否取消
+PROGRESS_EVERY = 1000
+
+
+class ScanCancelled(Exception):
+    """扫描被取消"""
+
+
+class IntegrityReport(NamedTuple):
+    """完整性检查结果"""
+    directories: List[str]              # 扫描的目录
+    files: int                          # 目录中的图片文件数
+    total_bytes: int                    # 目录中图片文件的总大小
+    referenced_bytes: int               # 有记录引用的文件总大小
+    orphans: List[Tuple[str, int]]      # 没有记录引用的文件 (路径, 大小)
+    missing: List[int]                  # 图片文件不存在的记录ID
+
+    @property
+    def orphan_bytes(self) -> int:
+        """孤立文件的总大小"""
+        return sum(size for _, size in self.orphans)
+
+
+def path_key(path: str) -> str:
+    """用于比较的路径（绝对路径、统一斜杠，Windows 下不区分大小写）"""
+    return os.path.normcase(os.path.abspath(path)).replace("\\", "/")
+
+
+def screenshot_dirs() -> List[str]:
+    """默认扫描的截图目录：默认保存目录和自定义保存目录（存在且不重复的）"""
+    directories = []
+    for directory in (SCREENSHOT_DIR, get_save_dir()):
+        if os.path.isdir(directory) and path_key(directory) not in {path_key(d) for d in directories}:
+            directories.append(directory)
+    return directories
+
+
+def format_size(size: int) -> str:
+    """格式化文件大小"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+@traced("integrity.scan", "io")
+def scan_integrity(store: RecordStore, directories: Optional[Iterable[str]] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> IntegrityReport:
+    """
+    比较截图目录和记录，找出孤立文件和丢失图片的记录
+
+    Args:
+        store: 记录库
+        directories: 要扫描的目录，默认为 screenshot_dirs()
+        progress: 进度回调，参数为已扫描的文件数
+        cancel_event: 设置后停止扫描并抛出 ScanCancelled
+
+    Returns:
+        IntegrityReport: 检查结果
+    """
+    directories = list(directories) if directories is not None else screenshot_dirs()
+
+    store.refresh()
+    # 路径 -> 引用该路径的记录ID
+    referenced: Dict[str, List[int]] = {}
+    # 路径 -> 记录中的原始路径和记录时间（用于在另一种目录结构中查找）
+    sources: Dict[str, Tuple[str, Optional[str]]] = {}
+    # 已归档的截图：归档文件 -> 引用其中截图的记录ID（只检查归档文件是否存在）
+    archived: Dict[str, List[int]] = {}
+    # 打包存储的截图在打包存储的索引中逐个检查
+    packed: List[Tuple[int, str]] = []
+    for record in store.snapshot():
+        image_path = record.get("image_path")
+        if not image_path:
+            continue
+        parts = split_archive_path(image_path)
+        if parts and os.path.basename(parts[0]) == PACK_DIR_NAME:
+            packed.append((record.get("id"), image_path))
+        elif parts:
+            archived.setdefault(parts[0], []).append(record.get("id"))
+        else:
+            key = path_key(image_path)
+            referenced.setdefault(key, []).append(record.get("id"))
+            sources.setdefault(key, (image_path, record.get("timestamp")))
+
+    seen = set()
+    visited = set()
+    # 路径 -> (文件路径, 大小)
+    unreferenced: Dict[str, Tuple[str, int]] = {}
+    files = total_bytes = referenced_bytes = 0
+    # 归档、预览图和打包存储文件夹由各自的模块管理，不作为截图扫描
+    managed = {path_key(os.path.join(d, name)) for d in directories
+               for name in (ARCHIVE_DIR_NAME, THUMBNAIL_DIR_NAME, PACK_DIR_NAME)}
+    pending = [d for d in directories if os.path.isdir(d)]
+    while pending:
+        current = pending.pop()
+        current_key = path_key(current)
+        # 默认目录和自定义目录可能互相包含，同一目录只扫描一次
+        if current_key in visited or current_key in managed:
+            continue
+        visited.add(current_key)
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                        continue
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue
+                    files += 1
+                    total_bytes += size
+                    key = path_key(entry.path)
+                    if key in referenced:
+                        seen.add(key)
+                        referenced_bytes += size
+                    else:
+                        unreferenced[key] = (entry.path, size)
+                    if files % PROGRESS_EVERY == 0:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise ScanCancelled()
+                        if progress:
+                            progress(files)
+        except OSError as e:
+            logger.warning("无法读取目录 %s: %s", current, e)
+
+    # 记录路径处没有文件时，截图可能在另一种目录结构中（迁移中断或在其他电脑上改变了结构），
+    # 按 resolve_image_path 找到的文件仍算作被引用；只有这些记录需要逐个检查
+    missing = []
+    for key, record_ids in referenced.items():
+        if key in seen:
+            continue
+        image_path, timestamp = sources[key]
+        resolved = resolve_image_path(image_path, timestamp)
+        if resolved is None:
+            missing.extend(record_ids)
+            continue
+        found = unreferenced.pop(path_key(resolved), None)
+        if found is not None:
+            referenced_bytes += found[1]
+    for archive_file, record_ids in archived.items():
+        if not os.path.isfile(archive_file):
+            missing.extend(record_ids)
+    missing.extend(record_id for record_id, image_path in packed if not image_exists(image_path))
+    missing.sort()
+
+    orphans = sorted(unreferenced.values())
+    logger.info("完整性检查：%s 个文件，孤立文件 %s 个，缺少图片的记录 %s 条", files, len(orphans), len(missing))
+    return IntegrityReport(directories, files, total_bytes, referenced_bytes, orphans, missing)
+
+
+@traced("integrity.repair", "io")
+def repair_integrity(store: RecordStore, report: IntegrityReport, delete_orphans: bool = False,
+                     remove_missing: bool = False) -> Tuple[int, int, List[str]]:
+    """
+    按检查结果批量修复
+
+    修复前会再次确认：被重新引用的孤立文件不删除，图片已经恢复的记录不移除。
+
+    Args:
+        store: 记录库
+        report: scan_integrity 的结果
+        delete_orphans: 删除没有记录引用的文件
+        remove_missing: 删除图片文件不存在的记录（在一个事务中完成，只写入一次记录文件）
+
+    Returns:
+        tuple: (删除的文件数, 删除的记录数, 失败信息列表)
+    """
+    deleted_files = 0
+    failures = []
+    if delete_orphans and report.orphans:
+        store.refresh()
+        referenced = {path_key(resolve_image_path(r.get("image_path"), r.get("timestamp")) or r.get("image_path", ""))
+                      for r in store.snapshot() if r.get("image_path")}
+        for path, _ in report.orphans:
+            if path_key(path) in referenced:
+                continue
+            try:
+                os.remove(path)
+                deleted_files += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                failures.append(f"{path}: {e}")
+
+    removed_records = 0
+    if remove_missing and report.missing:
+        with store.batch():
+            record_ids = []
+            for record_id in report.missing:
+                record = store.get_record_by_id(record_id)
+                if record is not None and resolve_image_path(record.get("image_path"), record.get("timestamp")) is None:
+                    record_ids.append(record_id)
+            removed_records = len(store.delete_records(record_ids))
+
+    if failures:
+        logger.warning("有 %s 个孤立文件删除失败", len(failures))
+    logger.info("完整性修复：删除文件 %s 个，删除记录 %s 条", deleted_files, removed_records)
+    return deleted_files, removed_records, failures
+
+
+def scan_in_background(store: RecordStore, done: Callable[[Optional[IntegrityReport], Optional[Exception]], None],
+                       progress: Optional[Callable[[int], None]] = None,
+                       cancel_event: Optional[threading.Event] = None,
+                       directories: Optional[Iterable[str]] = None) -> threading.Thread:
+    """
+    在后台线程中执行完整性检查
+
+    回调都在扫描线程中调用，不能直接操作 Tk 控件（包括 after()），
+    界面代码应把结果放入 src.utils.ui_queue.UIEventQueue 由界面线程取出。
+
+    Args:
+        store: 记录库
+        done: 完成回调，参数为 (检查结果或None, 异常或None)
+        progress: 进度回调，参数为已扫描的文件数
+        cancel_event: 用于取消扫描
+        directories: 要扫描的目录，默认为 screenshot_dirs()
+
+    Returns:
+        threading.Thread: 扫描线程
+    """
+    def run():
+        try:
+            report = scan_integrity(store, directories, progress, cancel_event)
+        except Exception as e:
+            if not isinstance(e, ScanCancelled):
+                logger.error("完整性检查失败: %s", e)
+            done(None, e)
+            return
+        done(report, None)
+
+    thread = threading.Thread(target=run, name="IntegrityScan", daemon=True)
+    thread.start()
+    return thread
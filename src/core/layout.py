@@ -0,0 +1,236 @@
+"""
+截图目录结构迁移模块 - 把已有截图在 平铺 和 按日期分文件夹（YYYY/MM/DD）之间移动并批量改写记录路径，不依赖tkinter
+
+先逐个移动文件（同一磁盘内只是改名），最后在一个事务中改写所有移动过的记录路径，
+记录文件只写入一次；移动期间被其他窗口或进程修改、删除的记录不会被覆盖。迁移中途取消或出错时，已移动文件的路径同样会写入；即使程序崩溃，
+resolve_image_path 也能在两种结构中找到文件，再次运行迁移会补齐记录路径。
+"""
+
+import os
+import shutil
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from src.core.integrity import path_key, screenshot_dirs
+from src.core.records import RecordStore
+from src.core.screenshots import (
+    DIRECTORY_LAYOUTS, capture_date, date_subdir, resolve_image_path, split_archive_path, unique_path
+)
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 每处理多少条记录报告一次进度并检查是否取消
+PROGRESS_EVERY = 500
+
+
+class MigrationResult(NamedTuple):
+    """迁移结果"""
+    moved: int                  # 移动的文件数（dry_run 时为需要移动的文件数）
+    updated: int                # 改写路径的记录数（dry_run 时为文件不需移动、只需修正路径的记录数）
+    skipped: int                # 不在截图保存目录中、保持原位的记录数
+    missing: int                # 找不到图片文件的记录数
+    failures: List[str]         # 移动失败的文件
+    cancelled: bool             # 是否中途取消
+
+
+def _remove_empty_dirs(directory: str, root: str) -> None:
+    """删除迁移后留下的空日期文件夹（一直向上到保存目录为止，保存目录本身保留）"""
+    root_key = path_key(root)
+    while path_key(directory) != root_key and path_key(directory).startswith(root_key + "/"):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+
+def _commit_paths(store: RecordStore, new_paths: Dict[int, str], expected: Dict[int, str],
+                  origins: Dict[str, str], failures: List[str]) -> int:
+    """
+    在一个事务中改写移动过的记录路径，返回改写的记录数
+
+    只改写图片路径仍与快照相同的记录。移动期间被修改或删除的记录保持不变：
+    没有任何记录改用的文件，记录已删除时一并删除，否则移回原位置。
+    """
+    with store.batch():
+        paths = {}
+        deleted = set()
+        for record_id, path in new_paths.items():
+            current = store.get_record_by_id(record_id)
+            if current is None:
+                deleted.add(record_id)
+            elif current.get("image_path") == expected[record_id]:
+                paths[record_id] = path
+        updated = store.set_image_paths(paths) if paths else 0
+
+    committed = {path_key(path) for path in paths.values()}
+    for target, source in origins.items():
+        if path_key(target) in committed:
+            continue
+        owners = [record_id for record_id, path in new_paths.items() if path == target]
+        try:
+            if all(record_id in deleted for record_id in owners):
+                os.remove(target)
+            elif not os.path.exists(source):
+                shutil.move(target, source)
+        except OSError as e:
+            failures.append(f"{target}: {e}")
+    return updated
+
+
+@traced("layout.migrate", "io")
+def migrate_layout(store: RecordStore, layout: str, directories: Optional[List[str]] = None,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None,
+                   dry_run: bool = False) -> MigrationResult:
+    """
+    把记录引用的截图移动到指定目录结构，并批量改写记录中的图片路径
+
+    只处理直接位于截图保存目录或其日期文件夹中的文件；导入时直接引用的其他位置的图片、
+    用户自己建的其他子文件夹中的图片、已归档的截图保持原位。没有记录引用的文件不移动（见完整性检查）。
+
+    Args:
+        store: 记录库
+        layout: 目标目录结构，见 DIRECTORY_LAYOUTS
+        directories: 截图保存目录，默认为 screenshot_dirs()
+        progress: 进度回调，参数为 (已处理数, 总数)
+        cancel_event: 设置后停止移动，已移动文件的路径仍会写入记录
+        dry_run: 只统计需要移动的文件，不做任何修改
+
+    Returns:
+        MigrationResult: 迁移结果
+    """
+    if layout not in DIRECTORY_LAYOUTS:
+        raise ValueError(f"不支持的目录结构: {layout}")
+    roots = list(directories) if directories is not None else screenshot_dirs()
+    root_keys = {path_key(root): root for root in roots}
+
+    store.refresh()
+    records = store.snapshot()
+    new_paths: Dict[int, str] = {}
+    # 记录ID -> 快照中的图片路径，写入时只改写在此期间没有被修改的记录
+    expected: Dict[int, str] = {}
+    # 已移动的文件 原路径 -> 新路径（多条记录引用同一文件时只移动一次）
+    moved_files: Dict[str, str] = {}
+    # 新路径 -> 移动前的文件路径
+    origins: Dict[str, str] = {}
+    emptied = set()
+    skipped = missing = 0
+    failures = []
+    cancelled = False
+    try:
+        for index, record in enumerate(records, 1):
+            if index % PROGRESS_EVERY == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if progress:
+                    progress(index, len(records))
+
+            image_path = record.get("image_path")
+            if split_archive_path(image_path):
+                # 已归档的截图在归档文件中，不按目录结构移动
+                skipped += 1
+                continue
+            resolved = resolve_image_path(image_path, record.get("timestamp"))
+            if resolved is None:
+                missing += 1
+                continue
+            source_key = path_key(resolved)
+            expected[record["id"]] = image_path
+            if source_key in moved_files:
+                new_paths[record["id"]] = moved_files[source_key]
+                continue
+
+            # 找到文件所在的保存目录：文件直接在保存目录中，或在保存目录的日期文件夹中
+            name = os.path.basename(resolved)
+            when = capture_date(name, record.get("timestamp"))
+            parent = os.path.dirname(resolved)
+            parent_key = path_key(parent)
+            root = root_keys.get(parent_key)
+            if root is None and when is not None:
+                suffix = "/" + date_subdir(when).replace("\\", "/")
+                if parent_key.endswith(suffix):
+                    root = root_keys.get(parent_key[:-len(suffix)])
+            if root is None:
+                skipped += 1
+                continue
+
+            target_dir = os.path.join(root, date_subdir(when)) if layout == "date" and when is not None else root
+            if path_key(target_dir) == parent_key:
+                # 文件已在正确位置，只需要修正记录中的路径
+                if resolved != image_path:
+                    new_paths[record["id"]] = resolved
+                continue
+
+            if dry_run:
+                moved_files[source_key] = resolved
+                continue
+            try:
+                os.makedirs(target_dir, exist_ok=True)
+                target = unique_path(target_dir, name)
+                try:
+                    os.replace(resolved, target)
+                except OSError:
+                    # 保存目录在不同磁盘（自定义路径）时改为复制后删除
+                    shutil.move(resolved, target)
+            except OSError as e:
+                failures.append(f"{resolved}: {e}")
+                continue
+            moved_files[source_key] = target
+            origins[target] = resolved
+            new_paths[record["id"]] = target
+            if layout == "flat":
+                emptied.add((parent, root))
+    finally:
+        # 取消或出错时也写入已移动文件的新路径
+        if dry_run:
+            updated = len(new_paths)
+        else:
+            updated = _commit_paths(store, new_paths, expected, origins, failures)
+
+    for directory, root in emptied:
+        _remove_empty_dirs(directory, root)
+    if progress and not cancelled:
+        progress(len(records), len(records))
+    if failures:
+        logger.warning("有 %s 个截图移动失败", len(failures))
+    logger.info("目录结构迁移到 %s：移动文件 %s 个，改写记录 %s 条，保持原位 %s 条，缺少图片 %s 条%s",
+                layout, len(moved_files), updated, skipped, missing, "（已取消）" if cancelled else "")
+    return MigrationResult(len(moved_files), updated, skipped, missing, failures, cancelled)
+
+
+def migrate_in_background(store: RecordStore, layout: str,
+                          done: Callable[[Optional[MigrationResult], Optional[Exception]], None],
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          cancel_event: Optional[threading.Event] = None) -> threading.Thread:
+    """
+    在后台线程中迁移目录结构
+
+    回调都在迁移线程中调用，不能直接操作 Tk 控件，界面代码应经
+    src.utils.ui_queue.UIEventQueue 把进度和结果交给界面线程。
+
+    Args:
+        store: 记录库
+        layout: 目标目录结构
+        done: 完成回调，参数为 (迁移结果或None, 异常或None)
+        progress: 进度回调，参数为 (已处理数, 总数)
+        cancel_event: 用于取消迁移
+
+    Returns:
+        threading.Thread: 迁移线程
+    """
+    def run():
+        try:
+            result = migrate_layout(store, layout, progress=progress, cancel_event=cancel_event)
+        except Exception as e:
+            logger.error("目录结构迁移失败: %s", e)
+            done(None, e)
+            return
+        done(result, None)
+
+    thread = threading.Thread(target=run, name="LayoutMigration", daemon=True)
+    thread.start()
+    return thread
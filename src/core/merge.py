@@ -0,0 +1,205 @@
+"""
+记录合并模块 - 把其他电脑导出的 records.json 和截图文件夹合并到当前记录库，不依赖tkinter
+
+合并在一次遍历中完成：逐条去重、重新分配ID、定位并复制截图、改写图片路径，
+所有新增记录在 RecordStore.batch() 中只写入一次记录文件。
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src.core.records import RecordStore
+from src.core.screenshots import capture_date, get_save_dir, shard_dir, unique_path
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 去重方式：timestamp=时间和项目名称相同视为重复，hash=截图内容相同视为重复，none=不去重
+DEDUPE_MODES = ("timestamp", "hash", "none")
+# 计算文件哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 1024 * 1024
+# 每处理多少条记录报告一次进度
+PROGRESS_EVERY = 1000
+# 合并时由目标记录库重新生成的字段，其余字段（created_at、updated_at 等）原样保留
+_REBUILT_FIELDS = ("id", "task_name", "image_path", "notes", "timestamp")
+
+
+class MergeResult(NamedTuple):
+    """合并结果"""
+    added: int                  # 新增的记录数
+    duplicates: int             # 判定为重复而跳过的记录数
+    missing_images: int         # 找不到截图文件的记录数（记录仍会导入）
+    id_map: Dict[int, int]      # 源记录ID -> 新记录ID
+
+
+def file_hash(path: str) -> str:
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_source_records(source_db: str) -> List[Dict[str, Any]]:
+    """
+    读取要合并的记录文件
+
+    Raises:
+        ValueError: 文件内容不是记录列表
+    """
+    with open(source_db, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if not isinstance(records, list):
+        raise ValueError(f"不是有效的记录文件: {source_db}")
+    return records
+
+
+def index_image_folder(folder: str) -> Dict[str, str]:
+    """
+    建立截图文件夹（含子文件夹）中 文件名 -> 路径 的索引
+
+    其他电脑上的记录保存的是那台电脑的绝对路径，合并时按文件名在这里查找。
+    """
+    index = {}
+    pending = [folder]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        index.setdefault(entry.name, entry.path)
+        except OSError as e:
+            logger.warning("无法读取文件夹 %s: %s", current, e)
+    return index
+
+
+class _HashIndex:
+    """按截图内容去重的索引
+
+    先按文件大小分组，只有大小相同的文件才计算哈希，已有记录库的截图哈希按需计算并缓存。
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._by_size: Dict[int, List[str]] = {}
+        self._hashes: Dict[str, str] = {}
+        for record in records:
+            self.add(record.get("image_path", ""))
+
+    def _hash(self, path: str) -> Optional[str]:
+        if path not in self._hashes:
+            try:
+                self._hashes[path] = file_hash(path)
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def add(self, path: str) -> None:
+        """把一个截图文件加入索引"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._by_size.setdefault(size, []).append(path)
+
+    def contains(self, path: str) -> bool:
+        """索引中是否已有内容相同的文件"""
+        try:
+            candidates = self._by_size.get(os.path.getsize(path))
+        except OSError:
+            return False
+        if not candidates:
+            return False
+        if path in candidates:
+            return True
+        digest = self._hash(path)
+        return digest is not None and any(self._hash(other) == digest for other in candidates)
+
+
+@traced("data.merge", "io")
+def merge_records(store: RecordStore, source_db: str, image_dir: Optional[str] = None,
+                  copy_images: bool = True, dedupe: str = "timestamp",
+                  progress: Optional[Callable[[int, int], None]] = None) -> MergeResult:
+    """
+    把另一个记录文件及其截图合并到记录库
+
+    Args:
+        store: 目标记录库
+        source_db: 要合并的 records.json
+        image_dir: 源截图文件夹，默认为记录文件旁边的 screenshots 文件夹
+        copy_images: 是否把截图复制到当前截图保存目录（按配置的目录结构）；为False时直接引用源文件
+        dedupe: 去重方式，见 DEDUPE_MODES；hash 方式下找不到截图的记录无法比较，按新记录导入
+        progress: 进度回调，参数为 (已处理数, 总数)
+
+    Returns:
+        MergeResult: 合并结果
+    """
+    if dedupe not in DEDUPE_MODES:
+        raise ValueError(f"不支持的去重方式: {dedupe}")
+
+    source = load_source_records(source_db)
+    if image_dir is None:
+        image_dir = os.path.join(os.path.dirname(os.path.abspath(source_db)), "screenshots")
+    images = index_image_folder(image_dir) if os.path.isdir(image_dir) else {}
+    save_dir = get_save_dir() if copy_images else None
+
+    # 在事务中建立去重索引，期间其他进程不会写入记录文件
+    with store.batch():
+        seen_keys = None
+        hashes = None
+        if dedupe == "timestamp":
+            seen_keys = {(r.get("timestamp"), r.get("task_name")) for r in store.records}
+        elif dedupe == "hash":
+            hashes = _HashIndex(store.records)
+
+        added = duplicates = missing = 0
+        id_map = {}
+        for index, record in enumerate(source, 1):
+            if seen_keys is not None:
+                key = (record.get("timestamp"), record.get("task_name"))
+                if key in seen_keys:
+                    duplicates += 1
+                    continue
+                seen_keys.add(key)
+
+            # 源记录的路径来自其他电脑，优先按文件名在源截图文件夹中查找
+            original = record.get("image_path", "") or ""
+            name = os.path.basename(original.replace("\\", "/"))
+            image_path = images.get(name) or (original if original and os.path.isfile(original) else None)
+
+            if hashes is not None and image_path and hashes.contains(image_path):
+                duplicates += 1
+                continue
+
+            if image_path is None:
+                missing += 1
+                image_path = original
+            elif save_dir:
+                target = unique_path(shard_dir(save_dir, capture_date(name, record.get("timestamp"))), name)
+                shutil.copy2(image_path, target)
+                image_path = target
+            if hashes is not None and image_path:
+                hashes.add(image_path)
+
+            new_id = store.add_record(record.get("task_name", ""), image_path, record.get("notes", ""),
+                                      timestamp=record.get("timestamp"))
+            # add_record 追加在列表末尾，保留源记录的创建/更新时间和其他字段
+            store.records[-1].update((k, v) for k, v in record.items() if k not in _REBUILT_FIELDS)
+            if "id" in record:
+                id_map[record["id"]] = new_id
+            added += 1
+
+            if progress and index % PROGRESS_EVERY == 0:
+                progress(index, len(source))
+
+    if progress and len(source) % PROGRESS_EVERY:
+        progress(len(source), len(source))
+    logger.info("合并 %s：新增 %s 条，重复 %s 条，缺少截图 %s 条", source_db, added, duplicates, missing)
+    return MergeResult(added, duplicates, missing, id_map)
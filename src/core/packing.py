@@ -0,0 +1,205 @@
+"""
+打包存储维护模块 - 把已有的截图文件移入打包存储，并按记录整理打包存储回收空间，不依赖tkinter
+
+移入时每批截图先追加写入段文件，再在一个事务中改写这批记录的路径，最后删除原文件；
+中途取消或出错时已写入的批次保持完整，原文件只在记录改写后才删除。
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from src.core.blobstore import CompactResult, get_blob_store
+from src.core.integrity import path_key, screenshot_dirs
+from src.core.records import RecordStore
+from src.core.screenshots import (
+    ARCHIVE_DIR_NAME, PACK_DIR_NAME, THUMBNAIL_DIR_NAME, pack_image_path, resolve_image_path, split_archive_path
+)
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 每批移入的截图数（每批改写一次记录文件）
+BATCH_SIZE = 500
+
+
+class PackResult(NamedTuple):
+    """移入打包存储的结果"""
+    packed: int                 # 移入的截图数
+    skipped: int                # 不在截图保存目录中、保持原位的记录数
+    missing: int                # 找不到图片文件的记录数
+    failures: List[str]         # 读取或删除失败的文件
+    cancelled: bool             # 是否中途取消
+
+
+def _commit_batch(store: RecordStore, batch: Dict[str, List[dict]], new_paths: Dict[str, str],
+                  failures: List[str]) -> int:
+    """改写一批记录的路径并删除原文件，返回删除的原文件数"""
+    with store.batch():
+        paths = {}
+        for path, records in batch.items():
+            for record in records:
+                current = store.get_record_by_id(record["id"])
+                # 只改写在此期间没有被修改或删除的记录
+                if current is not None and current.get("image_path") == record.get("image_path"):
+                    paths[record["id"]] = new_paths[path]
+        store.set_image_paths(paths)
+    removed = 0
+    for path, records in batch.items():
+        if all(record["id"] in paths for record in records):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                failures.append(f"{path}: {e}")
+    return removed
+
+
+@traced("packing.pack", "io")
+def pack_existing_screenshots(store: RecordStore, directories: Optional[List[str]] = None,
+                              progress: Optional[Callable[[int, int], None]] = None,
+                              cancel_event: Optional[threading.Event] = None) -> PackResult:
+    """
+    把截图保存目录中的截图文件移入各自保存目录下的打包存储
+
+    导入时直接引用的其他位置的图片、已归档的截图保持原位。
+
+    Args:
+        store: 记录库
+        directories: 截图保存目录，默认为 screenshot_dirs()
+        progress: 进度回调，参数为 (已处理数, 总数)
+        cancel_event: 设置后在下一批开始前停止
+
+    Returns:
+        PackResult: 移入结果
+    """
+    roots = list(directories) if directories is not None else screenshot_dirs()
+    root_prefixes = [(path_key(root).rstrip("/") + "/", root) for root in roots]
+
+    store.refresh()
+    records = store.snapshot()
+    # 保存目录 -> {截图路径: 引用它的记录}
+    groups: Dict[str, Dict[str, List[dict]]] = {}
+    skipped = missing = 0
+    for record in records:
+        image_path = record.get("image_path")
+        if not image_path or split_archive_path(image_path):
+            skipped += 1
+            continue
+        path = resolve_image_path(image_path, record.get("timestamp"))
+        if path is None:
+            missing += 1
+            continue
+        key = path_key(path)
+        for prefix, root in root_prefixes:
+            if key.startswith(prefix) and key[len(prefix):].split("/", 1)[0] not in (
+                    ARCHIVE_DIR_NAME, THUMBNAIL_DIR_NAME, PACK_DIR_NAME):
+                groups.setdefault(root, {}).setdefault(path, []).append(record)
+                break
+        else:
+            skipped += 1
+
+    total = sum(len(files) for files in groups.values())
+    done = packed = 0
+    failures = []
+    cancelled = False
+    for root, files in groups.items():
+        blobs = get_blob_store(os.path.join(root, PACK_DIR_NAME))
+        items = list(files.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            batch = dict(items[start:start + BATCH_SIZE])
+            new_paths = {}
+            for path in list(batch):
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError as e:
+                    failures.append(f"{path}: {e}")
+                    del batch[path]
+                    continue
+                new_paths[path] = pack_image_path(root, blobs.put(os.path.basename(path), data))
+            packed += _commit_batch(store, batch, new_paths, failures)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        if cancelled:
+            break
+
+    if failures:
+        logger.warning("有 %s 个截图移入打包存储失败", len(failures))
+    logger.info("移入打包存储：%s 个截图，保持原位 %s 条，缺少图片 %s 条%s",
+                packed, skipped, missing, "（已取消）" if cancelled else "")
+    return PackResult(packed, skipped, missing, failures, cancelled)
+
+
+def pack_dirs(directories: Optional[List[str]] = None) -> List[str]:
+    """截图保存目录下已有的打包存储目录"""
+    roots = list(directories) if directories is not None else screenshot_dirs()
+    return [os.path.join(root, PACK_DIR_NAME) for root in roots if os.path.isdir(os.path.join(root, PACK_DIR_NAME))]
+
+
+@traced("packing.compact", "io")
+def compact_packs(store: RecordStore, directories: Optional[List[str]] = None,
+                  min_garbage_ratio: Optional[float] = None) -> CompactResult:
+    """
+    整理截图保存目录下的打包存储：回收已删除截图的空间，丢弃没有记录引用的截图
+
+    Args:
+        store: 记录库
+        directories: 截图保存目录，默认为 screenshot_dirs()
+        min_garbage_ratio: 整理的阈值，默认为 BlobStore.compact 的默认值
+
+    Returns:
+        CompactResult: 所有打包存储的整理结果之和
+    """
+    directories = pack_dirs(directories)
+    if not directories:
+        return CompactResult(0, 0, 0)
+    store.refresh()
+    # 打包存储目录 -> 被记录引用的截图名称
+    live: Dict[str, set] = {}
+    for record in store.snapshot():
+        parts = split_archive_path(record.get("image_path"))
+        if parts and os.path.basename(parts[0]) == PACK_DIR_NAME:
+            live.setdefault(path_key(parts[0]), set()).add(parts[1])
+
+    segments = dropped = reclaimed = 0
+    for directory in directories:
+        kwargs = {} if min_garbage_ratio is None else {"min_garbage_ratio": min_garbage_ratio}
+        result = get_blob_store(directory).compact(live.get(path_key(directory), set()), **kwargs)
+        segments += result.segments
+        dropped += result.dropped
+        reclaimed += result.reclaimed_bytes
+    return CompactResult(segments, dropped, reclaimed)
+
+
+def compact_in_background(store: RecordStore,
+                          done: Callable[[Optional[CompactResult], Optional[Exception]], None]) -> threading.Thread:
+    """
+    在后台线程中整理打包存储
+
+    回调在整理线程中调用，不能直接操作 Tk 控件。
+
+    Args:
+        store: 记录库
+        done: 完成回调，参数为 (整理结果或None, 异常或None)
+
+    Returns:
+        threading.Thread: 整理线程
+    """
+    def run():
+        try:
+            result = compact_packs(store)
+        except Exception as e:
+            logger.error("整理打包存储失败: %s", e)
+            done(None, e)
+            return
+        done(result, None)
+
+    thread = threading.Thread(target=run, name="PackCompaction", daemon=True)
+    thread.start()
+    return thread
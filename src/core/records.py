@@ -0,0 +1,519 @@
+"""
+记录存储模块 - 截图记录的加载、保存、增删改和搜索，不依赖tkinter
+
+RecordStore 操作指定的记录文件；应用使用的单例是 src.utils.data_manager.DataManager。
+
+记录ID由持久化的计数器分配（保存在记录文件旁边的 .meta.json 中），只增不减：
+删除记录后ID不会被重新使用，合并、同步等操作可以直接用ID识别记录。
+
+多个程序实例或脚本可以同时使用同一个记录文件：每次修改都在持有跨进程文件锁的事务中
+进行，事务开始时先合并其他进程写入的内容，结束时以"临时文件 + 替换"的方式写回，
+不会丢失其他进程的修改，也不会让读取方看到写了一半的文件。
+
+同一进程内多个线程（后台保存、缩略图、搜索）共用一个 RecordStore：写操作由可重入的
+写锁串行化；读操作（get_all_records、search_records、iter_search）使用每个事务结束时
+发布的只读快照，不需要加锁，写入进行中也能读到一致的数据。已发布的记录字典不会再被
+修改，更新记录时替换为新的字典（写时复制）。
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+import threading
+import contextlib
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from src.core.filelock import FileLock
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 元数据文件后缀（与记录文件同名，如 records.meta.json）
+META_SUFFIX = ".meta.json"
+# 锁文件后缀（records.json.lock）
+LOCK_SUFFIX = ".lock"
+# Windows 上目标文件正被其他进程读取时替换会失败，最多重试的次数和间隔（秒）
+REPLACE_RETRIES = 50
+REPLACE_RETRY_INTERVAL = 0.02
+
+
+class RecordConflictError(Exception):
+    """要更新的记录在读取后已被其他进程修改（乐观并发检查失败）"""
+
+
+def _atomic_write_json(path: str, data: Any, **kwargs) -> None:
+    """先写入临时文件再替换目标文件，读取方只会看到完整的旧文件或新文件"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(temp_path, path)
+            return
+        except PermissionError:
+            if sys.platform != "win32" or attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_INTERVAL)
+
+
+class RecordStore:
+    """记录存储类，负责一个记录文件的增删改查"""
+    
+    def __init__(self, db_file: str):
+        """初始化记录存储并加载记录
+        
+        Args:
+            db_file: 记录文件路径（JSON），不存在时自动创建
+        """
+        self.db_file = db_file
+        self.meta_file = os.path.splitext(db_file)[0] + META_SUFFIX
+        self._lock = FileLock(db_file + LOCK_SUFFIX)
+        # 上次加载或保存时记录文件的状态，用于发现其他进程的修改
+        self._stamp = None
+        # 写入方使用的记录列表，只能在事务中（持有写锁时）修改
+        self.records = []
+        # 供读取方使用的只读快照（元组），每个事务结束时发布
+        self._snapshot = ()
+        # 串行化同一进程内各线程的写操作，可重入，同一线程的嵌套事务不会死锁
+        self._write_lock = threading.RLock()
+        # ID -> 记录，按ID查找时不需要遍历列表
+        self._by_id = {}
+        # 下一个分配的ID
+        self._next_id = 1
+        # 事务（batch）期间只标记有修改，结束时统一写入一次
+        self._batch_depth = 0
+        self._dirty = False
+        self._load_records()
+    
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """记录文件的 (inode, 修改时间, 大小)，文件不存在时为None
+        
+        每次保存都会替换文件，inode 随之变化，修改时间精度较低的文件系统上也能可靠地发现修改。
+        """
+        try:
+            st = os.stat(self.db_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _read_file(self) -> List[Dict[str, Any]]:
+        """读取并解析记录文件"""
+        with open(self.db_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _set_records(self, records: List[Dict[str, Any]]) -> None:
+        """替换内存中的记录并重建ID索引，同时发布新的快照"""
+        self.records = records
+        self._by_id = {record['id']: record for record in self.records if 'id' in record}
+        self._publish()
+    
+    def _publish(self) -> None:
+        """发布读取快照（替换元组引用是原子操作，读取方不需要加锁）"""
+        self._snapshot = tuple(self.records)
+    
+    def snapshot(self) -> Tuple[Dict[str, Any], ...]:
+        """获取当前记录的只读快照
+        
+        快照和其中的记录字典都不会再被修改，可以在任意线程中遍历。
+        
+        Returns:
+            Tuple[Dict[str, Any], ...]: 记录快照
+        """
+        return self._snapshot
+    
+    @traced("data.load", "io")
+    def _load_records(self) -> None:
+        """从文件加载记录"""
+        records = []
+        if os.path.exists(self.db_file):
+            try:
+                records = self._read_file()
+                # 打印加载信息，调试使用
+                logger.info("成功加载了 %s 条记录", len(records))
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error("加载记录文件失败: %s", e)
+        else:
+            logger.info("记录文件不存在，将创建新文件: %s", self.db_file)
+            
+            # 确保目录存在
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            
+            # 创建空记录文件
+            try:
+                _atomic_write_json(self.db_file, [], indent=2)
+                logger.debug("已创建空记录文件: %s", self.db_file)
+            except Exception as e:
+                logger.error("创建空记录文件失败: %s", e)
+        
+        self._stamp = self._file_stamp()
+        self._set_records(records)
+        self._load_meta()
+    
+    def refresh(self) -> bool:
+        """检查记录文件是否被其他进程修改，有修改时重新加载
+        
+        没有修改时只需一次 stat，不会重新解析文件。其他线程正在执行事务时直接返回，
+        事务开始时已经合并过其他进程的修改，结束时会发布新的快照。
+        
+        Returns:
+            bool: 是否重新加载了
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        if not self._write_lock.acquire(blocking=False):
+            return False
+        try:
+            # 事务中持有文件锁，文件不会被其他进程修改
+            if self._batch_depth or stamp == self._stamp:
+                return False
+            return self._reload(stamp)
+        finally:
+            self._write_lock.release()
+    
+    @traced("data.reload", "io")
+    def _reload(self, stamp) -> bool:
+        """按文件内容重新加载记录（调用方持有写锁），内容没变的记录保留原来的对象"""
+        try:
+            records = self._read_file()
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning("重新加载记录文件失败，继续使用内存中的记录: %s", e)
+            return False
+        
+        merged = []
+        for record in records:
+            current = self._by_id.get(record.get('id'))
+            merged.append(current if current == record else record)
+        self._stamp = stamp
+        self._set_records(merged)
+        self._load_meta()
+        logger.info("记录文件已被其他程序修改，重新加载了 %s 条记录", len(merged))
+        return True
+    
+    def _load_meta(self) -> None:
+        """加载ID计数器
+        
+        计数器取元数据中保存的值和已有最大ID+1中较大的一个，元数据丢失或落后于
+        记录文件（例如写入记录后程序崩溃）时也不会分配重复的ID。
+        """
+        next_id = 1
+        if os.path.exists(self.meta_file):
+            try:
+                with open(self.meta_file, 'r', encoding='utf-8') as f:
+                    next_id = int(json.load(f).get('next_id', 1))
+            except (json.JSONDecodeError, IOError, ValueError, TypeError, AttributeError) as e:
+                logger.warning("加载记录元数据失败，将按已有记录重建: %s", e)
+        max_id = max((i for i in self._by_id if isinstance(i, int)), default=0)
+        self._next_id = max(next_id, max_id + 1)
+    
+    def _save_meta(self) -> None:
+        """保存ID计数器"""
+        try:
+            _atomic_write_json(self.meta_file, {'next_id': self._next_id})
+        except Exception as e:
+            logger.error("保存记录元数据失败: %s", e)
+    
+    def allocate_id(self) -> int:
+        """分配一个新的记录ID（单调递增，不会重复使用已删除记录的ID）
+        
+        Returns:
+            int: 新ID
+        """
+        record_id = self._next_id
+        self._next_id += 1
+        return record_id
+    
+    @traced("data.save", "io")
+    def _save_records(self) -> None:
+        """保存记录到文件"""
+        try:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            _atomic_write_json(self.db_file, self.records, indent=2)
+            self._stamp = self._file_stamp()
+            # 先写记录再写计数器，两者之间中断时加载会按最大ID恢复计数器
+            self._save_meta()
+            logger.debug("已保存 %s 条记录到 %s", len(self.records), self.db_file)
+        except Exception as e:
+            logger.error("保存记录失败: %s", e)
+    
+    def _commit(self) -> None:
+        """标记记录有修改，在事务结束时写入记录文件"""
+        self._dirty = True
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """修改事务，期间的增删改只在退出时写入一次记录文件
+        
+        事务持有跨进程文件锁；开始时先重新加载其他进程写入的修改，再在其基础上修改，
+        因此多个进程交替写入也不会互相覆盖。单独调用 add_record 等方法时各自是一个事务。
+        事务中抛出异常时撤销事务中的所有修改，不写入记录文件。
+        
+        用法:
+            with store.batch():
+                for path in paths:
+                    store.add_record(task, path)
+        
+        Raises:
+            FileLockTimeout: 其他进程长时间持有锁
+        """
+        with self._write_lock:
+            outermost = not self._batch_depth
+            if outermost:
+                self._lock.acquire()
+                try:
+                    self.refresh()
+                    # 计数器文件很小，每个事务都重新读取，保证分配的ID不与其他进程重复
+                    self._load_meta()
+                except BaseException:
+                    self._lock.release()
+                    raise
+                # 记录修改都是替换列表中的字典（不原地修改），浅拷贝列表即可撤销
+                before = (list(self.records), self._next_id)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if outermost and self._dirty:
+                    logger.warning("事务执行失败，撤销未写入的修改")
+                    self._dirty = False
+                    self._next_id = before[1]
+                    self._set_records(before[0])
+                raise
+            finally:
+                self._batch_depth -= 1
+                if outermost:
+                    try:
+                        if self._dirty:
+                            self._dirty = False
+                            self._save_records()
+                            self._publish()
+                    finally:
+                        self._lock.release()
+    
+    def add_record(self, task_name: str, image_path: str, notes: str = "",
+                   timestamp: Optional[str] = None) -> int:
+        """添加新记录
+        
+        Args:
+            task_name: 任务/项目名称
+            image_path: 图片文件路径
+            notes: 附加说明
+            timestamp: 记录时间（ISO格式），默认为当前时间；导入已有截图时使用截图时间
+            
+        Returns:
+            int: 新记录的ID
+        """
+        # 标准化路径格式（使用正斜杠）
+        normalized_path = os.path.abspath(image_path).replace('\\', '/')
+        
+        # 输出调试信息
+        logger.debug("添加记录 - 原始路径: %s", image_path)
+        logger.debug("添加记录 - 标准化路径: %s", normalized_path)
+        
+        with self.batch():
+            # 生成新记录ID（在事务中分配，不会与其他进程重复）
+            record_id = self.allocate_id()
+            
+            # 创建记录
+            now = datetime.datetime.now().isoformat()
+            record = {
+                'id': record_id,
+                'task_name': task_name,
+                'image_path': normalized_path,
+                'notes': notes,
+                'timestamp': timestamp or now,
+                'created_at': now,
+                'updated_at': now
+            }
+            
+            self.records.append(record)
+            self._by_id[record_id] = record
+            self._commit()
+        return record_id
+    
+    def get_all_records(self) -> List[Dict[str, Any]]:
+        """获取所有记录（先检查其他进程的修改）
+        
+        Returns:
+            List[Dict[str, Any]]: 记录列表（快照的副本，调用方可以排序或修改列表本身）
+        """
+        self.refresh()
+        return list(self._snapshot)
+    
+    def get_record_by_id(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """根据ID获取记录
+        
+        Args:
+            record_id: 记录ID
+            
+        Returns:
+            Optional[Dict[str, Any]]: 找到的记录或None
+        """
+        return self._by_id.get(record_id)
+    
+    @traced("data.search", "data")
+    def search_records(self, keyword: str = "", date_from: str = "", date_to: str = "") -> List[Dict[str, Any]]:
+        """搜索记录
+        
+        Args:
+            keyword: 关键词搜索
+            date_from: 开始日期
+            date_to: 结束日期
+            
+        Returns:
+            List[Dict[str, Any]]: 符合条件的记录列表
+        """
+        self.refresh()
+        return list(self.iter_search(keyword, date_from, date_to))
+    
+    def iter_search(self, keyword: str = "", date_from: str = "", date_to: str = "") -> Iterator[Dict[str, Any]]:
+        """逐条产出符合条件的记录，用于流式输出和导出（条件与 search_records 相同）
+        
+        Args:
+            keyword: 关键词搜索
+            date_from: 开始日期 (YYYY-MM-DD)
+            date_to: 结束日期 (YYYY-MM-DD)
+            
+        Yields:
+            Dict[str, Any]: 符合条件的记录，日期格式无效时不产出任何记录
+        """
+        # 转换日期字符串为datetime对象
+        try:
+            if date_from:
+                from_date = datetime.datetime.strptime(date_from, "%Y-%m-%d")
+            else:
+                from_date = None
+                
+            if date_to:
+                to_date = datetime.datetime.strptime(date_to, "%Y-%m-%d")
+                # 设置结束日期为当天的23:59:59
+                to_date = to_date.replace(hour=23, minute=59, second=59)
+            else:
+                to_date = None
+        except ValueError:
+            return
+        
+        keyword = keyword.lower()
+        # 遍历只读快照，后台导出或搜索期间其他线程增删记录不会影响遍历
+        for record in self._snapshot:
+            # 创建时间检查
+            if 'timestamp' in record:
+                try:
+                    record_date = datetime.datetime.fromisoformat(record['timestamp'])
+                    
+                    # 日期范围过滤
+                    if from_date and record_date < from_date:
+                        continue
+                    if to_date and record_date > to_date:
+                        continue
+                except (ValueError, TypeError):
+                    pass
+            
+            # 关键词搜索
+            if keyword:
+                task_name = record.get('task_name', '').lower()
+                notes = record.get('notes', '').lower()
+                if keyword not in task_name and keyword not in notes:
+                    continue
+            
+            yield record
+    
+    def update_record(self, record_id: int, task_name: str = None, notes: str = None,
+                      expected_updated_at: Optional[str] = None) -> bool:
+        """更新记录
+        
+        Args:
+            record_id: 记录ID
+            task_name: 新的任务/项目名称
+            notes: 新的附加说明
+            expected_updated_at: 读取记录时的 updated_at；给出时如果记录已被其他进程修改则不更新
+            
+        Returns:
+            bool: 更新是否成功
+            
+        Raises:
+            RecordConflictError: 给出 expected_updated_at 且记录已被修改
+        """
+        with self.batch():
+            record = self._by_id.get(record_id)
+            if record is None:
+                return False
+            if expected_updated_at is not None and record.get('updated_at') != expected_updated_at:
+                raise RecordConflictError(f"记录 {record_id} 已被其他程序修改")
+            # 写时复制：已发布的记录字典不修改，替换为新的字典
+            updated = dict(record)
+            if task_name is not None:
+                updated['task_name'] = task_name
+            if notes is not None:
+                updated['notes'] = notes
+            updated['updated_at'] = datetime.datetime.now().isoformat()
+            # list.index 先按对象身份比较，找到的就是这条记录
+            self.records[self.records.index(record)] = updated
+            self._by_id[record_id] = updated
+            self._commit()
+        return True
+    
+    def set_image_paths(self, paths: Dict[int, str]) -> int:
+        """批量修改记录的图片路径（移动截图文件后使用），只遍历一次记录列表并写入一次记录文件
+
+        只是文件位置变化，不修改 updated_at，正在编辑这些记录的窗口不会因此产生冲突。
+
+        Args:
+            paths: 记录ID -> 新的图片路径
+
+        Returns:
+            int: 实际修改的记录数
+        """
+        changed = 0
+        with self.batch():
+            records = []
+            for record in self.records:
+                new_path = paths.get(record.get('id'))
+                if new_path is not None and new_path != record.get('image_path'):
+                    # 写时复制：已发布的记录字典不修改
+                    record = dict(record, image_path=new_path)
+                    self._by_id[record['id']] = record
+                    changed += 1
+                records.append(record)
+            if changed:
+                self.records = records
+                self._commit()
+        return changed
+
+    def delete_record(self, record_id: int) -> Tuple[bool, str]:
+        """删除记录
+        
+        Args:
+            record_id: 记录ID
+            
+        Returns:
+            Tuple[bool, str]: (是否成功, 图片路径或错误消息)
+        """
+        with self.batch():
+            record = self._by_id.pop(record_id, None)
+            if record is None:
+                return False, "记录不存在"
+            # list.remove 先按对象身份比较，找到的就是这条记录
+            self.records.remove(record)
+            self._commit()
+        return True, record.get('image_path', '')
+    
+    def delete_records(self, record_ids) -> List[Dict[str, Any]]:
+        """批量删除记录，只遍历一次记录列表并写入一次记录文件
+        
+        Args:
+            record_ids: 要删除的记录ID
+            
+        Returns:
+            List[Dict[str, Any]]: 实际删除的记录
+        """
+        with self.batch():
+            removed = [self._by_id.pop(record_id) for record_id in set(record_ids) if record_id in self._by_id]
+            if removed:
+                removed_ids = {id(record) for record in removed}
+                self.records = [record for record in self.records if id(record) not in removed_ids]
+                self._commit()
+        return removed
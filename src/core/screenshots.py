@@ -0,0 +1,502 @@
+"""
+截图文件模块 - 屏幕捕获、预览缩放、编码保存和加载，不依赖tkinter
+"""
+
+import io
+import os
+import re
+import zipfile
+import datetime
+from typing import Tuple, Optional
+
+from PIL import Image
+
+from src.config import SCREENSHOT_DIR, FILENAME_TIME_FORMAT
+from src.core.blobstore import BlobStore, get_blob_store
+from src.utils.data_manager import DataManager
+from src.utils.config_manager import default_config_manager
+from src.utils.capture import get_capture_backend
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 识别为截图/图片的文件扩展名（导入、完整性检查使用）
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff"}
+# 截图目录结构：flat=全部放在保存目录，date=按日期分文件夹（YYYY/MM/DD）
+DIRECTORY_LAYOUTS = ("flat", "date")
+# 本软件保存的截图文件名以 YYYYMMDD_ 开头
+_FILENAME_DATE = re.compile(r"^(\d{4})(\d{2})(\d{2})_")
+# 已归档截图的路径为 "归档文件路径!/归档中的文件名"（见 src.core.tiering），
+# 打包存储的截图路径为 "保存目录/packs!/截图名称"（见 src.core.blobstore）
+ARCHIVE_SEPARATOR = "!/"
+# 保存目录下存放归档文件、归档截图预览图和打包存储的文件夹
+ARCHIVE_DIR_NAME = "archive"
+THUMBNAIL_DIR_NAME = "thumbnails"
+PACK_DIR_NAME = "packs"
+# 截图的存储方式：files=每张截图一个文件，packed=追加写入打包存储的段文件
+STORAGE_BACKENDS = ("files", "packed")
+
+
+@traced("capture.grab", "capture")
+def grab_screen(bbox=None):
+    """
+    使用当前截图后端捕获屏幕图像
+    
+    Args:
+        bbox: 截取区域 (left, top, right, bottom)，为None时捕获全屏
+        
+    Returns:
+        PIL.Image: 截图对象
+    """
+    return get_capture_backend().grab(bbox)
+
+
+@traced("preview.resize", "preview")
+def scale_image_for_preview(image, frame_width, frame_height, padding=10) -> Image.Image:
+    """
+    按预览区域缩放图像，保持纵横比（不依赖Tk，可在工作线程或基准测试中调用）
+    
+    Args:
+        image: PIL.Image对象
+        frame_width: 预览框架宽度
+        frame_height: 预览框架高度
+        padding: 边距大小
+        
+    Returns:
+        PIL.Image: 缩放后的图像
+    """
+    # 确保尺寸至少为1像素
+    preview_width = max(1, frame_width - padding)
+    preview_height = max(1, frame_height - padding)
+    
+    # 调整图像大小以适应预览区域，保持纵横比
+    img_width, img_height = image.size
+    ratio = min(preview_width/max(1, img_width), preview_height/max(1, img_height))
+    new_width = int(img_width * ratio)
+    new_height = int(img_height * ratio)
+    
+    return image.resize((max(1, new_width), max(1, new_height)), Image.LANCZOS)
+
+
+def get_save_dir() -> str:
+    """
+    获取截图保存目录（按配置选择默认或自定义路径），并确保目录存在
+    
+    Returns:
+        str: 保存目录路径
+    """
+    # 从配置管理器获取保存路径
+    config_manager = default_config_manager
+    use_custom_path = config_manager.get_value("files", "use_custom_path", False)
+    
+    if use_custom_path:
+        # 使用用户自定义的保存路径
+        save_dir = config_manager.get_value("files", "screenshot_save_path", SCREENSHOT_DIR)
+        # 检查路径是否为空或无效
+        if not save_dir or not isinstance(save_dir, str):
+            logger.warning("自定义路径无效，使用默认路径: %s", SCREENSHOT_DIR)
+            save_dir = SCREENSHOT_DIR
+    else:
+        # 使用默认的保存路径
+        save_dir = SCREENSHOT_DIR
+    
+    # 标准化路径
+    save_dir = os.path.normpath(save_dir)
+    logger.debug("使用保存路径: %s", save_dir)
+    
+    # 确保保存目录存在
+    if not os.path.exists(save_dir):
+        try:
+            os.makedirs(save_dir, exist_ok=True)
+            logger.info("已创建保存目录: %s", save_dir)
+        except Exception as e:
+            logger.error("创建保存目录失败: %s", e)
+            # 如果创建失败，尝试使用默认目录
+            save_dir = os.path.join(os.path.expanduser("~"), "留痕软件_截图")
+            logger.warning("尝试使用备选目录: %s", save_dir)
+            os.makedirs(save_dir, exist_ok=True)
+    
+    return save_dir
+
+
+def unique_path(directory, filename) -> str:
+    """
+    在目录中生成不与已有文件重名的路径（重名时在文件名后加 _1、_2 …）
+    
+    Args:
+        directory: 目录
+        filename: 期望的文件名
+        
+    Returns:
+        str: 文件路径
+    """
+    base, ext = os.path.splitext(filename)
+    path = os.path.join(directory, filename)
+    index = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{base}_{index}{ext}")
+        index += 1
+    return path
+
+
+def get_directory_layout() -> str:
+    """获取配置的截图目录结构（DIRECTORY_LAYOUTS 之一）"""
+    layout = default_config_manager.get_value("files", "directory_layout", "flat")
+    return layout if layout in DIRECTORY_LAYOUTS else "flat"
+
+
+def date_subdir(when) -> str:
+    """按日期分文件夹时的相对目录 YYYY/MM/DD"""
+    return os.path.join(f"{when.year:04d}", f"{when.month:02d}", f"{when.day:02d}")
+
+
+def shard_dir(root, when, layout=None) -> str:
+    """
+    按目录结构计算截图应保存的目录，并确保目录存在
+    
+    Args:
+        root: 截图保存目录
+        when: 截图日期（date/datetime），未知时放在保存目录下
+        layout: 目录结构，默认读取配置
+        
+    Returns:
+        str: 目录路径
+    """
+    layout = layout or get_directory_layout()
+    directory = os.path.join(root, date_subdir(when)) if layout == "date" and when is not None else root
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def filename_date(path):
+    """从本软件保存的截图文件名（YYYYMMDD_HHMMSS_项目名称.png）中取出日期，不是这种文件名时返回None"""
+    match = _FILENAME_DATE.match(os.path.basename(path))
+    if not match:
+        return None
+    try:
+        return datetime.date(*(int(part) for part in match.groups()))
+    except ValueError:
+        return None
+
+
+def capture_date(image_path, timestamp=None):
+    """
+    截图的日期，决定按日期分文件夹时放在哪个文件夹
+    
+    优先使用文件名中的日期（只有路径时也能算出同样的位置），其次使用记录时间。
+    
+    Args:
+        image_path: 图片路径
+        timestamp: 记录时间（ISO格式）
+        
+    Returns:
+        日期，都无法确定时返回None
+    """
+    when = filename_date(image_path.replace('\\', '/'))
+    if when is None and timestamp:
+        try:
+            when = datetime.datetime.fromisoformat(timestamp).date()
+        except (ValueError, TypeError):
+            when = None
+    return when
+
+
+def get_storage_backend() -> str:
+    """获取配置的截图存储方式（STORAGE_BACKENDS 之一）"""
+    backend = default_config_manager.get_value("files", "storage_backend", "files")
+    return backend if backend in STORAGE_BACKENDS else "files"
+
+
+def split_archive_path(image_path) -> Optional[Tuple[str, str]]:
+    """
+    拆分已归档或打包存储的截图路径
+    
+    Returns:
+        tuple: (归档文件或打包存储目录, 其中的截图名称)，不是这种路径时返回None
+    """
+    if not image_path or ARCHIVE_SEPARATOR not in image_path:
+        return None
+    archive_file, member = image_path.split(ARCHIVE_SEPARATOR, 1)
+    return archive_file, member
+
+
+def _pack_store(container) -> Optional[BlobStore]:
+    """容器路径是打包存储目录时返回对应的打包存储"""
+    if os.path.basename(container) != PACK_DIR_NAME:
+        return None
+    return get_blob_store(container)
+
+
+def pack_image_path(save_dir, key) -> str:
+    """打包存储中截图的路径"""
+    return os.path.join(save_dir, PACK_DIR_NAME) + ARCHIVE_SEPARATOR + key
+
+
+def archive_thumbnail_path(image_path) -> Optional[str]:
+    """
+    已归档截图在磁盘上的预览图路径：保存目录/thumbnails/归档文件名/截图文件名.webp
+    
+    预览图不一定存在（比原图还大时不保存），不存在时从归档中读取原图。
+    
+    Returns:
+        Optional[str]: 预览图路径，不是归档路径时返回None
+    """
+    parts = split_archive_path(image_path)
+    if parts is None or os.path.basename(parts[0]) == PACK_DIR_NAME:
+        return None
+    archive_file, member = parts
+    root = os.path.dirname(os.path.dirname(archive_file))
+    archive_name = os.path.splitext(os.path.basename(archive_file))[0]
+    stem = os.path.splitext(member.replace("/", "_"))[0]
+    return os.path.join(root, THUMBNAIL_DIR_NAME, archive_name, stem + ".webp")
+
+
+def image_exists(image_path) -> bool:
+    """截图文件是否存在；已归档的截图只检查归档文件，打包存储的截图在内存索引中查找"""
+    parts = split_archive_path(image_path)
+    if parts is None:
+        return os.path.isfile(image_path)
+    store = _pack_store(parts[0])
+    if store is not None:
+        return os.path.isdir(parts[0]) and store.contains(parts[1])
+    return os.path.isfile(parts[0])
+
+
+def read_image_bytes(image_path) -> bytes:
+    """
+    读取截图文件内容，已归档的截图从归档文件中读取，打包存储的截图通过 mmap 读取
+    
+    Raises:
+        OSError: 文件不存在或无法读取
+        KeyError: 归档或打包存储中没有该截图
+    """
+    parts = split_archive_path(image_path)
+    if parts is None:
+        with open(image_path, "rb") as f:
+            return f.read()
+    store = _pack_store(parts[0])
+    if store is not None:
+        return store.get(parts[1])
+    with zipfile.ZipFile(parts[0]) as archive:
+        return archive.read(parts[1])
+
+
+def delete_image_file(image_path) -> bool:
+    """
+    删除截图文件
+    
+    打包存储的截图追加删除条目（空间在整理时回收）；已归档的截图只删除磁盘上的预览图，
+    归档文件中的内容保留。
+    
+    Returns:
+        bool: 是否删除了文件或截图
+    """
+    parts = split_archive_path(image_path)
+    if parts is not None:
+        store = _pack_store(parts[0])
+        if store is not None:
+            return store.delete(parts[1])
+        image_path = archive_thumbnail_path(image_path)
+    try:
+        os.remove(image_path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def resolve_image_path(image_path, timestamp=None) -> Optional[str]:
+    """
+    找到记录对应的截图文件，兼容两种目录结构
+    
+    依次尝试：记录中的路径（及不同的路径分隔符），截图保存目录下的同名文件，
+    以及按日期分文件夹后的位置（日期取自文件名，没有时取记录时间）。
+    迁移目录结构中途中断、或在另一台电脑上改变了结构时，记录仍然能找到图片。
+    已归档或打包存储的截图路径在截图存在时原样返回。
+    
+    Args:
+        image_path: 记录中的图片路径
+        timestamp: 记录时间（ISO格式），文件名中没有日期时使用
+        
+    Returns:
+        Optional[str]: 存在的文件路径，找不到时返回None
+    """
+    if not image_path:
+        return None
+    if split_archive_path(image_path):
+        return image_path if image_exists(image_path) else None
+    for path in (image_path, image_path.replace('/', '\\'), image_path.replace('\\', '/')):
+        if os.path.exists(path):
+            return path
+    
+    name = os.path.basename(image_path.replace('\\', '/'))
+    when = capture_date(name, timestamp)
+    
+    roots = [os.path.dirname(image_path), SCREENSHOT_DIR, get_save_dir()]
+    # 记录路径本身可能是 按日期分文件夹 的位置，它的上三级目录才是保存目录
+    if when is not None:
+        parent = os.path.dirname(image_path)
+        if parent.replace('\\', '/').endswith(date_subdir(when).replace('\\', '/')):
+            roots.insert(1, os.path.dirname(os.path.dirname(os.path.dirname(parent))))
+    for root in roots:
+        candidates = [os.path.join(root, name)]
+        if when is not None:
+            candidates.append(os.path.join(root, date_subdir(when), name))
+        for path in candidates:
+            if os.path.exists(path):
+                return path
+    return None
+
+
+@traced("screenshot.encode", "io")
+def write_screenshot_file(image, task_name, save_dir=None) -> str:
+    """
+    将截图编码写入保存目录（不添加记录），可以在工作线程中调用
+    
+    Args:
+        image: PIL.Image对象
+        task_name: 任务/项目名称，用于生成文件名
+        save_dir: 保存目录，默认按配置的保存目录、目录结构和存储方式获取
+        
+    Returns:
+        str: 保存的文件路径（打包存储时为 保存目录/packs!/截图名称）
+    """
+    now = datetime.datetime.now()
+    # 生成文件名：时间_项目名称.png
+    timestamp = now.strftime(FILENAME_TIME_FORMAT)
+    # 替换文件名中不允许的字符
+    safe_task = "".join([c if c.isalnum() or c in [' ', '_', '-'] else '_' for c in task_name])
+    filename = f"{timestamp}_{safe_task}.png"
+    
+    if save_dir is None and get_storage_backend() == "packed":
+        # 打包存储：编码后追加写入当前段文件，不创建新文件
+        root = get_save_dir()
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        key = get_blob_store(os.path.join(root, PACK_DIR_NAME)).put(filename, buffer.getvalue())
+        logger.debug("保存截图到打包存储: %s", key)
+        return pack_image_path(root, key)
+    
+    if save_dir is None:
+        # 按配置的目录结构放入保存目录（或其下的日期文件夹）
+        save_dir = shard_dir(get_save_dir(), now)
+    filepath = os.path.join(save_dir, filename)
+    
+    # 确保文件名不超过系统限制（通常Windows为260个字符）
+    if len(filepath) > 250:
+        # 截断项目名称
+        filepath = os.path.join(save_dir, f"{timestamp}_截图.png")
+    
+    # 获取截图质量
+    quality = default_config_manager.get_value("ui", "screenshot_quality", 90)
+    
+    # 保存截图
+    logger.debug("保存截图到: %s，质量: %s", filepath, quality)
+    image.save(filepath, quality=quality)
+    return filepath
+
+
+def add_screenshot_record(task_name, filepath, notes="") -> int:
+    """
+    为已写入磁盘的截图添加记录
+    
+    Args:
+        task_name: 任务/项目名称
+        filepath: 截图文件路径
+        notes: 附加说明
+        
+    Returns:
+        int: 新记录的ID
+    """
+    return DataManager().add_record(task_name, filepath, notes)
+
+
+@traced("screenshot.save", "io")
+def save_screenshot(image, task_name, notes="") -> Tuple[bool, str]:
+    """
+    保存截图到文件并记录到数据库
+    
+    Args:
+        image: PIL.Image对象
+        task_name: 任务/项目名称
+        notes: 附加说明
+        
+    Returns:
+        tuple: (成功标志, 消息或文件路径)
+    """
+    if not image:
+        return False, "没有可保存的截图"
+    
+    if not task_name.strip():
+        return False, "请输入项目/事务名称"
+    
+    try:
+        filepath = write_screenshot_file(image, task_name)
+        
+        # 添加记录到数据管理器
+        DataManager().add_record(task_name, filepath, notes)
+        
+        return True, filepath
+    except Exception as e:
+        error_msg = f"保存截图时发生错误: {str(e)}"
+        logger.error(error_msg)
+        # 尝试保存到用户目录作为最后的备选
+        try:
+            backup_dir = os.path.join(os.path.expanduser("~"), "留痕软件_截图")
+            os.makedirs(backup_dir, exist_ok=True)
+            backup_path = os.path.join(backup_dir, f"{datetime.datetime.now().strftime(FILENAME_TIME_FORMAT)}_备份.png")
+            image.save(backup_path)
+            return False, f"{error_msg}\n已创建备份: {backup_path}"
+        except Exception as backup_error:
+            return False, f"{error_msg}\n备份也失败: {str(backup_error)}"
+
+
+def delete_screenshot(record_id, store=None) -> Tuple[bool, str]:
+    """
+    删除记录及其截图（截图可能是普通文件、已归档或在打包存储中）
+    
+    Args:
+        record_id: 记录ID
+        store: 记录库，默认为 DataManager()
+        
+    Returns:
+        tuple: (是否成功, 图片路径或错误消息)
+    """
+    store = store or DataManager()
+    record = store.get_record_by_id(record_id) or {}
+    success, image_path = store.delete_record(record_id)
+    if not success:
+        return success, image_path
+    # 文件可能已迁移到另一种目录结构
+    resolved = resolve_image_path(image_path, record.get("timestamp")) or image_path
+    try:
+        delete_image_file(resolved)
+    except OSError as e:
+        # 删除失败的文件会在"文件设置 - 存储检查"中作为孤立文件列出
+        logger.warning("删除截图文件失败: %s (%s)", resolved, e)
+    return success, image_path
+
+
+@traced("preview.load", "io")
+def load_image_from_path(image_path) -> Optional[Image.Image]:
+    """
+    从文件路径加载图像
+    
+    Args:
+        image_path: 图像文件路径，也可以是已归档截图的路径（归档文件!/文件名）
+        
+    Returns:
+        PIL.Image: 图像对象，如果加载失败则返回None
+    """
+    try:
+        # 兼容不同的路径分隔符和目录结构
+        path = resolve_image_path(image_path)
+        if path is None:
+            return None
+        if split_archive_path(path):
+            # 已归档的截图从归档文件中读出后解码
+            return Image.open(io.BytesIO(read_image_bytes(path)))
+        return Image.open(path)
+    except Exception as e:
+        logger.error("加载图片失败: %s", e)
+        return None
@@ -0,0 +1,367 @@
+"""
+截图分级存储模块 - 把超过保留期的截图重新编码（可缩小）后打包进按月归档文件，只在磁盘上保留预览图，不依赖tkinter
+
+归档文件是普通 ZIP（图片已压缩，按存储方式写入）：保存目录/archive/YYYY-MM_运行时间.zip，
+记录的 image_path 改写为 "归档文件!/归档中的文件名"，load_image_from_path 会直接从归档中读取；
+预览图保存在 保存目录/thumbnails/ 下（见 archive_thumbnail_path）。
+
+每个月份单独处理：先写完归档文件（临时文件，同步到磁盘后替换），再在一个事务中改写记录，
+最后删除原文件。任何一步中断都不会丢失截图，最多留下完整性检查能找到的多余文件。
+"""
+
+import io
+import os
+import shutil
+import zipfile
+import datetime
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, features
+
+from src.core.integrity import path_key, screenshot_dirs
+from src.core.records import RecordStore
+from src.core.screenshots import (
+    ARCHIVE_DIR_NAME, THUMBNAIL_DIR_NAME, archive_thumbnail_path, resolve_image_path,
+    split_archive_path, unique_path
+)
+from src.utils.config_manager import default_config_manager
+from src.utils.log_manager import get_logger
+from src.utils.perf_trace import traced
+
+logger = get_logger(__name__)
+
+# 归档时可选的编码格式 -> 文件扩展名
+ARCHIVE_FORMATS = {"webp": ".webp", "jpeg": ".jpg", "png": ".png"}
+# 每处理多少张截图报告一次进度并检查是否取消（重新编码较慢，间隔比其他批处理小）
+PROGRESS_EVERY = 20
+# 预览图的 WebP 质量
+THUMBNAIL_QUALITY = 75
+
+
+class TieringPolicy(NamedTuple):
+    """归档策略，对应配置中的 storage 部分"""
+    enabled: bool = False
+    archive_after_days: int = 180
+    image_format: str = "webp"
+    lossless: bool = True
+    quality: int = 80
+    max_dimension: int = 0
+    thumbnail_size: int = 480
+    check_interval_hours: float = 24
+
+
+class TieringResult(NamedTuple):
+    """归档结果"""
+    archived: int               # 归档的截图数（dry_run 时为需要归档的截图数）
+    archives: List[str]         # 新建的归档文件
+    bytes_before: int           # 归档前原文件的总大小
+    bytes_after: int            # 归档文件和预览图的总大小
+    failures: List[str]         # 无法读取或编码的截图
+    cancelled: bool             # 是否中途取消
+
+
+def load_policy(config_manager=None) -> TieringPolicy:
+    """从配置读取归档策略"""
+    config_manager = config_manager or default_config_manager
+    defaults = TieringPolicy()
+
+    def get(key, default):
+        return config_manager.get_value("storage", key, default)
+
+    image_format = get("archive_format", defaults.image_format)
+    return TieringPolicy(
+        enabled=bool(get("tiering_enabled", defaults.enabled)),
+        archive_after_days=max(1, int(get("archive_after_days", defaults.archive_after_days))),
+        image_format=image_format if image_format in ARCHIVE_FORMATS else defaults.image_format,
+        lossless=bool(get("archive_lossless", defaults.lossless)),
+        quality=min(100, max(1, int(get("archive_quality", defaults.quality)))),
+        max_dimension=max(0, int(get("max_dimension", defaults.max_dimension))),
+        thumbnail_size=max(16, int(get("thumbnail_size", defaults.thumbnail_size))),
+        check_interval_hours=max(1, float(get("check_interval_hours", defaults.check_interval_hours))),
+    )
+
+
+def _record_time(record) -> Optional[datetime.datetime]:
+    """记录的截图时间"""
+    for key in ("timestamp", "created_at"):
+        try:
+            return datetime.datetime.fromisoformat(record[key])
+        except (KeyError, ValueError, TypeError):
+            continue
+    return None
+
+
+def _encode(image: Image.Image, policy: TieringPolicy) -> Tuple[bytes, str]:
+    """按策略缩小并重新编码截图，返回 (编码后的内容, 扩展名)"""
+    if policy.max_dimension and max(image.size) > policy.max_dimension:
+        image = image.copy()
+        image.thumbnail((policy.max_dimension, policy.max_dimension), Image.LANCZOS)
+    image_format = policy.image_format
+    if image_format == "webp" and not features.check("webp"):
+        # 当前的 Pillow 不支持 WebP 时改用 JPEG
+        image_format = "jpeg"
+
+    buffer = io.BytesIO()
+    if image_format == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=policy.quality, optimize=True)
+    elif image_format == "webp":
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.mode or "transparency" in image.info else "RGB")
+        # 无损模式下 quality 表示压缩力度，80 与最高力度相比只大几个百分点，但快几十倍
+        image.save(buffer, "WEBP", lossless=policy.lossless, quality=policy.quality, method=4)
+    else:
+        image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue(), ARCHIVE_FORMATS[image_format]
+
+
+def _save_thumbnail(image: Image.Image, path: str, size: int, limit: int) -> int:
+    """
+    保存预览图，返回文件大小
+
+    预览图不比归档后的原图小时（色块为主的截图无损压缩后往往只有几KB），或者当前的 Pillow
+    不支持 WebP 时不保存，查看时直接从归档中读取原图。
+    """
+    if not features.check("webp"):
+        return 0
+    thumbnail = image.copy()
+    thumbnail.thumbnail((size, size), Image.LANCZOS)
+    if thumbnail.mode not in ("RGB", "RGBA"):
+        thumbnail = thumbnail.convert("RGB")
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+    if buffer.tell() >= limit:
+        return 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+    return buffer.tell()
+
+
+def find_candidates(store: RecordStore, policy: TieringPolicy, directories: Optional[List[str]] = None,
+                    now: Optional[datetime.datetime] = None) -> Dict[Tuple[str, str], Dict[str, List[dict]]]:
+    """
+    找出需要归档的截图
+
+    只处理截图保存目录中的文件；导入时直接引用的其他位置的图片不会被移动或删除。
+
+    Returns:
+        dict: (保存目录, YYYY-MM) -> {截图路径: 引用它的记录列表}
+    """
+    roots = list(directories) if directories is not None else screenshot_dirs()
+    root_prefixes = [(path_key(root).rstrip("/") + "/", root) for root in roots]
+    cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=policy.archive_after_days)
+
+    store.refresh()
+    groups: Dict[Tuple[str, str], Dict[str, List[dict]]] = {}
+    for record in store.snapshot():
+        image_path = record.get("image_path")
+        when = _record_time(record)
+        if not image_path or when is None or when >= cutoff or split_archive_path(image_path):
+            continue
+        path = resolve_image_path(image_path, record.get("timestamp"))
+        if path is None:
+            continue
+        key = path_key(path)
+        for prefix, root in root_prefixes:
+            if key.startswith(prefix):
+                # 归档文件夹和预览图文件夹中的文件由本模块管理
+                if key[len(prefix):].split("/", 1)[0] in (ARCHIVE_DIR_NAME, THUMBNAIL_DIR_NAME):
+                    break
+                groups.setdefault((root, when.strftime("%Y-%m")), {}).setdefault(path, []).append(record)
+                break
+    return groups
+
+
+def _discard(temp_path: str, thumbnail_dir: str) -> None:
+    """放弃写了一半的归档文件和它的预览图"""
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    shutil.rmtree(thumbnail_dir, ignore_errors=True)
+
+
+def _archive_group(store: RecordStore, root: str, month: str, files: Dict[str, List[dict]],
+                   policy: TieringPolicy, run_stamp: str, step: Callable[[], bool]):
+    """
+    把一个月份的截图写入一个归档文件并改写记录
+
+    Returns:
+        tuple: (归档文件路径或None, 归档的截图数, 原文件大小, 归档后大小, 失败信息, 是否取消)
+    """
+    archive_dir = os.path.join(root, ARCHIVE_DIR_NAME)
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_path = unique_path(archive_dir, f"{month}_{run_stamp}.zip")
+    temp_path = archive_path + ".part"
+    thumbnail_dir = os.path.join(root, THUMBNAIL_DIR_NAME, os.path.splitext(os.path.basename(archive_path))[0])
+
+    # 记录ID -> (原路径, 新路径)
+    changes: Dict[int, Tuple[str, str]] = {}
+    archived_files = []
+    failures = []
+    bytes_before = bytes_after = 0
+    cancelled = False
+    used = set()
+    try:
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for path, records in files.items():
+                if not step():
+                    cancelled = True
+                    break
+                try:
+                    with open(path, "rb") as f:
+                        original = f.read()
+                    with Image.open(io.BytesIO(original)) as image:
+                        image.load()
+                        data, ext = _encode(image, policy)
+                        source_ext = os.path.splitext(path)[1].lower()
+                        if len(data) >= len(original) and not policy.max_dimension:
+                            # 重新编码没有变小（例如原图已是 JPEG）时保留原文件内容
+                            data, ext = original, source_ext
+                        day = (_record_time(records[0]) or datetime.datetime.now()).strftime("%Y-%m-%d")
+                        stem = os.path.splitext(os.path.basename(path))[0]
+                        member = f"{day}/{stem}{ext}"
+                        index = 1
+                        while member in used:
+                            member = f"{day}/{stem}_{index}{ext}"
+                            index += 1
+                        used.add(member)
+                        new_path = f"{archive_path}!/{member}"
+                        bytes_after += _save_thumbnail(image, archive_thumbnail_path(new_path),
+                                                       policy.thumbnail_size, len(data))
+                except Exception as e:
+                    failures.append(f"{path}: {e}")
+                    continue
+                archive.writestr(member, data)
+                bytes_before += len(original)
+                bytes_after += len(data)
+                archived_files.append(path)
+                for record in records:
+                    changes[record["id"]] = (record.get("image_path"), new_path)
+
+        if cancelled or not changes:
+            _discard(temp_path, thumbnail_dir)
+            return None, 0, 0, 0, failures, cancelled
+        # 原文件会被删除，归档文件先同步到磁盘
+        with open(temp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, archive_path)
+    except BaseException:
+        _discard(temp_path, thumbnail_dir)
+        raise
+
+    # 只改写在此期间没有被修改或删除的记录
+    with store.batch():
+        paths = {}
+        for record_id, (old_path, new_path) in changes.items():
+            record = store.get_record_by_id(record_id)
+            if record is not None and record.get("image_path") == old_path:
+                paths[record_id] = new_path
+        store.set_image_paths(paths)
+
+    archived = 0
+    for path in archived_files:
+        if all(record["id"] in paths for record in files[path]):
+            try:
+                os.remove(path)
+                archived += 1
+            except OSError as e:
+                failures.append(f"{path}: {e}")
+    return archive_path, archived, bytes_before, bytes_after, failures, cancelled
+
+
+@traced("storage.tiering", "io")
+def archive_old_screenshots(store: RecordStore, policy: Optional[TieringPolicy] = None,
+                            directories: Optional[List[str]] = None,
+                            progress: Optional[Callable[[int, int], None]] = None,
+                            cancel_event: Optional[threading.Event] = None,
+                            dry_run: bool = False, now: Optional[datetime.datetime] = None) -> TieringResult:
+    """
+    把超过保留期的截图打包进归档文件，只保留预览图
+
+    Args:
+        store: 记录库
+        policy: 归档策略，默认读取配置（不检查 enabled，调用即执行）
+        directories: 截图保存目录，默认为 screenshot_dirs()
+        progress: 进度回调，参数为 (已处理数, 总数)
+        cancel_event: 设置后停止；已完成的月份保留，正在处理的月份放弃
+        dry_run: 只统计需要归档的截图，不做任何修改
+        now: 当前时间（用于计算保留期）
+
+    Returns:
+        TieringResult: 归档结果
+    """
+    policy = policy or load_policy()
+    groups = find_candidates(store, policy, directories, now)
+    total = sum(len(files) for files in groups.values())
+    if dry_run:
+        size = sum(os.path.getsize(path) for files in groups.values() for path in files if os.path.exists(path))
+        return TieringResult(total, [], size, 0, [], False)
+
+    run_stamp = (now or datetime.datetime.now()).strftime("%Y%m%d%H%M%S")
+    done = 0
+
+    def step():
+        nonlocal done
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        done += 1
+        if progress and done % PROGRESS_EVERY == 0:
+            progress(done, total)
+        return True
+
+    archives = []
+    failures = []
+    archived = bytes_before = bytes_after = 0
+    cancelled = False
+    for (root, month), files in sorted(groups.items()):
+        archive_path, count, before, after, group_failures, cancelled = _archive_group(
+            store, root, month, files, policy, run_stamp, step)
+        failures.extend(group_failures)
+        if archive_path:
+            archives.append(archive_path)
+            archived += count
+            bytes_before += before
+            bytes_after += after
+        if cancelled:
+            break
+
+    if progress and not cancelled:
+        progress(total, total)
+    if failures:
+        logger.warning("有 %s 个截图归档失败: %s", len(failures), failures[:5])
+    logger.info("归档旧截图：%s 个截图写入 %s 个归档文件，%s -> %s 字节%s",
+                archived, len(archives), bytes_before, bytes_after, "（已取消）" if cancelled else "")
+    return TieringResult(archived, archives, bytes_before, bytes_after, failures, cancelled)
+
+
+def tier_in_background(store: RecordStore, done: Callable[[Optional[TieringResult], Optional[Exception]], None],
+                       policy: Optional[TieringPolicy] = None,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       cancel_event: Optional[threading.Event] = None) -> threading.Thread:
+    """
+    在后台线程中归档旧截图
+
+    回调都在归档线程中调用，不能直接操作 Tk 控件。
+
+    Args:
+        store: 记录库
+        done: 完成回调，参数为 (归档结果或None, 异常或None)
+        policy: 归档策略，默认读取配置
+        progress: 进度回调，参数为 (已处理数, 总数)
+        cancel_event: 用于取消归档
+
+    Returns:
+        threading.Thread: 归档线程
+    """
+    def run():
+        try:
+            result = archive_old_screenshots(store, policy, progress=progress, cancel_event=cancel_event)
+        except Exception as e:
+            logger.error("归档旧截图失败: %s", e)
+            done(None, e)
+            return
+        done(result, None)
+
+    thread = threading.Thread(target=run, name="StorageTiering", daemon=True)
+    thread.start()
+    return thread
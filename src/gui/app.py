@@ -7,8 +7,9 @@ from tkinter import ttk, messagebox
 import os
 import sys
 import threading
+import queue
+import functools
 from PIL import Image, ImageTk
-import time
 
 from src.config import (
     APP_NAME, APP_WINDOW_SIZE, 
@@ -20,13 +21,29 @@ from src.config import (
     DEFAULT_REMINDER_TIME, REMINDER_MESSAGE, REMINDER_SOUND_ENABLED,
     INTERVAL_REMINDER_MINUTES, INTERVAL_REMINDER_MESSAGE
 )
-from src.utils.screenshot import take_fullscreen_screenshot, resize_image_for_preview, save_screenshot, take_region_screenshot
-from src.utils.time_utils import get_current_time_str, parse_time_string, calculate_next_reminder_time, time_until_next_reminder, format_time_delta, calculate_next_interval_reminder
-from src.gui.records_view import RecordsView
-from src.gui.editor import ScreenshotEditor  # 添加编辑器导入
+from src.utils.screenshot import (
+    take_fullscreen_screenshot, resize_image_for_preview, save_screenshot, take_region_screenshot,
+    write_screenshot_file, add_screenshot_record
+)
+from src.utils.capture import get_capture_area, preload_capture_backend
+from src.utils.auto_capture import AutoCapture
+from src.utils.scheduler import TimerScheduler, MISSED_FIRE_ONCE, MISSED_POLICIES
+from src.utils.ui_ticker import UITicker
+from src.utils.reminder_rules import ReminderRuleSet
+from src.utils.time_utils import get_current_time_str, parse_time_string, calculate_next_reminder_time, time_until_next_reminder, format_time_delta
+from src.utils.data_manager import preload_data_manager
 from src.utils.theme_manager import default_theme_manager
 from src.utils.config_manager import default_config_manager
-from src.gui.config_window import ConfigWindow
+from src.utils.log_manager import get_logger, setup_logging
+from src.utils.perf_trace import default_tracer
+# 编辑器、记录查询和设置窗口在第一次打开时才导入，加快启动
+
+logger = get_logger(__name__)
+
+# 启动后多久开始第一次归档旧截图（毫秒）
+STORAGE_TIERING_START_DELAY_MS = 5 * 60 * 1000
+# 多久重新读取一次归档配置（秒），设置中开启、关闭或修改间隔后不需要重启
+STORAGE_TIERING_POLL_SECONDS = 15 * 60
 
 
 class ActivityTrackerApp:
@@ -70,18 +87,41 @@ class ActivityTrackerApp:
         self.current_screenshot = None
         self.screenshot_preview = None
         
+        # 提醒调度器（单个after回调驱动所有定时器）
+        self.scheduler = TimerScheduler(
+            self.root,
+            policy=default_config_manager.get_value("reminder", "missed_policy", MISSED_FIRE_ONCE)
+        )
+        
         # 定时提醒相关变量
         self.reminder_active = False
-        self.reminder_thread = None
-        self.next_reminder_time = None
+        self.reminder_handle = None
         
         # 间隔提醒相关变量
         self.interval_reminder_active = False
-        self.interval_reminder_thread = None
-        self.next_interval_time = None
-        
-        # 启动时间更新
-        self.update_time()
+        self.interval_handle = None
+        
+        # 规则提醒相关变量
+        self.reminder_rules = None
+        self.rule_handles = {}
+        
+        # 自动截图相关变量
+        self.auto_capture = None
+        # 自动截图线程保存成功后把截图路径放入队列，界面线程定时取出更新状态（Tk 不是线程安全的）
+        self.auto_capture_results = queue.SimpleQueue()
+        self.auto_capture_poll = None
+        
+        # 旧截图归档（分级存储）相关变量
+        self.tiering_thread = None
+        self.tiering_cancel = threading.Event()
+        # 上一次开始归档的单调时间
+        self.tiering_last_run = None
+        self.compaction_thread = None
+        
+        # 所有周期性界面刷新共用一个刷新器，时钟对齐到整秒刷新
+        self.ui_ticker = UITicker(self.root)
+        self.ui_ticker.subscribe(self.update_time, 1, align=True)
+        self.status_refresh = None
         
         # 绑定窗口大小改变事件
         self.root.bind("<Configure>", self.on_resize)
@@ -95,6 +135,25 @@ class ActivityTrackerApp:
         # 居中窗口
         self.center_window()
         
+        # 窗口显示后再在后台线程中加载记录数据、探测最快的截图后端，避免拖慢启动和阻塞界面
+        self.root.after_idle(preload_data_manager)
+        self.root.after_idle(preload_capture_backend)
+        
+        # 加载并启用配置中的提醒规则
+        self.load_reminder_rules()
+        
+        # 按配置自动开启定时截图
+        if default_config_manager.get_value("auto_capture", "enabled", False):
+            self.auto_capture_var.set(True)
+            self.root.after_idle(self.start_auto_capture)
+        
+        # 按配置在后台定期归档旧截图，启动一段时间后再开始，避免与启动争抢磁盘；
+        # 每次检查时重新读取配置，之后在设置中开启归档也会生效
+        self.root.after(STORAGE_TIERING_START_DELAY_MS, self._schedule_storage_tiering)
+        # 同样在后台定期整理打包存储，回收已删除截图的空间（没有打包存储时什么也不做，
+        # 之后在设置中改为打包存储也不需要重启）
+        self.root.after(STORAGE_TIERING_START_DELAY_MS, self._schedule_pack_compaction)
+        
         # 设置窗口关闭协议
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -116,7 +175,7 @@ class ActivityTrackerApp:
             # 如果图标目录不存在，则创建
             if not os.path.exists(icons_dir):
                 os.makedirs(icons_dir)
-                print(f"创建图标目录: {icons_dir}")
+                logger.info("创建图标目录: %s", icons_dir)
             
             # 加载图标 (如果文件不存在，不会崩溃，只是不显示图标)
             self.icons = {}
@@ -140,9 +199,9 @@ class ActivityTrackerApp:
                             img = img.resize((24, 24), Image.LANCZOS)
                             self.icons[icon_name] = ImageTk.PhotoImage(img)
                 except Exception as e:
-                    print(f"图标加载失败 {icon_name}: {e}")
+                    logger.warning("图标加载失败 %s: %s", icon_name, e)
         except Exception as e:
-            print(f"图标加载过程出错: {e}")
+            logger.warning("图标加载过程出错: %s", e)
     
     def _setup_styles(self):
         """
@@ -395,7 +454,7 @@ class ActivityTrackerApp:
                 if 'foreground' in parent.config():
                     parent.configure(foreground=self.current_colors["neutral"] if self.is_dark_mode else "#333333")
         except Exception as e:
-            print(f"更新控件颜色失败: {e}")
+            logger.debug("更新控件颜色失败: %s", e)
         
         # 递归更新子控件
         for child in parent.winfo_children():
@@ -528,6 +587,16 @@ class ActivityTrackerApp:
             state=tk.DISABLED
         )
         self.reset_interval_btn.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # 规则提醒状态（规则在应用设置中编辑）
+        ttk.Separator(reminder_group, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+        
+        rules_frame = ttk.Frame(reminder_group)
+        rules_frame.pack(fill=tk.X)
+        
+        ttk.Label(rules_frame, text="规则提醒:", font=UI_FONT_BOLD).pack(side=tk.LEFT, anchor='w')
+        self.rule_status_var = tk.StringVar(value="未设置")
+        ttk.Label(rules_frame, textvariable=self.rule_status_var, style="Info.TLabel").pack(side=tk.LEFT, padx=(5, 0))
     
     def _create_preview_frame(self):
         """
@@ -585,6 +654,21 @@ class ActivityTrackerApp:
             value="region"
         ).pack(side=tk.LEFT)
         
+        # 定时自动截图开关
+        auto_frame = ttk.Frame(screenshot_group)
+        auto_frame.pack(fill=tk.X)
+        
+        self.auto_capture_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            auto_frame,
+            text="定时自动截图",
+            variable=self.auto_capture_var,
+            command=self.toggle_auto_capture
+        ).pack(side=tk.LEFT)
+        
+        self.auto_capture_status_var = tk.StringVar(value="")
+        ttk.Label(auto_frame, textvariable=self.auto_capture_status_var, style="Info.TLabel").pack(side=tk.LEFT, padx=(10, 0))
+        
         # 操作按钮区域
         button_group = ttk.LabelFrame(self.control_frame, text="操作", padding=15)
         button_group.pack(fill=tk.X)
@@ -668,7 +752,6 @@ class ActivityTrackerApp:
         更新时间显示
         """
         self.time_label.config(text=get_current_time_str())
-        self.root.after(1000, self.update_time)  # 每秒更新一次
     
     def on_enter_pressed(self):
         """
@@ -699,6 +782,7 @@ class ActivityTrackerApp:
             # 如果截图成功
             if self.current_screenshot:
                 # 打开编辑器让用户进行标注
+                from src.gui.editor import ScreenshotEditor
                 editor = ScreenshotEditor(self.root, self.current_screenshot, self.is_dark_mode)
                 edited_image = editor.get_result()
                 
@@ -731,7 +815,7 @@ class ActivityTrackerApp:
         except Exception as e:
             self.status_label.config(text="截图失败")
             messagebox.showerror("错误", f"截图过程中发生错误: {str(e)}")
-            print(f"截图错误: {e}")
+            logger.exception("截图错误: %s", e)
     
     def display_screenshot(self):
         """
@@ -783,7 +867,7 @@ class ActivityTrackerApp:
         except Exception as e:
             self.status_label.config(text="保存失败")
             messagebox.showerror("错误", f"保存过程中发生错误: {str(e)}")
-            print(f"保存错误: {e}")
+            logger.exception("保存错误: %s", e)
     
     def clear_screenshot(self):
         """
@@ -804,6 +888,7 @@ class ActivityTrackerApp:
         self.status_label.config(text="打开记录查询...")
         
         # 创建记录查询视图
+        from src.gui.records_view import RecordsView
         records_view = RecordsView(self)
         
         # 将records_view实例存储在self中，以便于后续访问
@@ -825,14 +910,22 @@ class ActivityTrackerApp:
         """
         窗口关闭时的处理
         """
-        # 停止提醒线程
+        # 停止所有提醒定时器
         if self.reminder_active:
             self.stop_reminder()
         
-        # 停止间隔提醒线程
         if self.interval_reminder_active:
             self.stop_interval_reminder()
         
+        self.scheduler.shutdown()
+        self.ui_ticker.stop()
+        
+        # 停止自动截图线程
+        self.stop_auto_capture()
+        
+        # 停止正在进行的旧截图归档（已完成的月份会保留）
+        self.tiering_cancel.set()
+        
         # 关闭窗口
         self.root.destroy()
 
@@ -869,19 +962,19 @@ class ActivityTrackerApp:
         # 停止任何现有的提醒
         self.stop_reminder()
         
-        # 计算下一次提醒的时间
-        self.next_reminder_time = calculate_next_reminder_time(hours, minutes)
-        
         # 更新状态
         self.reminder_active = True
         self.reminder_btn.config(text="禁用提醒")
         
-        # 创建并启动提醒线程
-        self.reminder_thread = threading.Thread(target=self._reminder_loop, daemon=True)
-        self.reminder_thread.start()
+        # 注册每天同一时间触发的定时器
+        self.reminder_handle = self.scheduler.call_recurring(
+            functools.partial(calculate_next_reminder_time, hours, minutes),
+            self._on_reminder_due
+        )
         
         # 显示下一次提醒的时间
         self.update_reminder_status()
+        self._schedule_status_refresh()
         self.status_label.config(text=f"定时提醒已设置：{hours:02d}:{minutes:02d}")
         
     def stop_reminder(self):
@@ -889,52 +982,35 @@ class ActivityTrackerApp:
         停止定时提醒
         """
         self.reminder_active = False
-        self.next_reminder_time = None
-        self.reminder_thread = None  # 线程会自动结束，因为它是守护线程
+        self.scheduler.cancel(self.reminder_handle)
+        self.reminder_handle = None
+        self._schedule_status_refresh()
     
     def update_reminder_status(self):
         """
         更新提醒状态显示
         """
-        if not self.reminder_active or not self.next_reminder_time:
+        if not self.reminder_active or not self.reminder_handle:
             self.reminder_status_var.set("未设置")
             return
         
-        seconds_left = time_until_next_reminder(self.next_reminder_time)
+        next_reminder_time = self.reminder_handle.due_datetime
+        seconds_left = time_until_next_reminder(next_reminder_time)
         time_left_str = format_time_delta(seconds_left)
-        next_time_str = self.next_reminder_time.strftime("%H:%M")
+        next_time_str = next_reminder_time.strftime("%H:%M")
         
         self.reminder_status_var.set(f"下次提醒: {next_time_str} (剩余 {time_left_str})")
-        
-        # 每分钟更新一次
-        self.root.after(60000, self.update_reminder_status)
     
-    def _reminder_loop(self):
+    def _on_reminder_due(self):
         """
-        提醒线程的主循环
+        定时提醒到期时由调度器调用
         """
-        while self.reminder_active and self.next_reminder_time:
-            # 计算等待时间
-            seconds_to_wait = time_until_next_reminder(self.next_reminder_time)
-            
-            if seconds_to_wait <= 0:
-                # 到达提醒时间，触发提醒
-                self._trigger_reminder()
-                
-                # 更新为下一天的同一时间
-                hours = self.next_reminder_time.hour
-                minutes = self.next_reminder_time.minute
-                self.next_reminder_time = calculate_next_reminder_time(hours, minutes)
-                
-                # 更新状态
-                self.root.after(0, self.update_reminder_status)
-            
-            # 等待1分钟或剩余时间（较小值）
-            time.sleep(min(60, max(1, seconds_to_wait)))
-            
-            # 如果提醒已被禁用，退出循环
-            if not self.reminder_active:
-                break
+        if not self.reminder_active:
+            return
+        
+        # 调度器在回调结束后才安排下一次触发，空闲时再刷新状态
+        self.root.after_idle(self.update_reminder_status)
+        self._trigger_reminder()
     
     def _trigger_reminder(self):
         """
@@ -982,72 +1058,134 @@ class ActivityTrackerApp:
         # 停止任何现有的间隔提醒
         self.stop_interval_reminder()
         
-        # 计算下一次间隔提醒的时间
-        self.next_interval_time = calculate_next_interval_reminder()
-        
         # 更新状态
         self.interval_reminder_active = True
         self.interval_btn.config(text="禁用间隔提醒")
         self.reset_interval_btn.config(state=tk.NORMAL)  # 启用重置按钮
         
-        # 创建并启动间隔提醒线程
-        self.interval_reminder_thread = threading.Thread(target=self._interval_loop, daemon=True)
-        self.interval_reminder_thread.start()
+        # 按单调时间计算间隔，不受系统改时影响
+        self.interval_handle = self.scheduler.call_every(INTERVAL_REMINDER_MINUTES * 60, self._on_interval_due)
         
         # 显示下一次间隔提醒的时间
         self.update_interval_status()
-        self.status_label.config(text=f"间隔提醒已设置：{self.next_interval_time.strftime('%H:%M')}")
+        self._schedule_status_refresh()
+        self.status_label.config(text=f"间隔提醒已设置：{self.interval_handle.due_datetime.strftime('%H:%M')}")
         
     def stop_interval_reminder(self):
         """
         停止间隔提醒
         """
         self.interval_reminder_active = False
-        self.next_interval_time = None
-        self.interval_reminder_thread = None  # 线程会自动结束，因为它是守护线程
+        self.scheduler.cancel(self.interval_handle)
+        self.interval_handle = None
+        self._schedule_status_refresh()
         self.reset_interval_btn.config(state=tk.DISABLED)  # 禁用重置按钮
     
     def update_interval_status(self):
         """
         更新间隔提醒状态显示
         """
-        if not self.interval_reminder_active or not self.next_interval_time:
+        if not self.interval_reminder_active or not self.interval_handle:
             self.interval_status_var.set("未启用")
             return
         
-        seconds_left = time_until_next_reminder(self.next_interval_time)
+        next_interval_time = self.interval_handle.due_datetime
+        seconds_left = time_until_next_reminder(next_interval_time)
         time_left_str = format_time_delta(seconds_left)
-        next_time_str = self.next_interval_time.strftime("%H:%M")
+        next_time_str = next_interval_time.strftime("%H:%M")
         
         self.interval_status_var.set(f"下次提醒: {next_time_str} (剩余 {time_left_str})")
+    
+    def _on_interval_due(self):
+        """
+        间隔提醒到期时由调度器调用
+        """
+        if not self.interval_reminder_active:
+            return
         
-        # 每分钟更新一次
-        self.root.after(60000, self.update_interval_status)
+        self.root.after_idle(self.update_interval_status)
+        self._trigger_interval_reminder()
     
-    def _interval_loop(self):
+    def _schedule_status_refresh(self):
         """
-        间隔提醒线程的主循环
+        有提醒启用时每分钟刷新一次剩余时间，全部关闭后不再刷新
         """
-        while self.interval_reminder_active and self.next_interval_time:
-            # 计算等待时间
-            seconds_to_wait = time_until_next_reminder(self.next_interval_time)
-            
-            if seconds_to_wait <= 0:
-                # 到达间隔提醒时间，触发提醒
-                self._trigger_interval_reminder()
-                
-                # 计算下一次间隔提醒时间
-                self.next_interval_time = calculate_next_interval_reminder()
-                
-                # 更新状态
-                self.root.after(0, self.update_interval_status)
-            
-            # 等待1分钟或剩余时间（较小值）
-            time.sleep(min(60, max(1, seconds_to_wait)))
-            
-            # 如果提醒已被禁用，退出循环
-            if not self.interval_reminder_active:
-                break
+        needed = self.reminder_active or self.interval_reminder_active or bool(self.rule_handles)
+        if needed and self.status_refresh is None:
+            # 状态文字只在窗口可见时需要刷新，最小化时由刷新器暂停
+            self.status_refresh = self.ui_ticker.subscribe(self._refresh_reminder_status, 60, immediate=False)
+        elif not needed and self.status_refresh is not None:
+            self.status_refresh.unsubscribe()
+            self.status_refresh = None
+    
+    def _refresh_reminder_status(self):
+        """
+        刷新所有提醒的状态显示
+        """
+        self.update_reminder_status()
+        self.update_interval_status()
+        self.update_rule_status()
+    
+    def load_reminder_rules(self):
+        """
+        从配置加载提醒规则，并为每条启用的规则注册定时器
+        """
+        for handle in self.rule_handles.values():
+            self.scheduler.cancel(handle)
+        self.rule_handles = {}
+        
+        self.reminder_rules = ReminderRuleSet.from_config(default_config_manager)
+        for rule in self.reminder_rules.rules:
+            handle = self.scheduler.call_recurring(
+                functools.partial(self.reminder_rules.next_fire, rule),
+                self._on_rule_due, rule
+            )
+            if not handle.cancelled:
+                self.rule_handles[id(rule)] = handle
+        
+        self.update_rule_status()
+        self._schedule_status_refresh()
+    
+    def _on_rule_due(self, rule):
+        """
+        规则提醒到期时由调度器调用
+        
+        Args:
+            rule: 提醒规则
+        """
+        self.root.after_idle(self.update_rule_status)
+        self.root.after(0, self.show_rule_reminder, rule)
+    
+    def show_rule_reminder(self, rule):
+        """
+        显示规则提醒对话框
+        
+        Args:
+            rule: 提醒规则
+        """
+        messagebox.showinfo(f"工作记录提醒 - {rule.name}", rule.message or REMINDER_MESSAGE)
+        
+        if REMINDER_SOUND_ENABLED:
+            self.root.bell()
+    
+    def update_rule_status(self):
+        """
+        更新规则提醒状态显示
+        """
+        if not self.reminder_rules or not self.rule_handles:
+            self.rule_status_var.set("未设置")
+            return
+        
+        # 去掉不再触发的规则，再取调度器中最早的一次
+        self.rule_handles = {key: h for key, h in self.rule_handles.items() if not h.cancelled}
+        if not self.rule_handles:
+            self.rule_status_var.set("未设置")
+            return
+        handle = min(self.rule_handles.values(), key=lambda h: h.when)
+        rule = handle.args[0]
+        seconds_left = time_until_next_reminder(handle.due_datetime)
+        next_time_str = handle.due_datetime.strftime("%m-%d %H:%M")
+        self.rule_status_var.set(f"{rule.name}: {next_time_str} (剩余 {format_time_delta(seconds_left)})")
     
     def _trigger_interval_reminder(self):
         """
@@ -1074,13 +1212,132 @@ class ActivityTrackerApp:
         if not self.interval_reminder_active:
             return
             
-        # 重新计算下一次间隔提醒的时间
-        self.next_interval_time = calculate_next_interval_reminder()
+        # 替换原有定时器，从现在重新开始计时
+        self.scheduler.cancel(self.interval_handle)
+        self.interval_handle = self.scheduler.call_every(INTERVAL_REMINDER_MINUTES * 60, self._on_interval_due)
         
         # 更新状态显示
         self.update_interval_status()
         self.status_label.config(text="间隔提醒已重置，计时器已重新开始")
 
+    def toggle_auto_capture(self):
+        """
+        启用或禁用定时自动截图
+        """
+        if self.auto_capture_var.get():
+            self.start_auto_capture()
+        else:
+            self.stop_auto_capture()
+            self.status_label.config(text="定时自动截图已关闭")
+    
+    def start_auto_capture(self):
+        """
+        启动定时自动截图
+        """
+        self.stop_auto_capture()
+        area = get_capture_area(self.root)
+        self.auto_capture = AutoCapture.from_config(self._save_auto_capture, area=area,
+                                                    on_saved=self.auto_capture_results.put)
+        self.auto_capture.start()
+        self.auto_capture_poll = self.ui_ticker.subscribe(self._poll_auto_capture, 1, immediate=False)
+        self.auto_capture_status_var.set(f"每 {int(self.auto_capture.interval_seconds)} 秒")
+        self.status_label.config(text="定时自动截图已开启")
+    
+    def stop_auto_capture(self):
+        """
+        停止定时自动截图
+        """
+        if self.auto_capture:
+            self.auto_capture.stop()
+            self.auto_capture = None
+        if self.auto_capture_poll is not None:
+            self.auto_capture_poll.unsubscribe()
+            self.auto_capture_poll = None
+        self.auto_capture_status_var.set("")
+    
+    def _save_auto_capture(self, image, task_name):
+        """
+        保存自动截图（在自动截图工作线程中调用）
+        
+        编码写盘和写入记录都在工作线程完成，避免界面卡顿。
+        
+        Args:
+            image: 截图
+            task_name: 自动生成的事务名称
+            
+        Returns:
+            str: 截图路径
+        """
+        filepath = write_screenshot_file(image, task_name)
+        add_screenshot_record(task_name, filepath)
+        return filepath
+    
+    def _poll_auto_capture(self):
+        """
+        在界面线程中取出自动截图的保存结果并更新状态
+        """
+        filepath = None
+        while True:
+            try:
+                filepath = self.auto_capture_results.get_nowait()
+            except queue.Empty:
+                break
+        if filepath is None or not self.auto_capture:
+            return
+        self.auto_capture_status_var.set(
+            f"已保存 {self.auto_capture.saved_count} 张，跳过 {self.auto_capture.skipped_count} 张"
+        )
+        self.status_label.config(text=f"自动截图已保存: {os.path.basename(filepath)}")
+    
+    def _schedule_storage_tiering(self):
+        """
+        定期检查是否需要归档旧截图
+        """
+        self.ui_ticker.subscribe(self._run_storage_tiering, STORAGE_TIERING_POLL_SECONDS, run_when_hidden=True)
+    
+    def _run_storage_tiering(self):
+        """
+        按当前配置在后台线程中归档超过保留期的截图
+        
+        每次都重新读取归档配置：未开启、距上一次归档不到检查间隔或上一次还没完成时跳过。
+        """
+        from src.core.tiering import load_policy, tier_in_background
+        from src.utils.data_manager import DataManager
+        
+        policy = load_policy()
+        if not policy.enabled or self.tiering_cancel.is_set():
+            return
+        if self.tiering_thread is not None and self.tiering_thread.is_alive():
+            return
+        now = self.ui_ticker.clock.monotonic()
+        if self.tiering_last_run is not None and now - self.tiering_last_run < policy.check_interval_hours * 3600:
+            return
+        self.tiering_last_run = now
+        # 结果由归档模块写入日志，界面不需要处理
+        self.tiering_thread = tier_in_background(
+            DataManager(), lambda result, error: None, policy, cancel_event=self.tiering_cancel
+        )
+    
+    def _schedule_pack_compaction(self):
+        """
+        每天整理一次打包存储
+        """
+        self.ui_ticker.subscribe(self._run_pack_compaction, 24 * 3600, run_when_hidden=True)
+    
+    def _run_pack_compaction(self):
+        """
+        在后台线程中整理打包存储（上一次还没完成或正在退出时跳过）
+        """
+        from src.core.packing import compact_in_background
+        from src.utils.data_manager import DataManager
+        
+        if self.tiering_cancel.is_set():
+            return
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        # 结果由打包存储模块写入日志，界面不需要处理
+        self.compaction_thread = compact_in_background(DataManager(), lambda result, error: None)
+    
     def _update_theme(self, is_dark_mode):
         """处理来自主题管理器的主题更新通知
         
@@ -1109,6 +1366,7 @@ class ActivityTrackerApp:
     def open_config_window(self):
         """打开配置窗口"""
         self.status_label.config(text="打开应用设置...")
+        from src.gui.config_window import ConfigWindow
         ConfigWindow(self.root, callback=self.apply_config)
         
     def apply_config(self, config_values=None):
@@ -1128,6 +1386,15 @@ class ActivityTrackerApp:
             self.reminder_entry.delete(0, 'end')
             self.reminder_entry.insert(0, config_values["reminder"]["default_time"])
             
+        # 调试模式、日志文件和性能数据开关立即生效
+        setup_logging()
+        default_tracer.enabled = default_config_manager.get_value("advanced", "perf_trace", False)
+
+        # 重新加载提醒规则
+        policy = default_config_manager.get_value("reminder", "missed_policy", MISSED_FIRE_ONCE)
+        self.scheduler.policy = policy if policy in MISSED_POLICIES else MISSED_FIRE_ONCE
+        self.load_reminder_rules()
+        
         # 应用其他可以立即生效的设置
         # 例如：启用/禁用声音提醒，更改间隔提醒时间等
         
@@ -8,9 +8,15 @@ import os
 import json
 import sys
 import copy
+import threading
 
 from src.utils.theme_manager import ThemedWindow
 from src.utils.config_manager import default_config_manager
+from src.utils.data_manager import DataManager
+from src.utils.reminder_rules import (
+    ReminderRule, RULE_DAILY, RULE_INTERVAL, WEEKDAY_NAMES, WORKDAYS,
+    parse_minutes, parse_date_list
+)
 from src.config import (
     APP_NAME, APP_VERSION,
     UI_FONT_BOLD, UI_FONT_NORMAL, UI_FONT_LARGE,
@@ -18,10 +24,44 @@ from src.config import (
     REMINDER_MESSAGE, INTERVAL_REMINDER_MESSAGE,
     REMINDER_SOUND_ENABLED, SCREENSHOT_DIR
 )
+from src.utils.log_manager import get_logger
+from src.utils.ui_queue import UIEventQueue
+from src.utils.perf_trace import default_tracer
+
+logger = get_logger(__name__)
+
+# 性能数据面板的刷新间隔（毫秒）
+PERF_REFRESH_MS = 1000
 
 class ConfigWindow(ThemedWindow):
     """配置窗口类"""
     
+    # 错过提醒的处理方式：配置值 -> 显示文本
+    MISSED_POLICIES = {
+        "fire_once": "补发一次",
+        "skip": "跳过",
+        "catch_up": "逐次补发",
+    }
+    
+    # 截图范围选项：配置值 -> 显示文本
+    MONITOR_MODES = {
+        "cursor": "鼠标所在显示器",
+        "primary": "主显示器",
+        "virtual": "全部显示器",
+    }
+    
+    # 截图目录结构：配置值 -> 显示文本
+    DIRECTORY_LAYOUTS = {
+        "flat": "全部放在保存目录",
+        "date": "按日期分文件夹（年/月/日）",
+    }
+    
+    # 截图存储方式：配置值 -> 显示文本
+    STORAGE_BACKENDS = {
+        "files": "每张截图一个文件",
+        "packed": "打包存储（适合大量截图）",
+    }
+    
     def __init__(self, parent, callback=None):
         """初始化配置窗口
         
@@ -49,9 +89,25 @@ class ConfigWindow(ThemedWindow):
         if "files" not in self.config_values:
             self.config_values["files"] = {
                 "screenshot_save_path": SCREENSHOT_DIR,
-                "use_custom_path": False
+                "use_custom_path": False,
+                "directory_layout": "flat",
+                "storage_backend": "files"
             }
         
+        # 后台任务（存储检查、清理、目录整理）的进度和结果经队列交回界面线程
+        self.worker_events = UIEventQueue(self)
+        self.worker_events.on(
+            "layout_progress",
+            lambda payload: self.layout_status_var.set("正在整理… {}/{}".format(*payload))
+        )
+        self.worker_events.on("layout_migrated", lambda payload: self._on_layout_migrated(*payload))
+        self.worker_events.on(
+            "integrity_progress",
+            lambda count: self.integrity_var.set(f"正在扫描… 已检查 {count} 个文件")
+        )
+        self.worker_events.on("integrity_scanned", lambda payload: self._on_integrity_scanned(*payload))
+        self.worker_events.on("integrity_repaired", lambda payload: self._on_integrity_repaired(*payload))
+        
         # 创建配置界面
         self.create_widgets()
         
@@ -140,7 +196,6 @@ class ConfigWindow(ThemedWindow):
         self.reset_btn.pack(side=tk.LEFT)
         
         # 验证按钮事件绑定
-        print(f"恢复默认按钮绑定到: {self.reset_defaults.__name__}")
     
     def create_reminder_settings(self, parent):
         """创建提醒设置面板
@@ -242,8 +297,131 @@ class ConfigWindow(ThemedWindow):
         )
         interval_msg_entry.pack(fill=tk.X, pady=2)
         
+        # 休眠恢复或系统改时后错过的提醒
+        missed_frame = ttk.Frame(frame)
+        missed_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        ttk.Label(
+            missed_frame,
+            text="错过的提醒:",
+            font=UI_FONT_BOLD
+        ).pack(side=tk.LEFT)
+        
+        self.missed_policy_var = tk.StringVar(
+            value=self.MISSED_POLICIES.get(self.config_values["reminder"].get("missed_policy", "fire_once"), "补发一次")
+        )
+        ttk.Combobox(
+            missed_frame,
+            textvariable=self.missed_policy_var,
+            values=list(self.MISSED_POLICIES.values()),
+            state="readonly",
+            width=10
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Label(
+            missed_frame,
+            text="电脑休眠或修改系统时间后的处理方式"
+        ).pack(side=tk.LEFT)
+        
+        # 提醒规则列表
+        rules_frame = ttk.Frame(frame)
+        rules_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 8))
+        
+        ttk.Label(
+            rules_frame,
+            text="提醒规则:",
+            font=UI_FONT_BOLD
+        ).pack(anchor='w')
+        
+        # 规则在保存前只修改副本
+        self.rules_data = copy.deepcopy(self.config_values["reminder"].get("rules", []))
+        
+        self.rules_tree = ttk.Treeview(
+            rules_frame,
+            columns=("enabled", "name", "schedule"),
+            show="headings",
+            height=5
+        )
+        self.rules_tree.heading("enabled", text="启用")
+        self.rules_tree.heading("name", text="名称")
+        self.rules_tree.heading("schedule", text="规则")
+        self.rules_tree.column("enabled", width=50, anchor=tk.CENTER, stretch=False)
+        self.rules_tree.column("name", width=150)
+        self.rules_tree.column("schedule", width=400)
+        self.rules_tree.pack(fill=tk.BOTH, expand=True, pady=2)
+        self.rules_tree.bind("<Double-1>", lambda event: self.edit_rule())
+        
+        rules_btn_frame = ttk.Frame(rules_frame)
+        rules_btn_frame.pack(fill=tk.X)
+        
+        ttk.Button(rules_btn_frame, text="添加规则", command=self.add_rule).pack(side=tk.LEFT)
+        ttk.Button(rules_btn_frame, text="编辑", command=self.edit_rule).pack(side=tk.LEFT, padx=5)
+        ttk.Button(rules_btn_frame, text="删除", command=self.delete_rule).pack(side=tk.LEFT)
+        
+        self.refresh_rules_tree()
+        
+        # 节假日
+        holidays_frame = ttk.Frame(frame)
+        holidays_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        ttk.Label(
+            holidays_frame,
+            text="节假日(跳过提醒):",
+            font=UI_FONT_BOLD
+        ).pack(side=tk.LEFT)
+        
+        self.holidays_var = tk.StringVar(value=", ".join(self.config_values["reminder"].get("holidays", [])))
+        ttk.Entry(
+            holidays_frame,
+            textvariable=self.holidays_var
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        
+        ttk.Label(
+            holidays_frame,
+            text="格式: YYYY-MM-DD，逗号分隔"
+        ).pack(side=tk.LEFT)
+        
         return frame
     
+    def refresh_rules_tree(self):
+        """刷新提醒规则列表"""
+        self.rules_tree.delete(*self.rules_tree.get_children())
+        for index, data in enumerate(self.rules_data):
+            rule = ReminderRule.from_dict(data)
+            self.rules_tree.insert(
+                "", tk.END, iid=str(index),
+                values=("是" if rule.enabled else "否", rule.name, rule.describe())
+            )
+    
+    def add_rule(self):
+        """添加提醒规则"""
+        dialog = ReminderRuleDialog(self)
+        self.wait_window(dialog)
+        if dialog.result:
+            self.rules_data.append(dialog.result)
+            self.refresh_rules_tree()
+    
+    def edit_rule(self):
+        """编辑选中的提醒规则"""
+        selection = self.rules_tree.selection()
+        if not selection:
+            return
+        index = int(selection[0])
+        dialog = ReminderRuleDialog(self, self.rules_data[index])
+        self.wait_window(dialog)
+        if dialog.result:
+            self.rules_data[index] = dialog.result
+            self.refresh_rules_tree()
+    
+    def delete_rule(self):
+        """删除选中的提醒规则"""
+        selection = self.rules_tree.selection()
+        if not selection:
+            return
+        if messagebox.askyesno("确认", "确定要删除选中的提醒规则吗？", parent=self):
+            del self.rules_data[int(selection[0])]
+            self.refresh_rules_tree()
+    
     def create_ui_settings(self, parent):
         """创建界面设置面板
         
@@ -312,6 +490,49 @@ class ConfigWindow(ThemedWindow):
         
         self.quality_var.trace_add("write", update_quality_label)
         
+        # 多显示器截图范围
+        monitor_frame = ttk.Frame(frame)
+        monitor_frame.pack(fill=tk.X, pady=(5, 5))
+        
+        ttk.Label(
+            monitor_frame,
+            text="截图范围:",
+            font=UI_FONT_BOLD
+        ).pack(side=tk.LEFT)
+        
+        capture_config = self.config_values.get("capture", {})
+        self.monitor_mode_var = tk.StringVar(
+            value=self.MONITOR_MODES.get(capture_config.get("monitor_mode", "cursor"), "鼠标所在显示器")
+        )
+        ttk.Combobox(
+            monitor_frame,
+            textvariable=self.monitor_mode_var,
+            values=list(self.MONITOR_MODES.values()),
+            state="readonly",
+            width=16
+        ).pack(side=tk.LEFT, padx=10)
+        
+        # 定时自动截图
+        auto_config = self.config_values.get("auto_capture", {})
+        auto_frame = ttk.Frame(frame)
+        auto_frame.pack(fill=tk.X, pady=(5, 5))
+        
+        self.auto_capture_enabled_var = tk.BooleanVar(value=auto_config.get("enabled", False))
+        ttk.Checkbutton(
+            auto_frame,
+            text="启动时开启定时自动截图，间隔(秒):",
+            variable=self.auto_capture_enabled_var
+        ).pack(side=tk.LEFT)
+        
+        self.auto_capture_interval_var = tk.IntVar(value=auto_config.get("interval_seconds", 300))
+        ttk.Spinbox(
+            auto_frame,
+            from_=10,
+            to=3600,
+            textvariable=self.auto_capture_interval_var,
+            width=6
+        ).pack(side=tk.LEFT, padx=10)
+        
         return frame
     
     def create_files_settings(self, parent):
@@ -433,6 +654,129 @@ class ConfigWindow(ThemedWindow):
         )
         packaged_note.pack(fill=tk.X)
         
+        # 截图目录结构
+        layout_frame = ttk.Frame(frame)
+        layout_frame.pack(fill=tk.X, pady=(5, 5))
+        
+        ttk.Label(
+            layout_frame,
+            text="目录结构:",
+            font=UI_FONT_BOLD
+        ).pack(side=tk.LEFT)
+        
+        self.layout_var = tk.StringVar(
+            value=self.DIRECTORY_LAYOUTS.get(self.config_values["files"].get("directory_layout", "flat"),
+                                             "全部放在保存目录")
+        )
+        ttk.Combobox(
+            layout_frame,
+            textvariable=self.layout_var,
+            values=list(self.DIRECTORY_LAYOUTS.values()),
+            state="readonly",
+            width=24
+        ).pack(side=tk.LEFT, padx=10)
+        
+        self.migrate_button = ttk.Button(layout_frame, text="整理已有截图", command=self.toggle_layout_migration)
+        self.migrate_button.pack(side=tk.LEFT)
+        
+        self.layout_status_var = tk.StringVar(
+            value="截图很多时建议按日期分文件夹。新截图按所选结构保存；点击“整理已有截图”把已有截图移动到所选结构。"
+        )
+        ttk.Label(
+            frame,
+            textvariable=self.layout_status_var,
+            wraplength=400,
+            justify=tk.LEFT,
+            style="Small.TLabel"
+        ).pack(fill=tk.X, pady=(2, 5))
+        self._layout_cancel = None
+        
+        # 截图存储方式
+        backend_frame = ttk.Frame(frame)
+        backend_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(
+            backend_frame,
+            text="存储方式:",
+            font=UI_FONT_BOLD
+        ).pack(side=tk.LEFT)
+        
+        self.storage_backend_var = tk.StringVar(
+            value=self.STORAGE_BACKENDS.get(self.config_values["files"].get("storage_backend", "files"),
+                                            "每张截图一个文件")
+        )
+        ttk.Combobox(
+            backend_frame,
+            textvariable=self.storage_backend_var,
+            values=list(self.STORAGE_BACKENDS.values()),
+            state="readonly",
+            width=24
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Label(
+            frame,
+            text="打包存储把新截图追加写入保存目录下 packs 文件夹中的少量大文件，截图数量很多时备份和同步更快；"
+                 "删除的截图在后台整理时回收空间。已有截图可用命令行 pack 移入。",
+            wraplength=400,
+            justify=tk.LEFT,
+            style="Small.TLabel"
+        ).pack(fill=tk.X, pady=(2, 5))
+        
+        # 旧截图归档（分级存储）
+        storage_config = self.config_values.get("storage", {})
+        tiering_frame = ttk.Frame(frame)
+        tiering_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        self.tiering_enabled_var = tk.BooleanVar(value=storage_config.get("tiering_enabled", False))
+        ttk.Checkbutton(
+            tiering_frame,
+            text="在后台归档旧截图，超过天数:",
+            variable=self.tiering_enabled_var
+        ).pack(side=tk.LEFT)
+        
+        self.archive_after_days_var = tk.IntVar(value=storage_config.get("archive_after_days", 180))
+        ttk.Spinbox(
+            tiering_frame,
+            from_=7,
+            to=3650,
+            textvariable=self.archive_after_days_var,
+            width=6
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Label(
+            frame,
+            text="旧截图重新压缩后按月打包到保存目录下的 archive 文件夹，只保留预览图，查看记录时自动从归档中读取。"
+                 "保存后一刻钟内生效。",
+            wraplength=400,
+            justify=tk.LEFT,
+            style="Small.TLabel"
+        ).pack(fill=tk.X, pady=(2, 5))
+        
+        # 存储检查：孤立文件和缺少图片的记录
+        ttk.Separator(frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+        ttk.Label(frame, text="存储检查:", font=UI_FONT_BOLD).pack(anchor='w')
+        ttk.Label(
+            frame,
+            text="扫描截图目录，找出没有记录引用的孤立文件和图片已丢失的记录，可批量清理。",
+            wraplength=400,
+            justify=tk.LEFT,
+            style="Small.TLabel"
+        ).pack(fill=tk.X, pady=(2, 5))
+        
+        integrity_btn_frame = ttk.Frame(frame)
+        integrity_btn_frame.pack(fill=tk.X)
+        self.scan_button = ttk.Button(integrity_btn_frame, text="开始扫描", command=self.toggle_integrity_scan)
+        self.scan_button.pack(side=tk.LEFT)
+        self.repair_button = ttk.Button(
+            integrity_btn_frame, text="清理...", command=self.repair_integrity, state="disabled"
+        )
+        self.repair_button.pack(side=tk.LEFT, padx=5)
+        
+        self.integrity_var = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.integrity_var, wraplength=400, justify=tk.LEFT).pack(fill=tk.X, pady=5)
+        self._integrity_cancel = None
+        self._integrity_report = None
+        
         # 初始化控件状态
         self.toggle_path_entry()
         
@@ -444,6 +788,159 @@ class ConfigWindow(ThemedWindow):
         self.path_entry.config(state=state)
         self.browse_button.config(state=state)
     
+    def _selected_layout(self):
+        """当前选择的目录结构配置值"""
+        return next(
+            (key for key, text in self.DIRECTORY_LAYOUTS.items() if text == self.layout_var.get()),
+            "flat"
+        )
+    
+    def toggle_layout_migration(self):
+        """把已有截图迁移到所选目录结构，正在迁移时取消"""
+        from src.core.layout import migrate_in_background
+        
+        if self._layout_cancel is not None:
+            self._layout_cancel.set()
+            self.migrate_button.config(state="disabled")
+            return
+        layout = self._selected_layout()
+        if not messagebox.askyesno(
+            "整理已有截图",
+            f"将把已有截图移动为“{self.DIRECTORY_LAYOUTS[layout]}”的结构，并更新记录中的图片路径。\n\n"
+            "截图很多时可能需要一些时间，是否继续？"
+        ):
+            return
+        
+        self._layout_cancel = threading.Event()
+        self.migrate_button.config(text="取消整理")
+        self.layout_status_var.set("正在整理…")
+        
+        def on_progress(done, total):
+            self.worker_events.post("layout_progress", (done, total))
+        
+        def on_done(result, error):
+            self.worker_events.post("layout_migrated", (layout, result, error))
+        
+        self.worker_events.start()
+        migrate_in_background(DataManager(), layout, on_done, on_progress, self._layout_cancel)
+    
+    def _on_layout_migrated(self, layout, result, error):
+        """目录结构迁移完成（界面线程）"""
+        self.worker_events.finish()
+        self._layout_cancel = None
+        self.migrate_button.config(text="整理已有截图", state="normal")
+        if error is not None:
+            self.layout_status_var.set(f"整理失败: {error}")
+            return
+        message = f"已移动 {result.moved} 个截图，更新 {result.updated} 条记录。"
+        if result.cancelled:
+            message = "整理已取消。" + message
+        else:
+            # 已有截图整理完成后，新截图也按这个结构保存
+            self.config_values["files"]["directory_layout"] = layout
+            self.config_manager.set_value("files", "directory_layout", layout)
+            self.config_manager.save_config()
+        if result.skipped:
+            message += f"{result.skipped} 个不在截图保存目录中的图片保持原位。"
+        if result.failures:
+            message += f"{len(result.failures)} 个文件移动失败（详见日志）。"
+            logger.warning("移动失败的文件: %s", result.failures[:20])
+        self.layout_status_var.set(message)
+    
+    def toggle_integrity_scan(self):
+        """开始存储检查，正在扫描时取消"""
+        from src.core.integrity import scan_in_background
+        
+        if self._integrity_cancel is not None:
+            self._integrity_cancel.set()
+            return
+        
+        self._integrity_cancel = threading.Event()
+        self._integrity_report = None
+        self.scan_button.config(text="取消扫描")
+        self.repair_button.config(state="disabled")
+        self.integrity_var.set("正在扫描…")
+        
+        def on_progress(count):
+            self.worker_events.post("integrity_progress", count)
+        
+        def on_done(report, error):
+            self.worker_events.post("integrity_scanned", (report, error))
+        
+        self.worker_events.start()
+        scan_in_background(DataManager(), on_done, on_progress, self._integrity_cancel)
+    
+    def _on_integrity_scanned(self, report, error):
+        """存储检查完成（界面线程）"""
+        from src.core.integrity import ScanCancelled, format_size
+        
+        self.worker_events.finish()
+        self._integrity_cancel = None
+        self.scan_button.config(text="开始扫描")
+        if error is not None:
+            self.integrity_var.set("扫描已取消" if isinstance(error, ScanCancelled) else f"扫描失败: {error}")
+            return
+        
+        self._integrity_report = report
+        self.integrity_var.set(
+            f"共 {report.files} 个截图（{format_size(report.total_bytes)}），"
+            f"其中孤立文件 {len(report.orphans)} 个（{format_size(report.orphan_bytes)}）；"
+            f"缺少图片的记录 {len(report.missing)} 条。"
+        )
+        if report.orphans or report.missing:
+            self.repair_button.config(state="normal")
+    
+    def repair_integrity(self):
+        """按扫描结果清理孤立文件和缺少图片的记录"""
+        from src.core.integrity import repair_integrity, format_size
+        
+        report = self._integrity_report
+        if report is None:
+            return
+        delete_orphans = bool(report.orphans) and messagebox.askyesno(
+            "清理孤立文件",
+            f"删除 {len(report.orphans)} 个没有记录引用的截图文件（{format_size(report.orphan_bytes)}）？\n此操作不能撤销。",
+            parent=self
+        )
+        remove_missing = bool(report.missing) and messagebox.askyesno(
+            "清理记录",
+            f"删除 {len(report.missing)} 条图片文件已不存在的记录？",
+            parent=self
+        )
+        if not delete_orphans and not remove_missing:
+            return
+        
+        self.repair_button.config(state="disabled")
+        self.scan_button.config(state="disabled")
+        self.integrity_var.set("正在清理…")
+        
+        def run():
+            try:
+                result = repair_integrity(DataManager(), report, delete_orphans, remove_missing)
+                error = None
+            except Exception as e:
+                logger.error("存储清理失败: %s", e)
+                result, error = None, e
+            self.worker_events.post("integrity_repaired", (result, error))
+        
+        self.worker_events.start()
+        threading.Thread(target=run, name="IntegrityRepair", daemon=True).start()
+    
+    def _on_integrity_repaired(self, result, error):
+        """清理完成（界面线程）"""
+        self.worker_events.finish()
+        self._integrity_report = None
+        self.scan_button.config(state="normal")
+        if error is not None:
+            self.integrity_var.set(f"清理失败: {error}")
+            return
+        files, records, failures = result
+        message = f"已删除 {files} 个孤立文件、{records} 条缺少图片的记录。"
+        if failures:
+            message += f"{len(failures)} 个文件删除失败（详见日志）。"
+            logger.warning("删除失败的文件: %s", failures[:20])
+        self.integrity_var.set(message)
+    
     def create_advanced_settings(self, parent):
         """创建高级设置面板
         
@@ -473,6 +970,43 @@ class ConfigWindow(ThemedWindow):
         )
         log_check.pack(anchor='w', pady=(0, 5))
         
+        # 性能数据记录
+        self.perf_trace_var = tk.BooleanVar(value=self.config_values["advanced"].get("perf_trace", False))
+        ttk.Checkbutton(
+            frame,
+            text="记录性能数据（截图、编辑、保存和加载的耗时）",
+            variable=self.perf_trace_var
+        ).pack(anchor='w', pady=(0, 5))
+        
+        # 性能数据面板
+        perf_frame = ttk.Frame(frame)
+        perf_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        
+        ttk.Label(
+            perf_frame,
+            text="性能数据 (毫秒，最近样本的分位数):",
+            font=UI_FONT_BOLD
+        ).pack(anchor='w')
+        
+        columns = ("name", "count", "last", "mean", "p50", "p90", "p99", "max")
+        self.perf_tree = ttk.Treeview(perf_frame, columns=columns, show="headings", height=8)
+        for column, text in zip(columns, ("操作", "次数", "最近", "平均", "P50", "P90", "P99", "最大")):
+            self.perf_tree.heading(column, text=text)
+            self.perf_tree.column(column, width=70, anchor=tk.E, stretch=False)
+        self.perf_tree.column("name", width=220, anchor=tk.W, stretch=True)
+        self.perf_tree.pack(fill=tk.BOTH, expand=True, pady=2)
+        
+        perf_btn_frame = ttk.Frame(perf_frame)
+        perf_btn_frame.pack(fill=tk.X)
+        
+        ttk.Button(perf_btn_frame, text="刷新", command=self.refresh_perf_stats).pack(side=tk.LEFT)
+        ttk.Button(perf_btn_frame, text="清空", command=self.reset_perf_stats).pack(side=tk.LEFT, padx=5)
+        ttk.Button(perf_btn_frame, text="导出追踪文件...", command=self.export_perf_trace).pack(side=tk.LEFT)
+        
+        # 窗口打开期间定时刷新
+        self._perf_after_id = None
+        self.refresh_perf_stats()
+        
         # 添加一条提示信息
         note_frame = ttk.Frame(frame)
         note_frame.pack(fill=tk.X, pady=10)
@@ -485,6 +1019,55 @@ class ConfigWindow(ThemedWindow):
         
         return frame
     
+    def refresh_perf_stats(self):
+        """刷新性能数据面板"""
+        if self._perf_after_id is not None:
+            self.after_cancel(self._perf_after_id)
+        
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        for item in default_tracer.stats():
+            self.perf_tree.insert("", tk.END, values=(
+                item["name"], item["count"],
+                *(f"{item[key]:.1f}" for key in ("last", "mean", "p50", "p90", "p99", "max"))
+            ))
+        
+        self._perf_after_id = self.after(PERF_REFRESH_MS, self.refresh_perf_stats)
+    
+    def reset_perf_stats(self):
+        """清空已记录的性能数据"""
+        default_tracer.reset()
+        self.refresh_perf_stats()
+    
+    def export_perf_trace(self):
+        """导出 Chrome trace JSON 文件"""
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            initialfile="liuhen_trace.json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            count = default_tracer.export_chrome_trace(path)
+            messagebox.showinfo("导出成功", f"已导出 {count} 个事件，可在 chrome://tracing 或 ui.perfetto.dev 中打开。", parent=self)
+        except OSError as e:
+            logger.error("导出追踪文件失败: %s", e)
+            messagebox.showerror("导出失败", f"无法写入文件: {e}", parent=self)
+    
+    def destroy(self):
+        """关闭窗口时停止性能数据刷新和正在进行的存储检查、目录整理"""
+        if getattr(self, "_perf_after_id", None) is not None:
+            self.after_cancel(self._perf_after_id)
+            self._perf_after_id = None
+        if getattr(self, "worker_events", None) is not None:
+            self.worker_events.close()
+        if getattr(self, "_integrity_cancel", None) is not None:
+            self._integrity_cancel.set()
+        if getattr(self, "_layout_cancel", None) is not None:
+            self._layout_cancel.set()
+        super().destroy()
+    
     def browse_screenshot_dir(self):
         """打开文件夹选择对话框"""
         dir_path = filedialog.askdirectory()
@@ -506,7 +1089,7 @@ class ConfigWindow(ThemedWindow):
     def save_config(self):
         """保存配置"""
         try:
-            print("开始保存配置...")
+            logger.debug("开始保存配置...")
             # 验证自定义路径
             if self.use_custom_path_var.get():
                 path = self.screenshot_dir_var.get().strip()
@@ -520,7 +1103,7 @@ class ConfigWindow(ThemedWindow):
                                           f"目录 '{path}' 不存在，是否创建此目录？"):
                         try:
                             os.makedirs(path, exist_ok=True)
-                            print(f"已创建目录: {path}")
+                            logger.info("已创建目录: %s", path)
                         except Exception as e:
                             messagebox.showerror("错误", f"无法创建目录: {e}")
                             return
@@ -529,99 +1112,277 @@ class ConfigWindow(ThemedWindow):
                         return
             
             # 更新配置字典
-            print("更新配置字典...")
+            logger.debug("更新配置字典...")
             self.config_values["reminder"]["default_time"] = self.reminder_time_var.get()
             self.config_values["reminder"]["message"] = self.reminder_message_var.get()
             self.config_values["reminder"]["sound_enabled"] = self.sound_enabled_var.get()
             self.config_values["reminder"]["interval_minutes"] = self.interval_min_var.get()
             self.config_values["reminder"]["interval_message"] = self.interval_message_var.get()
+            self.config_values["reminder"]["rules"] = copy.deepcopy(self.rules_data)
+            self.config_values["reminder"]["missed_policy"] = next(
+                (key for key, text in self.MISSED_POLICIES.items() if text == self.missed_policy_var.get()),
+                "fire_once"
+            )
+            self.config_values["reminder"]["holidays"] = sorted(
+                d.isoformat() for d in parse_date_list(self.holidays_var.get())
+            )
             
             self.config_values["ui"]["startup_maximized"] = self.maximize_var.get()
             self.config_values["ui"]["confirm_on_exit"] = self.confirm_exit_var.get()
             self.config_values["ui"]["auto_save"] = self.auto_save_var.get()
             self.config_values["ui"]["screenshot_quality"] = self.quality_var.get()
             
+            monitor_mode = next(
+                (key for key, text in self.MONITOR_MODES.items() if text == self.monitor_mode_var.get()),
+                "cursor"
+            )
+            self.config_values.setdefault("capture", {})["monitor_mode"] = monitor_mode
+            self.config_values.setdefault("auto_capture", {})["enabled"] = self.auto_capture_enabled_var.get()
+            self.config_values["auto_capture"]["interval_seconds"] = self.auto_capture_interval_var.get()
+            
             self.config_values["files"]["use_custom_path"] = self.use_custom_path_var.get()
             # 标准化路径格式
             self.config_values["files"]["screenshot_save_path"] = os.path.normpath(self.screenshot_dir_var.get())
+            self.config_values["files"]["directory_layout"] = self._selected_layout()
+            self.config_values["files"]["storage_backend"] = next(
+                (key for key, text in self.STORAGE_BACKENDS.items() if text == self.storage_backend_var.get()),
+                "files"
+            )
+            self.config_values.setdefault("storage", {})["tiering_enabled"] = self.tiering_enabled_var.get()
+            self.config_values["storage"]["archive_after_days"] = self.archive_after_days_var.get()
             
             self.config_values["advanced"]["debug_mode"] = self.debug_var.get()
             self.config_values["advanced"]["save_logs"] = self.save_log_var.get()
+            self.config_values["advanced"]["perf_trace"] = self.perf_trace_var.get()
             
             # 使用配置管理器保存
-            print("调用配置管理器保存配置...")
+            logger.debug("调用配置管理器保存配置...")
             save_result = self.config_manager.save_config(self.config_values)
             if save_result:
-                print("配置保存成功")
+                logger.info("配置保存成功")
                 messagebox.showinfo("保存成功", "配置已保存，部分设置将在下次启动应用时生效。")
                 
                 # 如果有回调函数，则调用
                 if self.callback:
-                    print("调用配置更改回调函数")
+                    logger.debug("调用配置更改回调函数")
                     self.callback(self.config_values)
                     
                 self.destroy()
             else:
-                print("配置保存失败")
+                logger.error("配置保存失败")
                 messagebox.showerror("保存失败", "无法保存配置，请检查文件权限。")
         except Exception as e:
-            print(f"保存配置时发生错误: {e}")
+            logger.exception("保存配置时发生错误: %s", e)
             messagebox.showerror("错误", f"保存配置时发生错误: {e}")
     
     def reset_defaults(self):
         """恢复默认设置"""
         try:
             if messagebox.askyesno("确认", "确定要恢复默认设置吗？"):
-                print("正在恢复默认设置...")
+                logger.debug("正在恢复默认设置...")
                 # 重置为默认值，使用深拷贝避免引用问题
                 self.config_values = copy.deepcopy(self.config_manager.default_config)
                 
                 # 更新UI控件的值
-                print("更新UI控件值...")
+                logger.debug("更新UI控件值...")
                 try:
                     # 设置提醒相关控件
-                    print(f"设置提醒时间: {self.config_values['reminder']['default_time']}")
+                    logger.debug("设置提醒时间: %s", self.config_values['reminder']['default_time'])
                     self.reminder_time_var.set(self.config_values["reminder"]["default_time"])
                     self.reminder_message_var.set(self.config_values["reminder"]["message"])
                     self.sound_enabled_var.set(self.config_values["reminder"]["sound_enabled"])
                     self.interval_min_var.set(self.config_values["reminder"]["interval_minutes"])
                     self.interval_message_var.set(self.config_values["reminder"]["interval_message"])
+                    self.missed_policy_var.set(self.MISSED_POLICIES[self.config_values["reminder"]["missed_policy"]])
+                    self.rules_data = copy.deepcopy(self.config_values["reminder"]["rules"])
+                    self.refresh_rules_tree()
+                    self.holidays_var.set(", ".join(self.config_values["reminder"]["holidays"]))
                     
                     # 设置UI相关控件
-                    print(f"设置UI选项: 最大化={self.config_values['ui']['startup_maximized']}")
+                    logger.debug("设置UI选项: 最大化=%s", self.config_values['ui']['startup_maximized'])
                     self.maximize_var.set(self.config_values["ui"]["startup_maximized"])
                     self.confirm_exit_var.set(self.config_values["ui"]["confirm_on_exit"])
                     self.auto_save_var.set(self.config_values["ui"]["auto_save"])
                     self.quality_var.set(self.config_values["ui"]["screenshot_quality"])
+                    self.monitor_mode_var.set(self.MONITOR_MODES[self.config_values["capture"]["monitor_mode"]])
+                    self.auto_capture_enabled_var.set(self.config_values["auto_capture"]["enabled"])
+                    self.auto_capture_interval_var.set(self.config_values["auto_capture"]["interval_seconds"])
                     
                     # 重置文件设置
-                    print(f"设置文件选项: 使用自定义路径={self.config_values['files']['use_custom_path']}")
+                    logger.debug("设置文件选项: 使用自定义路径=%s", self.config_values['files']['use_custom_path'])
                     self.use_custom_path_var.set(self.config_values["files"]["use_custom_path"])
                     self.screenshot_dir_var.set(self.config_values["files"]["screenshot_save_path"])
+                    self.layout_var.set(self.DIRECTORY_LAYOUTS[self.config_values["files"]["directory_layout"]])
+                    self.storage_backend_var.set(self.STORAGE_BACKENDS[self.config_values["files"]["storage_backend"]])
+                    self.tiering_enabled_var.set(self.config_values["storage"]["tiering_enabled"])
+                    self.archive_after_days_var.set(self.config_values["storage"]["archive_after_days"])
                     
                     # 重置高级设置
-                    print(f"设置高级选项: 调试模式={self.config_values['advanced']['debug_mode']}")
+                    logger.debug("设置高级选项: 调试模式=%s", self.config_values['advanced']['debug_mode'])
                     self.debug_var.set(self.config_values["advanced"]["debug_mode"])
                     self.save_log_var.set(self.config_values["advanced"]["save_logs"])
+                    self.perf_trace_var.set(self.config_values["advanced"]["perf_trace"])
                     
                     # 更新控件状态
-                    print("更新控件状态...")
+                    logger.debug("更新控件状态...")
                     self.toggle_path_entry()  # 更新路径输入控件状态
                     
                     # 强制更新UI
                     self.update_idletasks()
                     
-                    print("已恢复默认设置")
+                    logger.info("已恢复默认设置")
                     messagebox.showinfo("成功", "已恢复默认设置")
                 except Exception as e:
-                    print(f"更新UI控件时出错: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("更新UI控件时出错: %s", e)
                     messagebox.showerror("错误", f"更新UI控件时出错: {e}")
             else:
-                print("用户取消了恢复默认设置")
+                logger.debug("用户取消了恢复默认设置")
         except Exception as e:
-            print(f"恢复默认设置时发生错误: {e}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("错误", f"恢复默认设置时发生错误: {e}") 
\ No newline at end of file
+            logger.exception("恢复默认设置时发生错误: %s", e)
+            messagebox.showerror("错误", f"恢复默认设置时发生错误: {e}") 
+
+
+class ReminderRuleDialog(tk.Toplevel):
+    """提醒规则编辑对话框"""
+    
+    # 规则类型：配置值 -> 显示文本
+    RULE_KINDS = {
+        RULE_DAILY: "每天定时",
+        RULE_INTERVAL: "时段内间隔",
+    }
+    
+    def __init__(self, parent, rule_data=None):
+        """初始化对话框
+        
+        Args:
+            parent: 父窗口
+            rule_data: 要编辑的规则字典，为None时新建规则
+        """
+        super().__init__(parent)
+        self.title("编辑提醒规则" if rule_data else "添加提醒规则")
+        self.resizable(False, False)
+        
+        # 对话框结果，确定后为规则字典
+        self.result = None
+        
+        rule = ReminderRule.from_dict(rule_data or {"times": ["09:00"], "weekdays": WORKDAYS})
+        self.create_widgets(rule)
+        
+        self.transient(parent)
+        self.grab_set()
+        self.focus_set()
+    
+    def create_widgets(self, rule):
+        """创建对话框组件
+        
+        Args:
+            rule: 初始规则
+        """
+        frame = ttk.Frame(self, padding=15)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        row = 0
+        ttk.Label(frame, text="名称:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        self.name_var = tk.StringVar(value=rule.name)
+        ttk.Entry(frame, textvariable=self.name_var, width=30).grid(row=row, column=1, sticky='we', pady=3)
+        
+        row += 1
+        ttk.Label(frame, text="类型:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        self.kind_var = tk.StringVar(value=self.RULE_KINDS[rule.kind])
+        ttk.Combobox(
+            frame,
+            textvariable=self.kind_var,
+            values=list(self.RULE_KINDS.values()),
+            state="readonly",
+            width=14
+        ).grid(row=row, column=1, sticky='w', pady=3)
+        
+        row += 1
+        ttk.Label(frame, text="提醒时间:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        self.times_var = tk.StringVar(value=", ".join(rule.times))
+        ttk.Entry(frame, textvariable=self.times_var, width=30).grid(row=row, column=1, sticky='we', pady=3)
+        ttk.Label(frame, text="每天定时，如 09:00, 13:30").grid(row=row, column=2, sticky='w', padx=5)
+        
+        row += 1
+        ttk.Label(frame, text="工作时段:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        window_frame = ttk.Frame(frame)
+        window_frame.grid(row=row, column=1, sticky='w', pady=3)
+        self.start_var = tk.StringVar(value=rule.start)
+        self.end_var = tk.StringVar(value=rule.end)
+        ttk.Entry(window_frame, textvariable=self.start_var, width=7).pack(side=tk.LEFT)
+        ttk.Label(window_frame, text=" 至 ").pack(side=tk.LEFT)
+        ttk.Entry(window_frame, textvariable=self.end_var, width=7).pack(side=tk.LEFT)
+        ttk.Label(frame, text="时段内间隔").grid(row=row, column=2, sticky='w', padx=5)
+        
+        row += 1
+        ttk.Label(frame, text="间隔(分钟):", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        self.interval_var = tk.IntVar(value=rule.interval_minutes)
+        ttk.Spinbox(frame, from_=1, to=720, textvariable=self.interval_var, width=6).grid(row=row, column=1, sticky='w', pady=3)
+        
+        row += 1
+        ttk.Label(frame, text="星期:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        weekday_frame = ttk.Frame(frame)
+        weekday_frame.grid(row=row, column=1, columnspan=2, sticky='w', pady=3)
+        self.weekday_vars = []
+        for day, name in enumerate(WEEKDAY_NAMES):
+            var = tk.BooleanVar(value=day in rule.weekdays)
+            ttk.Checkbutton(weekday_frame, text=name, variable=var).pack(side=tk.LEFT)
+            self.weekday_vars.append(var)
+        
+        row += 1
+        ttk.Label(frame, text="提醒消息:", font=UI_FONT_BOLD).grid(row=row, column=0, sticky='w', pady=3)
+        self.message_var = tk.StringVar(value=rule.message)
+        ttk.Entry(frame, textvariable=self.message_var, width=30).grid(row=row, column=1, columnspan=2, sticky='we', pady=3)
+        
+        row += 1
+        self.skip_holidays_var = tk.BooleanVar(value=rule.skip_holidays)
+        ttk.Checkbutton(frame, text="节假日不提醒", variable=self.skip_holidays_var).grid(row=row, column=1, sticky='w', pady=3)
+        
+        row += 1
+        self.enabled_var = tk.BooleanVar(value=rule.enabled)
+        ttk.Checkbutton(frame, text="启用此规则", variable=self.enabled_var).grid(row=row, column=1, sticky='w', pady=3)
+        
+        row += 1
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=row, column=0, columnspan=3, sticky='e', pady=(10, 0))
+        ttk.Button(button_frame, text="取消", command=self.destroy, width=10).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="确定", style="Primary.TButton", command=self.on_ok, width=10).pack(side=tk.RIGHT)
+    
+    def on_ok(self):
+        """校验输入并保存结果"""
+        kind = next((key for key, text in self.RULE_KINDS.items() if text == self.kind_var.get()), RULE_DAILY)
+        times = [t.strip() for t in self.times_var.get().replace("，", ",").split(",") if t.strip()]
+        weekdays = [day for day, var in enumerate(self.weekday_vars) if var.get()]
+        
+        if not weekdays:
+            messagebox.showerror("错误", "请至少选择一天", parent=self)
+            return
+        if kind == RULE_DAILY:
+            if not times or any(parse_minutes(t) is None for t in times):
+                messagebox.showerror("错误", "请输入有效的提醒时间，如 09:00, 13:30", parent=self)
+                return
+        else:
+            start = parse_minutes(self.start_var.get())
+            end = parse_minutes(self.end_var.get())
+            if start is None or end is None or end <= start:
+                messagebox.showerror("错误", "请输入有效的工作时段，如 09:00 至 18:00", parent=self)
+                return
+        try:
+            interval = int(self.interval_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showerror("错误", "间隔必须是整数分钟", parent=self)
+            return
+        
+        self.result = ReminderRule(
+            name=self.name_var.get().strip() or "提醒",
+            kind=kind,
+            times=times,
+            interval_minutes=interval,
+            start=self.start_var.get().strip(),
+            end=self.end_var.get().strip(),
+            weekdays=weekdays,
+            skip_holidays=self.skip_holidays_var.get(),
+            message=self.message_var.get().strip(),
+            enabled=self.enabled_var.get()
+        ).to_dict()
+        self.destroy()
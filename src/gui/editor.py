@@ -1,14 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+from PIL import Image, ImageTk
 import os
-import math
 
 from src.config import (
     COLOR_BACKGROUND, COLOR_NEUTRAL, COLOR_PRIMARY,
     DARK_COLOR_BACKGROUND, DARK_COLOR_NEUTRAL, DARK_COLOR_PRIMARY,
     UI_FONT_BOLD, UI_FONT_NORMAL, UI_FONT_TITLE, UI_FONT_LARGE, UI_FONT_SMALL
 )
+from src.core.annotations import AnnotationLayer
+from src.utils.perf_trace import traced
 
 class ScreenshotEditor(tk.Toplevel):
     def __init__(self, parent, image, is_dark_mode=False):
@@ -40,12 +41,10 @@ class ScreenshotEditor(tk.Toplevel):
         # 设置窗口大小时加上按钮区
         self.geometry(f"{image.width + 100}x{image.height + 160}")
         self.resizable(True, True)
-        self.image = image.copy()
-        self.original_image = image.copy()  # 保存原始图片用于清除
-        self.draw = ImageDraw.Draw(self.image)
+        # 原图、当前图像和标注列表由标注图层管理，编辑器只负责交互和显示
+        self.layer = AnnotationLayer(image)
         self.rect_start = None
         self.rect_id = None
-        self.rects = []  # 已画矩形列表，每个元素为 (type, coords, color, text)
         self.current_color = '#FF4136'  # 更美观的默认红色
         self.current_tool = 'rect'  # 当前工具：rect, arrow, text, mosaic
         self.current_text = ""  # 当前文字
@@ -336,6 +335,21 @@ class ScreenshotEditor(tk.Toplevel):
         # 设置窗口图标(如果有)
         # self.iconbitmap("path/to/icon.ico")
     
+    @property
+    def image(self):
+        """当前带标注的图像"""
+        return self.layer.image
+    
+    @property
+    def original_image(self):
+        """未标注的原图"""
+        return self.layer.original_image
+    
+    @property
+    def rects(self):
+        """已添加的标注列表，每个元素为 Annotation(kind, coords, color, text, size)"""
+        return self.layer.annotations
+    
     def get_theme_colors(self):
         """获取当前主题颜色"""
         if self.is_dark_mode:
@@ -615,6 +629,7 @@ class ScreenshotEditor(tk.Toplevel):
         elif self.current_tool == 'mosaic':
             self.is_mosaic_drawing = True
             self.last_mosaic_point = (img_x, img_y)
+            self.layer.begin_smear()
             self.apply_mosaic_smear(img_x, img_y)
     
     def on_mouse_move(self, event):
@@ -654,15 +669,13 @@ class ScreenshotEditor(tk.Toplevel):
                 self.rect_start = None
                 self.rect_id = None
                 return
-            # 使用优化的矩形绘制方法
-            self.draw_rectangle(x1, y1, x2, y2, self.current_color)
-            self.rects.append(('rect', (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)), self.current_color, None))
+            self.layer.add_rectangle(x1, y1, x2, y2, self.current_color)
         elif self.current_tool == 'arrow':
-            self.draw_arrow(x1, y1, x2, y2, self.current_color)
-            self.rects.append(('arrow', (x1, y1, x2, y2), self.current_color, None))
+            self.layer.add_arrow(x1, y1, x2, y2, self.current_color)
         elif self.current_tool == 'mosaic':
             if getattr(self, 'is_mosaic_drawing', False):
-                self.rects.append(('mosaic_smear', None, None, None))
+                # 涂抹经过的点作为一个标注保存，撤销其他标注时可以重放
+                self.layer.end_smear(self.mosaic_size)
                 self.is_mosaic_drawing = False
                 self.last_mosaic_point = None
         # 标注完成后，删除临时预览对象
@@ -678,20 +691,8 @@ class ScreenshotEditor(tk.Toplevel):
         """完成文字输入"""
         text = event.widget.get()
         if text.strip():
-            try:
-                # 尝试使用微软雅黑字体
-                font = ImageFont.truetype("msyh.ttc", self.font_size)
-            except:
-                try:
-                    # 尝试使用系统默认字体
-                    font = ImageFont.truetype("arial.ttf", self.font_size)
-                except:
-                    # 如果都失败，使用默认字体
-                    font = ImageFont.load_default()
-            
-            # 保存文字
-            self.draw.text((x, y), text, fill=self.current_color, font=font)
-            self.rects.append(('text', (x, y), self.current_color, text))
+            # 保存文字（记录当前字号，撤销重放时保持一致）
+            self.layer.add_text(x, y, text, self.current_color, self.font_size)
             self.update_canvas_image()
             # 启用撤销和清除按钮
             self.undo_btn.config(state="normal")
@@ -707,36 +708,11 @@ class ScreenshotEditor(tk.Toplevel):
         event.widget.destroy()
         self.text_entry = None
     
+    @traced("editor.undo_last", "editor")
     def undo_last(self):
         """撤销最后一个操作"""
-        if self.rects:
-            self.rects.pop()  # 移除最后一个操作
-            # 重新绘制所有内容
-            self.image = self.original_image.copy()
-            self.draw = ImageDraw.Draw(self.image)
-            for item in self.rects:
-                tool_type, coords, color, text = item
-                if tool_type == 'rect':
-                    # 使用优化的矩形绘制方法
-                    x0, y0, x1, y1 = coords
-                    self.draw_rectangle(x0, y0, x1, y1, color)
-                elif tool_type == 'arrow':
-                    self.draw_arrow(*coords, color)
-                elif tool_type == 'text':
-                    try:
-                        font = ImageFont.truetype("msyh.ttc", self.font_size)
-                    except:
-                        try:
-                            font = ImageFont.truetype("arial.ttf", self.font_size)
-                        except:
-                            font = ImageFont.load_default()
-                    self.draw.text(coords, text, fill=color, font=font)
-                elif tool_type == 'mosaic':
-                    self.apply_mosaic(*coords)
-                elif tool_type == 'mosaic_smear':
-                    # 对于涂抹类型的马赛克，需要重新加载原图，因为无法精确撤销
-                    pass  # 由于已重新开始绘制，不需要额外处理
-            
+        # 图层从原图重放剩余的标注
+        if self.layer.undo() is not None:
             self.update_canvas_image()
             
             # 如果没有操作了，禁用撤销和清除按钮
@@ -747,9 +723,7 @@ class ScreenshotEditor(tk.Toplevel):
     def clear_all(self):
         """清除所有标注"""
         if messagebox.askyesno("确认", "确定要清除所有标注吗？"):
-            self.rects.clear()
-            self.image = self.original_image.copy()
-            self.draw = ImageDraw.Draw(self.image)
+            self.layer.clear()
             # 清除Canvas上所有内容
             self.canvas.delete("all")
             # 重新显示背景图片
@@ -761,6 +735,7 @@ class ScreenshotEditor(tk.Toplevel):
             self.attributes('-topmost', True)
             self.attributes('-topmost', False)
     
+    @traced("editor.update_canvas_image", "editor")
     def update_canvas_image(self):
         """更新画布上的图像并重绘标注"""
         # 提高图像清晰度
@@ -786,8 +761,7 @@ class ScreenshotEditor(tk.Toplevel):
         # 确定线宽
         line_width = 4  # 增加线宽以提高可见度
             
-        for item in self.rects:
-            tool_type, coords, color, text = item
+        for tool_type, coords, color, text, size in self.rects:
             if tool_type == 'rect':
                 x0, y0, x1, y1 = coords
                 c0, c1 = self.image_to_canvas_coords(x0, y0)
@@ -831,21 +805,10 @@ class ScreenshotEditor(tk.Toplevel):
             return None
         return self.result_image
 
+    @traced("editor.apply_mosaic_smear", "editor")
     def apply_mosaic_smear(self, img_x, img_y):
         """在当前位置涂抹马赛克"""
-        size = self.mosaic_size
-        x0 = max(0, img_x - size // 2)
-        y0 = max(0, img_y - size // 2)
-        x1 = min(self.image.width, img_x + size // 2)
-        y1 = min(self.image.height, img_y + size // 2)
-        region = self.image.crop((x0, y0, x1, y1))
-        width, height = region.size
-        block_size = max(3, min(size, min(width, height)))
-        for i in range(0, width, block_size):
-            for j in range(0, height, block_size):
-                block = region.crop((i, j, min(i + block_size, width), min(j + block_size, height)))
-                avg_color = tuple(map(int, block.resize((1, 1), Image.LANCZOS).getpixel((0, 0))))
-                self.draw.rectangle([x0 + i, y0 + j, min(x0 + i + block_size, x1), min(y0 + j + block_size, y1)], fill=avg_color)
+        self.layer.smear(img_x, img_y, self.mosaic_size)
         self.update_canvas_image()
 
     def on_mouse_motion(self, event):
@@ -906,6 +869,7 @@ class ScreenshotEditor(tk.Toplevel):
         self.zoom_scale = new_scale
         self.update_canvas_zoom(center_mouse=True)
 
+    @traced("editor.update_canvas_zoom", "editor")
     def update_canvas_zoom(self, center_mouse=False):
         # 只缩放显示，不影响原始图片和标注
         w, h = self.image.width, self.image.height
@@ -938,59 +902,6 @@ class ScreenshotEditor(tk.Toplevel):
         if self.current_tool == 'mosaic' and hasattr(self, '_last_cursor_pos'):
             self.draw_mosaic_cursor(*self._last_cursor_pos) 
 
-    def draw_arrow(self, x1, y1, x2, y2, color):
-        """绘制箭头"""
-        # 计算箭头角度
-        angle = math.atan2(y2 - y1, x2 - x1)
-        arrow_length = 20  # 箭头长度
-        arrow_angle = math.pi / 6  # 箭头角度（30度）
-        
-        # 计算箭头两个点
-        x3 = x2 - arrow_length * math.cos(angle + arrow_angle)
-        y3 = y2 - arrow_length * math.sin(angle + arrow_angle)
-        x4 = x2 - arrow_length * math.cos(angle - arrow_angle)
-        y4 = y2 - arrow_length * math.sin(angle - arrow_angle)
-        
-        # 特殊处理白色标注，添加黑色边框辅助
-        if color.upper() == '#FFFFFF':
-            # 先绘制黑色线条
-            self.draw.line([x1, y1, x2, y2], fill='#000000', width=6)
-            self.draw.line([x2, y2, x3, y3], fill='#000000', width=6)
-            self.draw.line([x2, y2, x4, y4], fill='#000000', width=6)
-            self.draw.line([x3, y3, x4, y4], fill='#000000', width=6)
-        
-        # 绘制箭头线 - 增加线宽以提高可见度
-        self.draw.line([x1, y1, x2, y2], fill=color, width=4)
-        # 绘制箭头
-        self.draw.line([x2, y2, x3, y3], fill=color, width=4)
-        self.draw.line([x2, y2, x4, y4], fill=color, width=4)
-        
-        # 确保箭头不会被覆盖
-        self.draw.line([x3, y3, x4, y4], fill=color, width=4)
-    
-    def apply_mosaic(self, x1, y1, x2, y2):
-        """应用马赛克效果"""
-        # 获取区域图像
-        region = self.image.crop((x1, y1, x2, y2))
-        width, height = region.size
-        
-        # 确保马赛克块大小合适
-        block_size = max(5, min(self.mosaic_size, min(width, height) // 4))
-        
-        # 创建马赛克效果
-        for i in range(0, width, block_size):
-            for j in range(0, height, block_size):
-                # 获取块的平均颜色
-                block = region.crop((i, j, min(i + block_size, width), 
-                                  min(j + block_size, height)))
-                # 缩小到1x1获取平均颜色
-                avg_color = tuple(map(int, block.resize((1, 1), Image.LANCZOS).getpixel((0, 0))))
-                # 填充块
-                self.draw.rectangle([x1 + i, y1 + j, 
-                                   min(x1 + i + block_size, x2),
-                                   min(y1 + j + block_size, y2)],
-                                  fill=avg_color)
-    
     def canvas_to_image_coords(self, canvas_x, canvas_y):
         # 获取当前图片在canvas上的偏移
         img_coords = self.canvas.coords(self.canvas_img)
@@ -1011,50 +922,3 @@ class ScreenshotEditor(tk.Toplevel):
         canvas_x = img_x * self.zoom_scale + img_offset_x
         canvas_y = img_y * self.zoom_scale + img_offset_y
         return int(canvas_x), int(canvas_y)
-
-    def draw_rectangle(self, x0, y0, x1, y1, color):
-        """绘制矩形，提高对比度和可见度"""
-        # 确保坐标正确排序
-        x0, x1 = min(x0, x1), max(x0, x1)
-        y0, y1 = min(y0, y1), max(y0, y1)
-        
-        # 增加线宽以提高可见度
-        line_width = 4
-        
-        # 特殊处理白色标注，添加黑色边框辅助
-        if color.upper() == '#FFFFFF':
-            # 先绘制黑色外边框
-            outer_border = 1  # 外边框宽度
-            self.draw.rectangle([x0-outer_border, y0-outer_border, x1+outer_border, y1+outer_border], outline='#000000', width=line_width)
-        
-        # 绘制更粗的矩形边框
-        self.draw.rectangle([x0, y0, x1, y1], outline=color, width=line_width)
-        
-        # 如果是表格区域（较大矩形），添加淡色填充以增强可见度
-        if abs(x1 - x0) > 100 and abs(y1 - y0) > 100:
-            # 创建半透明填充色
-            fill_color = self.get_highlight_color(color)
-            # 绘制内部填充（稍微缩小以不覆盖边框）
-            inner_x0, inner_y0 = x0 + line_width, y0 + line_width
-            inner_x1, inner_y1 = x1 - line_width, y1 - line_width
-            # 使用alpha通道创建半透明填充
-            overlay = Image.new('RGBA', self.image.size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            overlay_draw.rectangle([inner_x0, inner_y0, inner_x1, inner_y1], fill=fill_color)
-            
-            # 将overlay合并到原图
-            if self.image.mode != 'RGBA':
-                self.image = self.image.convert('RGBA')
-            self.image = Image.alpha_composite(self.image, overlay)
-            self.draw = ImageDraw.Draw(self.image)
-    
-    def get_highlight_color(self, color):
-        """根据线条颜色获取适合的半透明填充色"""
-        # 将HEX颜色转换为RGB
-        if color.startswith('#'):
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            # 创建半透明版本 (r,g,b,alpha)，alpha为60表示透明度约75%
-            return (r, g, b, 60)
-        return (255, 255, 255, 40)  # 默认为半透明白色 
\ No newline at end of file
@@ -5,19 +5,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import threading
 from datetime import datetime
 from PIL import Image, ImageTk
 
 from src.config import (
-    UI_FONT_BOLD, UI_FONT_NORMAL, TABLE_COLUMNS, SCREENSHOT_DIR,
+    UI_FONT_BOLD, UI_FONT_NORMAL, TABLE_COLUMNS,
     COLOR_PRIMARY, COLOR_BACKGROUND, COLOR_NEUTRAL, 
     DARK_COLOR_PRIMARY, DARK_COLOR_BACKGROUND, DARK_COLOR_NEUTRAL
 )
 from src.utils.data_manager import DataManager
+from src.core.records import RecordConflictError
+from src.core.screenshots import archive_thumbnail_path, delete_screenshot, image_exists, resolve_image_path
 from src.utils.screenshot import load_image_from_path
+from src.utils.log_manager import get_logger
+from src.utils.ui_queue import UIEventQueue
+from src.utils.perf_trace import trace
 
-# 创建数据管理器实例
-data_manager = DataManager()
+logger = get_logger(__name__)
 
 class RecordsView:
     """记录查询界面类"""
@@ -29,6 +34,8 @@ class RecordsView:
             parent: 父窗口
         """
         self.parent = parent
+        # 数据管理器是单例，后台预加载未完成时这里会等待加载结束
+        self.data_manager = DataManager()
         self.window = tk.Toplevel(parent.root if hasattr(parent, 'root') else parent)
         self.window.title("查询记录")
         self.window.geometry("900x600")
@@ -56,8 +63,18 @@ class RecordsView:
         # 设置样式
         self._setup_styles()
         
+        # 关闭窗口时取消正在进行的导出；导出进度和结果经队列交回界面线程
+        self._export_cancel = None
+        self.worker_events = UIEventQueue(self.window)
+        self.worker_events.on(
+            "export_progress", lambda count: self.export_status.config(text=f"正在导出… 已写出 {count} 条")
+        )
+        self.worker_events.on("export_done", lambda payload: self._on_exported(*payload))
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
+        
         # 当前选中的记录
         self.selected_record = None
+        self.selected_updated_at = None
         self.current_image = None
         self.image_preview = None
         
@@ -232,8 +249,8 @@ class RecordsView:
         filter_btn = ttk.Button(button_frame, text="筛选", command=self._filter_records, width=8)
         filter_btn.pack(side=tk.LEFT, padx=5)
         
-        export_btn = ttk.Button(button_frame, text="导出CSV", command=self._export_csv, width=10)
-        export_btn.pack(side=tk.LEFT, padx=5)
+        self.export_btn = ttk.Button(button_frame, text="导出", command=self._export_records, width=10)
+        self.export_btn.pack(side=tk.LEFT, padx=5)
         
         # 设置权重，使右侧空间更大
         controls_frame.columnconfigure(1, weight=1)
@@ -266,7 +283,11 @@ class RecordsView:
         refresh_btn = ttk.Button(button_frame, text="刷新", command=self._load_records, width=8)
         refresh_btn.pack(side=tk.LEFT, padx=10)
         
-        close_btn = ttk.Button(button_frame, text="关闭", command=self.window.destroy, width=8)
+        # 导出进度
+        self.export_status = ttk.Label(button_frame, text="")
+        self.export_status.pack(side=tk.LEFT, padx=10)
+        
+        close_btn = ttk.Button(button_frame, text="关闭", command=self._on_close, width=8)
         close_btn.pack(side=tk.RIGHT, padx=10)
     
     def _create_records_list(self, parent):
@@ -392,11 +413,13 @@ class RecordsView:
         record_id = int(values[0])
         
         # 获取记录详情
-        record = data_manager.get_record_by_id(record_id)
+        record = self.data_manager.get_record_by_id(record_id)
         if not record:
             return
         
         self.selected_record = record
+        # 记下读取时的更新时间，保存时用于发现其他程序的修改
+        self.selected_updated_at = record.get('updated_at')
         
         # 更新界面
         self.task_entry.delete(0, tk.END)
@@ -415,22 +438,20 @@ class RecordsView:
         
         # 加载图片
         image_path = record.get('image_path', '')
-        print(f"尝试加载图片: {image_path}")
-        
-        # 尝试不同的路径格式
-        paths_to_try = [
-            image_path,
-            image_path.replace('/', '\\'),
-            image_path.replace('\\', '/'),
-            os.path.normpath(image_path),
-            os.path.abspath(os.path.basename(image_path)),
-            os.path.join(SCREENSHOT_DIR, os.path.basename(image_path))
-        ]
+        logger.debug("尝试加载图片: %s", image_path)
+        
+        # 兼容不同的路径格式和截图目录结构（平铺 / 按日期分文件夹）
+        resolved_path = resolve_image_path(image_path, record.get('timestamp'))
+        paths_to_try = [resolved_path] if resolved_path else [os.path.abspath(os.path.basename(image_path))]
+        # 已归档的截图优先显示保留在磁盘上的预览图，不必每次从归档文件中读取
+        thumbnail_path = archive_thumbnail_path(resolved_path)
+        if thumbnail_path:
+            paths_to_try.insert(0, thumbnail_path)
         
         image_loaded = False
         for path in paths_to_try:
-            if os.path.exists(path):
-                print(f"找到可用路径: {path}")
+            if image_exists(path):
+                logger.debug("找到可用路径: %s", path)
                 try:
                     # 加载图片
                     self.current_image = load_image_from_path(path)
@@ -451,18 +472,19 @@ class RecordsView:
                         new_height = int(img_height * ratio)
                         
                         # 调整图片大小并创建预览
-                        resized_img = self.current_image.resize((new_width, new_height), Image.LANCZOS)
-                        self.image_preview = ImageTk.PhotoImage(resized_img)
+                        with trace("records.preview", "preview"):
+                            resized_img = self.current_image.resize((new_width, new_height), Image.LANCZOS)
+                            self.image_preview = ImageTk.PhotoImage(resized_img)
                         
                         # 更新预览，清除文本
                         self.preview_label.config(image=self.image_preview, text="")
                         image_loaded = True
                         break
                 except Exception as e:
-                    print(f"加载图片失败: {e}")
+                    logger.warning("加载图片失败: %s", e)
         
         if not image_loaded:
-            print(f"无法找到或加载图片: {image_path}")
+            logger.warning("无法找到或加载图片: %s", image_path)
             self.current_image = None
             self.image_preview = None
             self.preview_label.config(image="", text="图片加载失败")
@@ -483,7 +505,16 @@ class RecordsView:
             return
         
         # 更新记录
-        success = data_manager.update_record(self.selected_record['id'], new_task_name)
+        try:
+            success = self.data_manager.update_record(
+                self.selected_record['id'], new_task_name,
+                expected_updated_at=self.selected_updated_at
+            )
+        except RecordConflictError:
+            messagebox.showwarning("记录已变化", "该记录已被其他程序修改，已重新加载，请确认后再修改")
+            self._clear_details()
+            self._load_records()
+            return
         if success:
             messagebox.showinfo("成功", "记录已更新")
             self._load_records()  # 刷新列表
@@ -499,16 +530,9 @@ class RecordsView:
         if not messagebox.askyesno("确认", "确定要删除该记录吗？"):
             return
             
-        # 删除记录
-        success, image_path = data_manager.delete_record(self.selected_record['id'])
+        # 删除记录和截图（普通文件、已归档或打包存储的截图都由 delete_screenshot 处理）
+        success, _ = delete_screenshot(self.selected_record['id'], self.data_manager)
         if success:
-            # 删除图片文件
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
-                    
             messagebox.showinfo("成功", "记录已删除")
             self._load_records()  # 刷新列表
             self._clear_details()  # 清空详情
@@ -536,7 +560,7 @@ class RecordsView:
             self.tree.delete(item)
         
         # 获取所有记录
-        records = data_manager.get_all_records()
+        records = self.data_manager.get_all_records()
         
         # 按时间倒序排序
         records.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
@@ -574,7 +598,7 @@ class RecordsView:
         keyword = self.filter_entry.get().strip()
         date_from = self.filter_start.get().strip()
         date_to = self.filter_end.get().strip()
-        records = data_manager.search_records(keyword, date_from, date_to)
+        records = self.data_manager.search_records(keyword, date_from, date_to)
         
         # 清空现有记录
         for item in self.tree.get_children():
@@ -598,30 +622,69 @@ class RecordsView:
             tag = "even" if i % 2 == 0 else "odd"
             self.tree.insert('', tk.END, values=values, tags=(str(record.get('id')), tag))
 
-    def _export_csv(self):
-        import csv
-        from tkinter import filedialog, messagebox
-        # 获取当前表格内容
-        items = self.tree.get_children()
-        if not items:
-            messagebox.showinfo("导出", "没有可导出的记录！")
+    def _export_records(self):
+        """按当前筛选条件导出全部字段（CSV / JSON Lines / Excel），或连同截图打包为ZIP/TAR，在后台线程中写出"""
+        from tkinter import filedialog
+        from src.core.export import export_in_background, default_export_name
+        
+        if self._export_cancel is not None:
+            messagebox.showinfo("导出", "正在导出，请稍候…", parent=self.window)
             return
-        # 选择保存路径
+        
         file_path = filedialog.asksaveasfilename(
+            parent=self.window,
             defaultextension=".csv",
-            filetypes=[("CSV文件", "*.csv")],
-            title="导出为CSV"
+            initialfile=default_export_name("csv"),
+            filetypes=[
+                ("CSV文件", "*.csv"), ("Excel工作簿", "*.xlsx"), ("JSON Lines", "*.jsonl"),
+                ("记录和截图（ZIP）", "*.zip"), ("记录和截图（TAR）", "*.tar")
+            ],
+            title="导出记录"
         )
         if not file_path:
             return
-        # 写入CSV
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow([col["text"] for col in TABLE_COLUMNS])
-            for item in items:
-                row = self.tree.item(item, 'values')
-                writer.writerow(row)
-        messagebox.showinfo("导出", f"已导出到 {file_path}")
+        
+        keyword = self.filter_entry.get().strip()
+        date_from = self.filter_start.get().strip()
+        date_to = self.filter_end.get().strip()
+        records = self.data_manager.iter_search(keyword, date_from, date_to)
+        
+        self._export_cancel = threading.Event()
+        self.export_btn.config(state="disabled")
+        self.export_status.config(text="正在导出…")
+        
+        def on_progress(count):
+            self.worker_events.post("export_progress", count)
+        
+        def on_done(count, error):
+            self.worker_events.post("export_done", (file_path, count, error))
+        
+        self.worker_events.start()
+        export_in_background(records, file_path, progress=on_progress, done=on_done,
+                             cancel_event=self._export_cancel)
+    
+    def _on_exported(self, file_path, count, error):
+        """导出完成（界面线程）"""
+        from src.core.export import ExportCancelled
+        
+        self.worker_events.finish()
+        self._export_cancel = None
+        self.export_btn.config(state="normal")
+        if error is None:
+            self.export_status.config(text=f"已导出 {count} 条记录")
+            messagebox.showinfo("导出", f"已导出 {count} 条记录到 {file_path}", parent=self.window)
+        elif isinstance(error, ExportCancelled):
+            self.export_status.config(text="导出已取消")
+        else:
+            self.export_status.config(text="导出失败")
+            messagebox.showerror("导出", f"导出失败: {error}", parent=self.window)
+    
+    def _on_close(self):
+        """关闭窗口，取消正在进行的导出"""
+        self.worker_events.close()
+        if self._export_cancel is not None:
+            self._export_cancel.set()
+        self.window.destroy()
 
     def _on_row_double_click(self, event):
         """双击行事件处理，可以考虑添加快速编辑功能"""
@@ -0,0 +1,169 @@
+"""
+自动截图模块 - 按固定间隔自动截图，并跳过画面没有变化的帧
+"""
+
+import datetime
+import threading
+from typing import Callable, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from src.utils.capture import get_capture_backend
+from src.utils.config_manager import default_config_manager
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 变化检测使用的缩略图尺寸
+FINGERPRINT_SIZE = (64, 36)
+# 缩略图中单个像素灰度差超过该值才视为变化
+PIXEL_DELTA = 12
+# 默认配置
+DEFAULT_INTERVAL_SECONDS = 300
+DEFAULT_TASK_PREFIX = "自动截图"
+DEFAULT_MIN_CHANGE_RATIO = 0.005
+
+
+def frame_fingerprint(image: Image.Image) -> Image.Image:
+    """
+    生成用于变化检测的灰度缩略图
+
+    Args:
+        image: 截图
+
+    Returns:
+        PIL.Image: 64x36 的灰度缩略图
+    """
+    # 先用 reduce 做整数倍快速缩小，再缩放到目标尺寸，避免对整幅大图做灰度转换
+    factor = max(1, min(image.width // (FINGERPRINT_SIZE[0] * 2), image.height // (FINGERPRINT_SIZE[1] * 2)))
+    small = image.reduce(factor) if factor > 1 else image
+    return small.resize(FINGERPRINT_SIZE, Image.BILINEAR).convert("L")
+
+
+def changed_ratio(previous: Image.Image, current: Image.Image) -> float:
+    """
+    计算两个缩略图之间发生变化的像素比例
+
+    Args:
+        previous: 上一帧的缩略图
+        current: 当前帧的缩略图
+
+    Returns:
+        float: 变化像素所占比例 (0-1)
+    """
+    diff = ImageChops.difference(previous, current)
+    histogram = diff.histogram()
+    changed = sum(histogram[PIXEL_DELTA + 1:])
+    return changed / float(FINGERPRINT_SIZE[0] * FINGERPRINT_SIZE[1])
+
+
+class AutoCapture:
+    """自动截图类，在后台线程中定时截图、检测变化并编码保存"""
+
+    def __init__(self, save_callback: Callable[[Image.Image, str], str],
+                 interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+                 task_prefix: str = DEFAULT_TASK_PREFIX,
+                 min_change_ratio: float = DEFAULT_MIN_CHANGE_RATIO,
+                 area: Optional[Tuple[int, int, int, int]] = None,
+                 on_saved: Optional[Callable[[str], None]] = None):
+        """初始化自动截图
+
+        Args:
+            save_callback: 保存回调 (image, task_name)，在工作线程中调用，返回截图路径，失败时抛出异常
+            interval_seconds: 截图间隔（秒）
+            task_prefix: 自动生成的事务名称前缀
+            min_change_ratio: 变化像素比例低于该值时跳过本帧
+            area: 截图区域，为None时截取后端默认屏幕
+            on_saved: 保存成功并更新计数后的通知 (截图路径)，在工作线程中调用
+        """
+        self.save_callback = save_callback
+        self.on_saved = on_saved
+        self.interval_seconds = max(1.0, float(interval_seconds))
+        self.task_prefix = task_prefix
+        self.min_change_ratio = min_change_ratio
+        self.area = area
+
+        self.saved_count = 0
+        self.skipped_count = 0
+        self._last_fingerprint = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, save_callback, area=None, on_saved=None):
+        """根据用户配置创建自动截图实例
+
+        Args:
+            save_callback: 保存回调
+            area: 截图区域
+            on_saved: 保存成功后的通知
+
+        Returns:
+            AutoCapture: 自动截图实例
+        """
+        config = default_config_manager
+        return cls(
+            save_callback,
+            interval_seconds=config.get_value("auto_capture", "interval_seconds", DEFAULT_INTERVAL_SECONDS),
+            task_prefix=config.get_value("auto_capture", "task_prefix", DEFAULT_TASK_PREFIX),
+            min_change_ratio=config.get_value("auto_capture", "min_change_ratio", DEFAULT_MIN_CHANGE_RATIO),
+            area=area,
+            on_saved=on_saved,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        """自动截图是否正在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动自动截图线程"""
+        if self.is_running:
+            return
+        # 每次启动使用新的停止事件，避免旧线程在快速重启后继续运行
+        self._stop_event = threading.Event()
+        self._last_fingerprint = None
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="AutoCapture", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止自动截图线程"""
+        self._stop_event.set()
+        self._thread = None
+
+    def make_task_name(self) -> str:
+        """生成自动截图的事务名称"""
+        return f"{self.task_prefix} {datetime.datetime.now().strftime('%H:%M:%S')}"
+
+    def capture_once(self) -> bool:
+        """截取一帧，画面有变化时保存
+
+        Returns:
+            bool: 是否保存了本帧
+        """
+        image = get_capture_backend().grab(self.area)
+        fingerprint = frame_fingerprint(image)
+        if self._last_fingerprint is not None:
+            if changed_ratio(self._last_fingerprint, fingerprint) < self.min_change_ratio:
+                # 画面几乎没有变化，跳过编码和写盘
+                self.skipped_count += 1
+                return False
+        filepath = self.save_callback(image, self.make_task_name())
+        # 保存成功后才作为比较基准，保存失败时下一帧即使相同也会重试
+        self._last_fingerprint = fingerprint
+        self.saved_count += 1
+        if self.on_saved:
+            self.on_saved(filepath)
+        return True
+
+    def _run(self, stop_event: threading.Event) -> None:
+        """工作线程主循环
+
+        Args:
+            stop_event: 本次运行的停止事件
+        """
+        while not stop_event.wait(self.interval_seconds):
+            try:
+                self.capture_once()
+            except Exception as e:
+                logger.exception("自动截图失败: %s", e)
@@ -0,0 +1,834 @@
+"""
+截图后端模块 - 提供可替换的屏幕捕获实现，并在启动时选出最快的可用后端
+"""
+
+import os
+import sys
+import time
+import threading
+import ctypes
+import ctypes.util
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
+
+from PIL import Image
+
+from src.utils.config_manager import default_config_manager
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 启动探测时截取的区域大小和次数
+PROBE_REGION = (0, 0, 256, 256)
+PROBE_SAMPLES = 3
+
+
+class Monitor(NamedTuple):
+    """显示器信息，坐标为虚拟桌面坐标"""
+    left: int
+    top: int
+    width: int
+    height: int
+    primary: bool = False
+    name: str = ""
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """显示器区域 (left, top, right, bottom)"""
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+    def contains(self, x: int, y: int) -> bool:
+        """判断坐标点是否位于该显示器内"""
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
+
+
+class CaptureBackend:
+    """截图后端基类，所有后端都需要实现 grab 方法"""
+
+    # 后端名称，用于配置和基准测试报告
+    name = "base"
+    # 是否参与自动探测（测试用的假后端不参与）
+    auto_select = True
+
+    def is_available(self) -> bool:
+        """检查当前环境是否可以使用该后端
+
+        Returns:
+            bool: 是否可用
+        """
+        return False
+
+    def grab(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        """捕获屏幕图像
+
+        Args:
+            bbox: 截取区域 (left, top, right, bottom)，为None时捕获全屏
+
+        Returns:
+            PIL.Image: RGB格式的截图
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放后端占用的资源"""
+        pass
+
+
+class ImageGrabBackend(CaptureBackend):
+    """基于 PIL.ImageGrab 的后端（Windows/macOS，以及支持XCB的Linux）"""
+
+    name = "imagegrab"
+
+    def is_available(self) -> bool:
+        try:
+            from PIL import ImageGrab  # noqa: F401
+        except ImportError:
+            return False
+        if sys.platform.startswith("linux"):
+            # Linux 下只有编译了XCB支持才能直接截屏，否则会调用外部程序
+            return bool(os.environ.get("DISPLAY")) and bool(getattr(Image.core, "HAVE_XCB", False))
+        return sys.platform in ("win32", "darwin")
+
+    def grab(self, bbox=None):
+        from PIL import ImageGrab
+        if bbox is not None and sys.platform == "win32" and not _within_primary_win32(bbox):
+            # 区域位于副显示器时需要捕获整个虚拟桌面再裁剪
+            image = ImageGrab.grab(bbox=bbox, all_screens=True)
+        else:
+            image = ImageGrab.grab(bbox=bbox)
+        return image.convert("RGB") if image.mode != "RGB" else image
+
+
+class _BitmapInfoHeader(ctypes.Structure):
+    """Win32 BITMAPINFOHEADER 结构体"""
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
+class GdiBackend(CaptureBackend):
+    """Windows GDI 截图后端
+
+    直接用 BitBlt 复制指定区域，支持任意显示器（包括负坐标的副屏），
+    内存和耗时只与截取区域大小成正比，而不是整个虚拟桌面。
+    """
+
+    name = "gdi"
+
+    _SRCCOPY = 0x00CC0020
+    _CAPTUREBLT = 0x40000000
+    _DIB_RGB_COLORS = 0
+    _BI_RGB = 0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._user32 = None
+        self._gdi32 = None
+
+    def is_available(self) -> bool:
+        if sys.platform != "win32":
+            return False
+        try:
+            return self._load()
+        except (OSError, AttributeError):
+            return False
+
+    def _load(self) -> bool:
+        """加载GDI函数并声明参数类型"""
+        if self._gdi32:
+            return True
+        user32 = ctypes.WinDLL("user32")
+        gdi32 = ctypes.WinDLL("gdi32")
+        handle = ctypes.c_void_p
+
+        user32.GetDC.restype = handle
+        user32.GetDC.argtypes = [handle]
+        user32.ReleaseDC.argtypes = [handle, handle]
+        gdi32.CreateCompatibleDC.restype = handle
+        gdi32.CreateCompatibleDC.argtypes = [handle]
+        gdi32.CreateCompatibleBitmap.restype = handle
+        gdi32.CreateCompatibleBitmap.argtypes = [handle, ctypes.c_int, ctypes.c_int]
+        gdi32.SelectObject.restype = handle
+        gdi32.SelectObject.argtypes = [handle, handle]
+        gdi32.BitBlt.argtypes = [handle, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                 handle, ctypes.c_int, ctypes.c_int, ctypes.c_uint32]
+        gdi32.GetDIBits.argtypes = [handle, handle, ctypes.c_uint, ctypes.c_uint, ctypes.c_void_p,
+                                    ctypes.POINTER(_BitmapInfoHeader), ctypes.c_uint]
+        gdi32.DeleteObject.argtypes = [handle]
+        gdi32.DeleteDC.argtypes = [handle]
+
+        _set_dpi_aware_win32()
+        self._user32, self._gdi32 = user32, gdi32
+        return True
+
+    def grab(self, bbox=None):
+        with self._lock:
+            if not self._load():
+                raise OSError("GDI 不可用")
+            if bbox is None:
+                bbox = _primary_bbox_win32()
+            left, top, right, bottom = bbox
+            width, height = right - left, bottom - top
+
+            user32, gdi32 = self._user32, self._gdi32
+            screen_dc = user32.GetDC(None)
+            mem_dc = gdi32.CreateCompatibleDC(screen_dc)
+            bitmap = gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+            old_bitmap = gdi32.SelectObject(mem_dc, bitmap)
+            try:
+                if not gdi32.BitBlt(mem_dc, 0, 0, width, height, screen_dc, left, top,
+                                    self._SRCCOPY | self._CAPTUREBLT):
+                    raise OSError("BitBlt 失败")
+                header = _BitmapInfoHeader()
+                header.biSize = ctypes.sizeof(_BitmapInfoHeader)
+                header.biWidth = width
+                header.biHeight = -height  # 负数表示自上而下的位图
+                header.biPlanes = 1
+                header.biBitCount = 32
+                header.biCompression = self._BI_RGB
+                buffer = ctypes.create_string_buffer(width * height * 4)
+                if not gdi32.GetDIBits(mem_dc, bitmap, 0, height, buffer, ctypes.byref(header),
+                                       self._DIB_RGB_COLORS):
+                    raise OSError("GetDIBits 失败")
+            finally:
+                gdi32.SelectObject(mem_dc, old_bitmap)
+                gdi32.DeleteObject(bitmap)
+                gdi32.DeleteDC(mem_dc)
+                user32.ReleaseDC(None, screen_dc)
+            return Image.frombuffer("RGB", (width, height), buffer, "raw", "BGRX", 0, 1)
+
+
+class PyAutoGuiBackend(CaptureBackend):
+    """基于 pyautogui 的后端，兼容性最好但速度较慢"""
+
+    name = "pyautogui"
+
+    def is_available(self) -> bool:
+        try:
+            import pyautogui  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def grab(self, bbox=None):
+        import pyautogui
+        if bbox is None:
+            return pyautogui.screenshot()
+        left, top, right, bottom = bbox
+        return pyautogui.screenshot(region=(left, top, right - left, bottom - top))
+
+
+class _XImage(ctypes.Structure):
+    """Xlib XImage 结构体（只声明需要访问的前部字段）"""
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    """XShm 共享内存段信息结构体"""
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class XShmBackend(CaptureBackend):
+    """Linux X11 共享内存截图后端
+
+    通过 MIT-SHM 扩展让 X 服务器直接把像素写入共享内存，
+    避免经由套接字传输整幅图像，同尺寸的共享内存段会被复用。
+    """
+
+    name = "xshm"
+
+    _ZPIXMAP = 2
+    _IPC_PRIVATE = 0
+    _IPC_CREAT = 0o1000
+    _IPC_RMID = 0
+    _ALL_PLANES = ctypes.c_ulong(-1).value
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._xlib = None
+        self._xext = None
+        self._libc = None
+        self._display = None
+        self._root = None
+        self._screen_size = (0, 0)
+        self._segment = None  # (size, ximage指针, 段信息)
+
+    def is_available(self) -> bool:
+        if not sys.platform.startswith("linux") or not os.environ.get("DISPLAY"):
+            return False
+        try:
+            return self._open()
+        except (OSError, AttributeError):
+            return False
+
+    def _open(self) -> bool:
+        """打开X连接并加载所需的库函数"""
+        if self._display:
+            return True
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        libc_path = ctypes.util.find_library("c")
+        if not x11_path or not xext_path or not libc_path:
+            return False
+
+        xlib = ctypes.CDLL(x11_path)
+        xext = ctypes.CDLL(xext_path)
+        libc = ctypes.CDLL(libc_path, use_errno=True)
+
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        xlib.XRootWindow.restype = ctypes.c_ulong
+        xlib.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XDefaultVisual.restype = ctypes.c_void_p
+        xlib.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XFree.argtypes = [ctypes.c_void_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+        ]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+            ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+        ]
+
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            return False
+        if not xext.XShmQueryExtension(display):
+            xlib.XCloseDisplay(display)
+            return False
+
+        screen = xlib.XDefaultScreen(display)
+        self._xlib, self._xext, self._libc = xlib, xext, libc
+        self._display = display
+        self._screen = screen
+        self._root = xlib.XRootWindow(display, screen)
+        self._screen_size = (xlib.XDisplayWidth(display, screen), xlib.XDisplayHeight(display, screen))
+        return True
+
+    def _release_segment(self) -> None:
+        """释放当前复用的共享内存段"""
+        if not self._segment:
+            return
+        _size, ximage, seginfo = self._segment
+        self._xext.XShmDetach(self._display, ctypes.byref(seginfo))
+        self._xlib.XSync(self._display, 0)
+        # 数据区属于共享内存段，不能交给XDestroyImage释放
+        ximage.contents.data = None
+        self._xlib.XFree(ximage)
+        self._libc.shmdt(seginfo.shmaddr)
+        self._segment = None
+
+    def _get_segment(self, width: int, height: int):
+        """获取指定尺寸的共享内存图像，尺寸不变时复用已有段"""
+        if self._segment and self._segment[0] == (width, height):
+            return self._segment
+        self._release_segment()
+
+        seginfo = _XShmSegmentInfo()
+        visual = self._xlib.XDefaultVisual(self._display, self._screen)
+        depth = self._xlib.XDefaultDepth(self._display, self._screen)
+        ximage = self._xext.XShmCreateImage(
+            self._display, visual, depth, self._ZPIXMAP, None, ctypes.byref(seginfo), width, height
+        )
+        if not ximage:
+            raise OSError("XShmCreateImage 失败")
+
+        size = ximage.contents.bytes_per_line * ximage.contents.height
+        shmid = self._libc.shmget(self._IPC_PRIVATE, size, self._IPC_CREAT | 0o600)
+        if shmid < 0:
+            self._xlib.XFree(ximage)
+            raise OSError(ctypes.get_errno(), "shmget 失败")
+        shmaddr = self._libc.shmat(shmid, None, 0)
+        if shmaddr in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(shmid, self._IPC_RMID, None)
+            self._xlib.XFree(ximage)
+            raise OSError(ctypes.get_errno(), "shmat 失败")
+
+        seginfo.shmid = shmid
+        seginfo.shmaddr = shmaddr
+        seginfo.readOnly = 0
+        ximage.contents.data = shmaddr
+        self._xext.XShmAttach(self._display, ctypes.byref(seginfo))
+        self._xlib.XSync(self._display, 0)
+        # X服务器挂接后立即标记删除，进程退出时共享内存会被自动回收
+        self._libc.shmctl(shmid, self._IPC_RMID, None)
+
+        self._segment = ((width, height), ximage, seginfo)
+        return self._segment
+
+    def grab(self, bbox=None):
+        with self._lock:
+            if not self._open():
+                raise OSError("无法连接X11显示服务器")
+            if bbox is None:
+                bbox = (0, 0) + self._screen_size
+            left, top, right, bottom = bbox
+            width, height = right - left, bottom - top
+
+            _size, ximage, seginfo = self._get_segment(width, height)
+            if not self._xext.XShmGetImage(self._display, self._root, ximage, left, top, self._ALL_PLANES):
+                raise OSError("XShmGetImage 失败")
+
+            info = ximage.contents
+            if info.bits_per_pixel != 32:
+                raise OSError(f"不支持的像素格式: {info.bits_per_pixel} bpp")
+            buffer = ctypes.string_at(seginfo.shmaddr, info.bytes_per_line * info.height)
+            return Image.frombuffer("RGB", (width, height), buffer, "raw", "BGRX", info.bytes_per_line, 1)
+
+    def close(self):
+        with self._lock:
+            if self._display:
+                self._release_segment()
+                self._xlib.XCloseDisplay(self._display)
+                self._display = None
+
+
+class FakeBackend(CaptureBackend):
+    """内存中的假后端，用于测试和无显示环境下的基准测试"""
+
+    name = "fake"
+    auto_select = False
+
+    def __init__(self, image: Optional[Image.Image] = None, size: Tuple[int, int] = (1920, 1080)):
+        """初始化假后端
+
+        Args:
+            image: 作为"屏幕"内容的图像，为None时生成渐变图
+            size: 未提供图像时生成的屏幕尺寸
+        """
+        if image is None:
+            image = Image.linear_gradient("L").resize(size).convert("RGB")
+        self.screen = image
+        self.grab_count = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def grab(self, bbox=None):
+        self.grab_count += 1
+        if bbox is None:
+            return self.screen.copy()
+        return self.screen.crop(bbox)
+
+
+def _set_dpi_aware_win32() -> None:
+    """声明进程支持高DPI，保证显示器坐标为物理像素"""
+    try:
+        ctypes.windll.user32.SetProcessDPIAware()
+    except (AttributeError, OSError):
+        pass
+
+
+def _primary_bbox_win32() -> Tuple[int, int, int, int]:
+    """获取Windows主显示器区域"""
+    user32 = ctypes.windll.user32
+    return (0, 0, user32.GetSystemMetrics(0), user32.GetSystemMetrics(1))
+
+
+def _within_primary_win32(bbox) -> bool:
+    """判断区域是否完全位于Windows主显示器内"""
+    _left, _top, width, height = _primary_bbox_win32()
+    left, top, right, bottom = bbox
+    return left >= 0 and top >= 0 and right <= width and bottom <= height
+
+
+class _Rect(ctypes.Structure):
+    """Win32 RECT 结构体"""
+    _fields_ = [("left", ctypes.c_long), ("top", ctypes.c_long),
+                ("right", ctypes.c_long), ("bottom", ctypes.c_long)]
+
+
+class _MonitorInfoEx(ctypes.Structure):
+    """Win32 MONITORINFOEXW 结构体"""
+    _fields_ = [("cbSize", ctypes.c_uint32), ("rcMonitor", _Rect), ("rcWork", _Rect),
+                ("dwFlags", ctypes.c_uint32), ("szDevice", ctypes.c_wchar * 32)]
+
+
+def _enumerate_monitors_win32() -> List[Monitor]:
+    """通过 EnumDisplayMonitors 枚举Windows显示器"""
+    _set_dpi_aware_win32()
+    user32 = ctypes.windll.user32
+    monitors = []
+    callback_type = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p,
+                                       ctypes.POINTER(_Rect), ctypes.c_void_p)
+    user32.GetMonitorInfoW.argtypes = [ctypes.c_void_p, ctypes.POINTER(_MonitorInfoEx)]
+
+    def on_monitor(hmonitor, _hdc, _rect, _data):
+        info = _MonitorInfoEx()
+        info.cbSize = ctypes.sizeof(_MonitorInfoEx)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            rect = info.rcMonitor
+            monitors.append(Monitor(rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top,
+                                    bool(info.dwFlags & 1), info.szDevice))
+        return 1
+
+    user32.EnumDisplayMonitors(None, None, callback_type(on_monitor), 0)
+    return monitors
+
+
+class _XRRMonitorInfo(ctypes.Structure):
+    """XRandR XRRMonitorInfo 结构体"""
+    _fields_ = [("name", ctypes.c_ulong), ("primary", ctypes.c_int), ("automatic", ctypes.c_int),
+                ("noutput", ctypes.c_int), ("x", ctypes.c_int), ("y", ctypes.c_int),
+                ("width", ctypes.c_int), ("height", ctypes.c_int),
+                ("mwidth", ctypes.c_int), ("mheight", ctypes.c_int),
+                ("outputs", ctypes.c_void_p)]
+
+
+def _enumerate_monitors_x11() -> List[Monitor]:
+    """通过 XRandR 枚举X11显示器"""
+    if not os.environ.get("DISPLAY"):
+        return []
+    x11_path = ctypes.util.find_library("X11")
+    xrandr_path = ctypes.util.find_library("Xrandr")
+    if not x11_path or not xrandr_path:
+        return []
+    xlib = ctypes.CDLL(x11_path)
+    xrandr = ctypes.CDLL(xrandr_path)
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xlib.XGetAtomName.restype = ctypes.c_void_p
+    xlib.XGetAtomName.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    xlib.XFree.argtypes = [ctypes.c_void_p]
+    xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    xrandr.XRRGetMonitors.restype = ctypes.POINTER(_XRRMonitorInfo)
+    xrandr.XRRGetMonitors.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int,
+                                      ctypes.POINTER(ctypes.c_int)]
+    xrandr.XRRFreeMonitors.argtypes = [ctypes.POINTER(_XRRMonitorInfo)]
+
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        return []
+    monitors = []
+    try:
+        count = ctypes.c_int(0)
+        infos = xrandr.XRRGetMonitors(display, xlib.XDefaultRootWindow(display), 1, ctypes.byref(count))
+        if not infos:
+            return []
+        for i in range(count.value):
+            info = infos[i]
+            name = ""
+            name_ptr = xlib.XGetAtomName(display, info.name) if info.name else None
+            if name_ptr:
+                name = ctypes.string_at(name_ptr).decode("utf-8", "replace")
+                xlib.XFree(name_ptr)
+            monitors.append(Monitor(info.x, info.y, info.width, info.height, bool(info.primary), name))
+        xrandr.XRRFreeMonitors(infos)
+    finally:
+        xlib.XCloseDisplay(display)
+    return monitors
+
+
+def enumerate_monitors(window=None) -> List[Monitor]:
+    """
+    枚举所有显示器
+
+    Args:
+        window: 可选的Tk窗口，平台接口不可用时用它获取主屏尺寸
+
+    Returns:
+        list: 显示器列表，主显示器排在第一位
+    """
+    monitors = []
+    try:
+        if sys.platform == "win32":
+            monitors = _enumerate_monitors_win32()
+        elif sys.platform.startswith("linux"):
+            monitors = _enumerate_monitors_x11()
+    except (OSError, AttributeError) as e:
+        logger.warning("枚举显示器失败: %s", e)
+        monitors = []
+
+    if not monitors and window is not None:
+        monitors = [Monitor(0, 0, window.winfo_screenwidth(), window.winfo_screenheight(), True, "default")]
+    if monitors and not any(m.primary for m in monitors):
+        monitors[0] = monitors[0]._replace(primary=True)
+    monitors.sort(key=lambda m: (not m.primary, m.left, m.top))
+    return monitors
+
+
+def get_virtual_bbox(monitors: List[Monitor]) -> Tuple[int, int, int, int]:
+    """
+    计算所有显示器组成的虚拟桌面区域
+
+    Args:
+        monitors: 显示器列表
+
+    Returns:
+        tuple: (left, top, right, bottom)
+    """
+    boxes = [m.bbox for m in monitors]
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+def monitor_at(x: int, y: int, monitors: List[Monitor]) -> Optional[Monitor]:
+    """
+    查找包含指定坐标的显示器
+
+    Args:
+        x: 虚拟桌面横坐标
+        y: 虚拟桌面纵坐标
+        monitors: 显示器列表
+
+    Returns:
+        Monitor: 包含该点的显示器，找不到时返回主显示器
+    """
+    for monitor in monitors:
+        if monitor.contains(x, y):
+            return monitor
+    return monitors[0] if monitors else None
+
+
+def get_capture_area(window, mode: Optional[str] = None) -> Optional[Tuple[int, int, int, int]]:
+    """
+    根据截图模式计算需要捕获的区域
+
+    Args:
+        window: Tk窗口，用于获取鼠标位置
+        mode: 截图模式，cursor=鼠标所在显示器，primary=主显示器，virtual=整个虚拟桌面；
+              为None时读取配置 capture.monitor_mode
+
+    Returns:
+        tuple: 捕获区域 (left, top, right, bottom)，无法确定时返回None（由后端捕获默认屏幕）
+    """
+    if mode is None:
+        mode = default_config_manager.get_value("capture", "monitor_mode", "cursor")
+    monitors = enumerate_monitors(window)
+    if not monitors:
+        return None
+    if mode == "virtual":
+        return get_virtual_bbox(monitors)
+    if mode == "primary":
+        return monitors[0].bbox
+    pointer_x, pointer_y = window.winfo_pointerxy()
+    return monitor_at(pointer_x, pointer_y, monitors).bbox
+
+
+# 已注册的后端，按优先级排列（探测耗时相同时靠前的优先）
+BACKEND_CLASSES = [XShmBackend, GdiBackend, ImageGrabBackend, PyAutoGuiBackend, FakeBackend]
+
+# 当前选中的后端
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _measure(backend: CaptureBackend, bbox, samples: int) -> List[float]:
+    """多次截图并返回每次的耗时（秒）"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        backend.grab(bbox)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def get_available_backends(include_fake: bool = False) -> List[CaptureBackend]:
+    """
+    获取当前环境下所有可用的后端实例
+
+    Args:
+        include_fake: 是否包含测试用的假后端
+
+    Returns:
+        list: 可用的后端实例列表
+    """
+    backends = []
+    for backend_class in BACKEND_CLASSES:
+        backend = backend_class()
+        if not include_fake and not backend.auto_select:
+            continue
+        if backend.is_available():
+            backends.append(backend)
+        else:
+            backend.close()
+    return backends
+
+
+def probe_fastest_backend(samples: int = PROBE_SAMPLES, bbox=PROBE_REGION) -> CaptureBackend:
+    """
+    探测所有可用后端并返回截图最快的一个
+
+    Args:
+        samples: 每个后端的截图次数
+        bbox: 探测时截取的区域
+
+    Returns:
+        CaptureBackend: 最快的后端；都不可用时退回 pyautogui 后端
+    """
+    best, best_time = None, None
+    for backend in get_available_backends():
+        try:
+            # 先截一次预热（建立连接、分配缓冲区），不计入耗时
+            backend.grab(bbox)
+            elapsed = sorted(_measure(backend, bbox, samples))[samples // 2]
+        except Exception as e:
+            logger.debug("截图后端 %s 探测失败: %s", backend.name, e)
+            backend.close()
+            continue
+        if best_time is None or elapsed < best_time:
+            if best is not None:
+                best.close()
+            best, best_time = backend, elapsed
+        else:
+            backend.close()
+
+    if best is None:
+        return PyAutoGuiBackend()
+    logger.info("选用截图后端: %s (%.1f ms)", best.name, best_time * 1000)
+    return best
+
+
+def create_backend(name: str) -> Optional[CaptureBackend]:
+    """
+    按名称创建后端实例
+
+    Args:
+        name: 后端名称
+
+    Returns:
+        CaptureBackend: 后端实例，名称不存在或不可用时返回None
+    """
+    for backend_class in BACKEND_CLASSES:
+        if backend_class.name == name:
+            backend = backend_class()
+            return backend if backend.is_available() else None
+    return None
+
+
+def get_capture_backend() -> CaptureBackend:
+    """
+    获取当前使用的截图后端，首次调用时根据配置选择或自动探测
+
+    Returns:
+        CaptureBackend: 截图后端
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = default_config_manager.get_value("capture", "backend", "auto")
+            if name and name != "auto":
+                _backend = create_backend(name)
+                if _backend is None:
+                    logger.warning("配置的截图后端不可用: %s，改为自动选择", name)
+            if _backend is None:
+                _backend = probe_fastest_backend()
+        return _backend
+
+
+def preload_capture_backend() -> threading.Thread:
+    """
+    在后台线程中选择截图后端，避免导入 pyautogui 和探测截图阻塞界面线程
+
+    探测完成前调用 get_capture_backend() 会等待探测结束，并使用探测选出的后端。
+
+    Returns:
+        threading.Thread: 探测线程
+    """
+    thread = threading.Thread(target=get_capture_backend, name="CaptureBackendProbe", daemon=True)
+    thread.start()
+    return thread
+
+
+def set_capture_backend(backend: CaptureBackend) -> None:
+    """
+    替换当前使用的截图后端（例如在测试中注入 FakeBackend）
+
+    Args:
+        backend: 新的截图后端
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+
+
+def benchmark_backends(samples: int = 20, bbox=None, include_fake: bool = True) -> List[Dict[str, Any]]:
+    """
+    对所有可用后端进行截图基准测试
+
+    Args:
+        samples: 每个后端的截图次数
+        bbox: 截取区域，为None时截取全屏
+        include_fake: 是否包含假后端（无显示环境下也能运行）
+
+    Returns:
+        list: 每个后端的测试结果，包括延迟百分位和吞吐量
+    """
+    results = []
+    for backend in get_available_backends(include_fake=include_fake):
+        result = {"backend": backend.name}
+        try:
+            image = backend.grab(bbox)  # 预热
+            timings = sorted(_measure(backend, bbox, samples))
+            pixels = image.width * image.height
+            mean = sum(timings) / len(timings)
+            result.update({
+                "width": image.width,
+                "height": image.height,
+                "samples": samples,
+                "mean_ms": round(mean * 1000, 3),
+                "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+                "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+                "min_ms": round(timings[0] * 1000, 3),
+                "fps": round(1.0 / mean, 2) if mean > 0 else None,
+                "mpixels_per_s": round(pixels / mean / 1e6, 2) if mean > 0 else None,
+            })
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            backend.close()
+        results.append(result)
+    return results
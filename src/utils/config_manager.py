@@ -13,6 +13,9 @@ from src.config import (
     INTERVAL_REMINDER_MINUTES, INTERVAL_REMINDER_MESSAGE,
     SCREENSHOT_DIR
 )
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
 
 class ConfigManager:
     """配置管理器类，管理用户配置"""
@@ -38,7 +41,10 @@ class ConfigManager:
                 "message": REMINDER_MESSAGE,
                 "sound_enabled": REMINDER_SOUND_ENABLED,
                 "interval_minutes": INTERVAL_REMINDER_MINUTES,
-                "interval_message": INTERVAL_REMINDER_MESSAGE
+                "interval_message": INTERVAL_REMINDER_MESSAGE,
+                "rules": [],  # 提醒规则列表，格式见 src/utils/reminder_rules.py
+                "holidays": [],  # 跳过提醒的节假日 YYYY-MM-DD
+                "missed_policy": "fire_once"  # 休眠或改时后错过的提醒: fire_once / skip / catch_up
             },
             "ui": {
                 "startup_maximized": True,
@@ -48,11 +54,34 @@ class ConfigManager:
             },
             "files": {
                 "screenshot_save_path": SCREENSHOT_DIR,
-                "use_custom_path": False
+                "use_custom_path": False,
+                "directory_layout": "flat",  # flat: 全部放在保存目录, date: 按日期分文件夹 YYYY/MM/DD
+                "storage_backend": "files"  # files: 每张截图一个文件, packed: 追加写入保存目录下 packs 中的打包文件
+            },
+            "storage": {
+                "tiering_enabled": False,  # 在后台定期归档旧截图
+                "archive_after_days": 180,  # 超过该天数的截图打包进归档文件
+                "archive_format": "webp",  # 归档时重新编码的格式: webp / jpeg / png
+                "archive_lossless": True,  # WebP 无损压缩：文字截图通常只有 PNG 的三分之一
+                "archive_quality": 80,  # 有损 WebP / JPEG 的质量
+                "max_dimension": 0,  # 归档时把长边缩小到该像素数，0 表示不缩小
+                "thumbnail_size": 480,  # 保留在磁盘上的预览图长边像素数
+                "check_interval_hours": 24
+            },
+            "capture": {
+                "backend": "auto",  # auto 表示启动时探测最快的可用后端
+                "monitor_mode": "cursor"  # cursor: 鼠标所在显示器, primary: 主显示器, virtual: 全部显示器
+            },
+            "auto_capture": {
+                "enabled": False,
+                "interval_seconds": 300,
+                "task_prefix": "自动截图",
+                "min_change_ratio": 0.005  # 画面变化比例低于该值时跳过保存
             },
             "advanced": {
                 "debug_mode": False,
-                "save_logs": True
+                "save_logs": True,
+                "perf_trace": False  # 记录关键操作耗时（默认关闭），开启后可在高级设置中查看和导出；命令行 -v 时也会开启
             }
         }
         
@@ -70,18 +99,18 @@ class ConfigManager:
         # 获取用户配置目录
         if hasattr(sys, "_MEIPASS"):  # PyInstaller打包环境
             config_dir = os.path.join(os.path.expanduser("~"), ".liuhen")
-            print(f"打包环境 - 用户配置目录: {config_dir}")
+            logger.debug("打包环境 - 用户配置目录: %s", config_dir)
         else:
             config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
-            print(f"开发环境 - 用户配置目录: {config_dir}")
+            logger.debug("开发环境 - 用户配置目录: %s", config_dir)
         
         # 确保目录存在
         if not os.path.exists(config_dir):
             try:
                 os.makedirs(config_dir)
-                print(f"已创建配置目录: {config_dir}")
+                logger.info("已创建配置目录: %s", config_dir)
             except Exception as e:
-                print(f"创建配置目录失败，尝试使用备选目录: {e}")
+                logger.warning("创建配置目录失败，尝试使用备选目录: %s", e)
                 # 如果首选目录创建失败，尝试使用桌面
                 config_dir = os.path.join(os.path.expanduser("~"), "Desktop", ".liuhen")
                 os.makedirs(config_dir, exist_ok=True)
@@ -104,24 +133,24 @@ class ConfigManager:
                     save_path = self.config["files"]["screenshot_save_path"]
                     # 确保路径是字符串且存在
                     if not isinstance(save_path, str) or not save_path:
-                        print("保存路径无效，重置为默认")
+                        logger.warning("保存路径无效，重置为默认")
                         from src.config import SCREENSHOT_DIR
                         self.config["files"]["screenshot_save_path"] = SCREENSHOT_DIR
                         
-                print(f"已加载用户配置: {config_path}")
+                logger.info("已加载用户配置: %s", config_path)
             except Exception as e:
-                print(f"加载用户配置失败: {e}")
+                logger.error("加载用户配置失败: %s", e)
                 # 文件可能损坏，创建备份并使用默认配置
                 if os.path.exists(config_path):
                     try:
                         backup_path = f"{config_path}.bak"
                         import shutil
                         shutil.copy2(config_path, backup_path)
-                        print(f"已创建配置文件备份: {backup_path}")
+                        logger.info("已创建配置文件备份: %s", backup_path)
                     except Exception as backup_error:
-                        print(f"备份配置文件失败: {backup_error}")
+                        logger.error("备份配置文件失败: %s", backup_error)
         else:
-            print("未找到用户配置文件，使用默认配置")
+            logger.info("未找到用户配置文件，使用默认配置")
     
     def update_nested_dict(self, d, u):
         """递归更新嵌套字典
@@ -146,13 +175,13 @@ class ConfigManager:
             bool: 是否保存成功
         """
         try:
-            print("ConfigManager - 开始保存配置")
+            logger.debug("ConfigManager - 开始保存配置")
             if new_config:
                 # 更新配置
-                print("ConfigManager - 更新配置字典")
+                logger.debug("ConfigManager - 更新配置字典")
                 self.update_nested_dict(self.config, new_config)
             else:
-                print("ConfigManager - 没有提供新配置，使用当前配置")
+                logger.debug("ConfigManager - 没有提供新配置，使用当前配置")
             
             # 验证保存路径格式
             if "files" in self.config and "screenshot_save_path" in self.config["files"]:
@@ -160,41 +189,39 @@ class ConfigManager:
                 if isinstance(save_path, str):
                     # 标准化路径
                     self.config["files"]["screenshot_save_path"] = os.path.normpath(save_path)
-                    print(f"ConfigManager - 标准化保存路径: {self.config['files']['screenshot_save_path']}")
+                    logger.debug("ConfigManager - 标准化保存路径: %s", self.config['files']['screenshot_save_path'])
             
             # 保存到文件
             config_path = self.get_user_config_path()
-            print(f"ConfigManager - 准备保存到: {config_path}")
+            logger.debug("ConfigManager - 准备保存到: %s", config_path)
             
             # 确保目录存在
             config_dir = os.path.dirname(config_path)
             if not os.path.exists(config_dir):
-                print(f"ConfigManager - 创建配置目录: {config_dir}")
+                logger.debug("ConfigManager - 创建配置目录: %s", config_dir)
                 os.makedirs(config_dir, exist_ok=True)
             
             try:
                 with open(config_path, "w", encoding="utf-8") as f:
                     json.dump(self.config, f, ensure_ascii=False, indent=2)
-                print(f"ConfigManager - 已成功保存用户配置: {config_path}")
+                logger.info("ConfigManager - 已成功保存用户配置: %s", config_path)
                 return True
             except Exception as e:
-                print(f"ConfigManager - 保存用户配置失败: {e}")
+                logger.error("ConfigManager - 保存用户配置失败: %s", e)
                 # 尝试保存到备选位置
                 try:
                     backup_dir = os.path.join(os.path.expanduser("~"), "Desktop")
                     backup_path = os.path.join(backup_dir, "liuhen_config.json")
-                    print(f"ConfigManager - 尝试保存到备选位置: {backup_path}")
+                    logger.warning("ConfigManager - 尝试保存到备选位置: %s", backup_path)
                     with open(backup_path, "w", encoding="utf-8") as f:
                         json.dump(self.config, f, ensure_ascii=False, indent=2)
-                    print(f"ConfigManager - 已保存用户配置到备选位置: {backup_path}")
+                    logger.warning("ConfigManager - 已保存用户配置到备选位置: %s", backup_path)
                     return True
                 except Exception as backup_error:
-                    print(f"ConfigManager - 保存到备选位置也失败: {backup_error}")
+                    logger.error("ConfigManager - 保存到备选位置也失败: %s", backup_error)
                     return False
         except Exception as e:
-            print(f"ConfigManager - 保存配置过程中发生未预期错误: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ConfigManager - 保存配置过程中发生未预期错误: %s", e)
             return False
     
     def get_value(self, section, key, default=None):
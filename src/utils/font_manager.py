@@ -0,0 +1,196 @@
+"""
+字体管理器模块 - 统一解析和缓存标注文字使用的字体
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 候选字体文件（按优先级排列），优先选择支持中文的字体
+CJK_FONT_CANDIDATES = [
+    "msyh.ttc",                    # 微软雅黑 (Windows)
+    "msyh.ttf",
+    "simhei.ttf",                  # 黑体 (Windows)
+    "simsun.ttc",                  # 宋体 (Windows)
+    "PingFang.ttc",                # 苹方 (macOS)
+    "Hiragino Sans GB.ttc",        # 冬青黑体 (macOS)
+    "STHeiti Light.ttc",
+    "NotoSansCJK-Regular.ttc",     # 思源黑体 (Linux)
+    "NotoSansCJKsc-Regular.otf",
+    "NotoSansSC-Regular.otf",
+    "SourceHanSansSC-Regular.otf",
+    "wqy-microhei.ttc",            # 文泉驿 (Linux)
+    "wqy-zenhei.ttc",
+    "DroidSansFallbackFull.ttf",
+]
+
+# 不支持中文时的备选字体
+FALLBACK_FONT_CANDIDATES = [
+    "arial.ttf",
+    "Arial.ttf",
+    "DejaVuSans.ttf",
+    "LiberationSans-Regular.ttf",
+]
+
+# 每个字号缓存的字体对象上限
+FONT_CACHE_SIZE = 16
+
+
+def get_system_font_dirs():
+    """
+    获取当前系统的字体目录列表
+
+    Returns:
+        list: 存在的字体目录路径
+    """
+    dirs = []
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        dirs.append(os.path.join(windir, "Fonts"))
+        local_appdata = os.environ.get("LOCALAPPDATA")
+        if local_appdata:
+            dirs.append(os.path.join(local_appdata, "Microsoft", "Windows", "Fonts"))
+    elif sys.platform == "darwin":
+        dirs.extend([
+            "/System/Library/Fonts",
+            "/System/Library/Fonts/Supplemental",
+            "/Library/Fonts",
+            os.path.expanduser("~/Library/Fonts"),
+        ])
+    else:
+        dirs.extend([
+            "/usr/share/fonts",
+            "/usr/local/share/fonts",
+            os.path.expanduser("~/.fonts"),
+            os.path.expanduser("~/.local/share/fonts"),
+        ])
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+class FontRegistry:
+    """字体注册表类，只解析一次最佳字体路径，并按字号缓存字体对象"""
+
+    _instance = None  # 单例模式实例
+
+    @classmethod
+    def get_instance(cls):
+        """获取FontRegistry单例实例"""
+        if cls._instance is None:
+            cls._instance = FontRegistry()
+        return cls._instance
+
+    def __init__(self, cache_size=FONT_CACHE_SIZE):
+        """初始化字体注册表
+
+        Args:
+            cache_size: 字体对象LRU缓存的容量
+        """
+        self.cache_size = cache_size
+        self._font_path = None
+        self._resolved = False
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _find_font_file(self, candidates):
+        """在系统字体目录中查找候选字体文件
+
+        Args:
+            candidates: 候选字体文件名列表（按优先级排列）
+
+        Returns:
+            str: 找到的字体文件路径，未找到则返回None
+        """
+        wanted = {name.lower(): rank for rank, name in enumerate(candidates)}
+        best_rank = len(candidates)
+        best_path = None
+
+        for font_dir in get_system_font_dirs():
+            # Linux 的字体通常分散在多级子目录中，需要递归查找
+            for root, _dirs, files in os.walk(font_dir):
+                for file_name in files:
+                    rank = wanted.get(file_name.lower())
+                    if rank is not None and rank < best_rank:
+                        best_rank = rank
+                        best_path = os.path.join(root, file_name)
+                        if rank == 0:
+                            return best_path
+        return best_path
+
+    def resolve_font_path(self):
+        """解析最佳可用字体路径（只在第一次调用时搜索）
+
+        Returns:
+            str: 字体文件路径，没有可用字体时返回None
+        """
+        with self._lock:
+            if not self._resolved:
+                self._font_path = (self._find_font_file(CJK_FONT_CANDIDATES)
+                                   or self._find_font_file(FALLBACK_FONT_CANDIDATES))
+                self._resolved = True
+            return self._font_path
+
+    def get_font(self, size):
+        """获取指定字号的字体对象
+
+        Args:
+            size: 字号
+
+        Returns:
+            ImageFont.FreeTypeFont: 字体对象，没有可用字体时返回PIL默认字体
+        """
+        size = int(size)
+        with self._lock:
+            font = self._cache.get(size)
+            if font is not None:
+                self._cache.move_to_end(size)
+                return font
+
+        font_path = self.resolve_font_path()
+        font = None
+        if font_path:
+            try:
+                font = ImageFont.truetype(font_path, size)
+            except (OSError, ValueError) as e:
+                logger.warning("加载字体失败 %s: %s", font_path, e)
+        if font is None:
+            font = ImageFont.load_default()
+
+        with self._lock:
+            self._cache[size] = font
+            self._cache.move_to_end(size)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return font
+
+    def clear_cache(self):
+        """清空字体对象缓存"""
+        with self._lock:
+            self._cache.clear()
+
+
+def get_font(size):
+    """
+    从默认字体注册表获取指定字号的字体
+
+    Args:
+        size: 字号
+
+    Returns:
+        ImageFont.FreeTypeFont: 字体对象
+    """
+    return default_font_registry.get_font(size)
+
+
+# 创建默认实例
+default_font_registry = FontRegistry.get_instance()
@@ -0,0 +1,159 @@
+"""
+日志管理器模块 - 统一配置应用日志，日志通过队列在后台线程写入控制台和滚动日志文件
+"""
+
+import os
+import sys
+import atexit
+import queue
+import logging
+import logging.handlers
+
+from src.config import APP_NAME, APP_VERSION, DATA_DIR, LOG_DIR, SCREENSHOT_DIR, ASSETS_DIR
+
+# 应用日志的根名称，各模块通过 get_logger 获取其子日志器
+LOGGER_NAME = "liuhen"
+LOG_FILE_NAME = "liuhen.log"
+# 单个日志文件大小上限和保留的历史文件数
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+CONSOLE_FORMAT = "[%(levelname)s] %(message)s"
+
+
+def get_logger(name):
+    """
+    获取模块日志器
+
+    Args:
+        name: 模块名（通常传入 __name__），会去掉 "src." 前缀
+
+    Returns:
+        logging.Logger: 应用日志器的子日志器
+    """
+    if name.startswith("src."):
+        name = name[len("src."):]
+    return logging.getLogger(LOGGER_NAME).getChild(name)
+
+
+class LogManager:
+    """日志管理器类
+
+    调用方只把日志记录放入队列（QueueHandler），实际的控制台和文件写入由
+    QueueListener 的后台线程完成，不阻塞界面线程。
+    """
+
+    _instance = None  # 单例模式实例
+
+    @classmethod
+    def get_instance(cls):
+        """获取LogManager单例实例"""
+        if cls._instance is None:
+            cls._instance = LogManager()
+        return cls._instance
+
+    def __init__(self):
+        """初始化日志管理器（此时还未配置输出）"""
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.propagate = False
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = None
+        self.file_handler = None
+        self.debug_mode = False
+        self.save_logs = False
+        self.stream = None
+        self._configured = False
+
+    def setup(self, debug_mode=None, save_logs=None, stream=None):
+        """按配置启用或更新日志输出，可重复调用
+
+        Args:
+            debug_mode: 是否输出调试日志，为None时读取 advanced.debug_mode
+            save_logs: 是否写入日志文件，为None时读取 advanced.save_logs
+            stream: 控制台日志的输出流，为None时沿用上次的设置（默认 sys.stdout）
+        """
+        if debug_mode is None or save_logs is None:
+            from src.utils.config_manager import default_config_manager
+            if debug_mode is None:
+                debug_mode = default_config_manager.get_value("advanced", "debug_mode", False)
+            if save_logs is None:
+                save_logs = default_config_manager.get_value("advanced", "save_logs", True)
+
+        first_setup = not self._configured
+        self._configured = True
+        self.stop()
+        self.debug_mode = bool(debug_mode)
+        self.save_logs = bool(save_logs)
+        if stream is not None:
+            self.stream = stream
+
+        # 默认只输出 INFO 及以上，热点路径上的调试日志不会进入队列
+        level = logging.DEBUG if self.debug_mode else logging.INFO
+        self.logger.setLevel(level)
+
+        handlers = []
+        console_handler = logging.StreamHandler(self.stream or sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        # 控制台只显示警告及以上，调试模式下显示全部
+        console_handler.setLevel(logging.DEBUG if self.debug_mode else logging.WARNING)
+        handlers.append(console_handler)
+
+        self.file_handler = None
+        file_error = None
+        if self.save_logs:
+            try:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                self.file_handler = logging.handlers.RotatingFileHandler(
+                    os.path.join(LOG_DIR, LOG_FILE_NAME),
+                    maxBytes=LOG_MAX_BYTES,
+                    backupCount=LOG_BACKUP_COUNT,
+                    encoding="utf-8",
+                    delay=True
+                )
+                self.file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+                handlers.append(self.file_handler)
+            except OSError as e:
+                file_error = e
+
+        if self.queue_handler not in self.logger.handlers:
+            self.logger.addHandler(self.queue_handler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+        if file_error is not None:
+            self.logger.warning("无法创建日志文件，日志只输出到控制台: %s", file_error)
+
+        if first_setup:
+            atexit.register(self.stop)
+            self.logger.info("%s v%s 启动", APP_NAME, APP_VERSION)
+            self.logger.debug("数据目录: %s", DATA_DIR)
+            self.logger.debug("日志目录: %s", LOG_DIR)
+            self.logger.debug("截图目录: %s", SCREENSHOT_DIR)
+            self.logger.debug("资源目录: %s", ASSETS_DIR)
+
+    def stop(self):
+        """停止后台写入线程，并写完队列中剩余的日志"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        if self.file_handler is not None:
+            self.file_handler.close()
+            self.file_handler = None
+
+
+def setup_logging(debug_mode=None, save_logs=None, stream=None):
+    """
+    按配置启用或更新应用日志
+
+    Args:
+        debug_mode: 是否输出调试日志，为None时读取配置
+        save_logs: 是否写入日志文件，为None时读取配置
+        stream: 控制台日志的输出流，默认 sys.stdout
+    """
+    default_log_manager.setup(debug_mode, save_logs, stream)
+
+
+# 创建默认实例
+default_log_manager = LogManager.get_instance()
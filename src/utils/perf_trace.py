@@ -0,0 +1,250 @@
+"""
+性能追踪模块 - 记录关键操作的耗时，在内存中保留滚动分位数，并可导出为 Chrome trace JSON
+
+用法:
+    with trace("screenshot.save"):
+        ...
+
+    @traced("editor.apply_mosaic")
+    def apply_mosaic(...):
+        ...
+
+导出的文件可以在 chrome://tracing 或 https://ui.perfetto.dev 中打开。
+"""
+
+import os
+import json
+import math
+import time
+import threading
+import functools
+from collections import deque
+from typing import Dict, List
+
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 每个操作保留的最近样本数，分位数基于这些样本计算
+SAMPLE_WINDOW = 512
+# 内存中保留的追踪事件数（用于导出），超出后丢弃最早的事件
+MAX_EVENTS = 20000
+# 统计表中显示的分位数
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values, pct):
+    """
+    计算已排序样本的分位数（最近秩法）
+
+    Args:
+        sorted_values: 升序排列的样本
+        pct: 分位数（0-100）
+
+    Returns:
+        float: 分位数值，没有样本时返回0
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _Span:
+    """一次计时，可作为上下文管理器使用"""
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        if self.tracer.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.start is not None:
+            self.tracer.record(self.name, self.start, time.perf_counter() - self.start,
+                               self.category, self.args)
+        return False
+
+
+class PerfTracer:
+    """性能追踪器类
+
+    每个操作名对应一个固定长度的耗时样本队列，同时把每次计时作为完整事件
+    （Chrome trace 的 "X" 事件）放入有上限的事件队列。所有方法都可以在工作线程中调用。
+    """
+
+    _instance = None  # 单例模式实例
+
+    @classmethod
+    def get_instance(cls):
+        """获取PerfTracer单例实例"""
+        if cls._instance is None:
+            cls._instance = PerfTracer()
+        return cls._instance
+
+    def __init__(self):
+        """初始化追踪器（默认关闭，由配置 advanced.perf_trace 或命令行 -v 开启）"""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._totals: Dict[str, float] = {}
+        self._events = deque(maxlen=MAX_EVENTS)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._thread_names: Dict[int, str] = {}
+
+    def span(self, name, category="app", **args):
+        """
+        创建计时上下文
+
+        Args:
+            name: 操作名，建议使用 "模块.操作" 形式
+            category: 事件分类，显示在追踪查看器中
+            **args: 附加到事件上的参数
+
+        Returns:
+            上下文管理器
+        """
+        return _Span(self, name, category, args or None)
+
+    def traced(self, name=None, category="app"):
+        """
+        函数计时装饰器
+
+        Args:
+            name: 操作名，默认使用函数的限定名
+            category: 事件分类
+
+        Returns:
+            装饰器
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(span_name, start, time.perf_counter() - start, category)
+            return wrapper
+        return decorator
+
+    def record(self, name, start, duration, category="app", args=None):
+        """
+        记录一次计时
+
+        Args:
+            name: 操作名
+            start: 开始时间（time.perf_counter）
+            duration: 耗时（秒）
+            category: 事件分类
+            args: 附加参数字典
+        """
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": self._pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=SAMPLE_WINDOW)
+                self._counts[name] = 0
+                self._totals[name] = 0.0
+            samples.append(duration)
+            self._counts[name] += 1
+            self._totals[name] += duration
+            self._events.append(event)
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    def stats(self) -> List[dict]:
+        """
+        获取各操作的统计信息（毫秒）
+
+        Returns:
+            list: 按操作名排序的字典列表，包含 name、count、mean、last、max 和各分位数
+        """
+        with self._lock:
+            snapshot = [(name, list(samples), self._counts[name], self._totals[name])
+                        for name, samples in self._samples.items()]
+
+        result = []
+        for name, samples, count, total in sorted(snapshot):
+            ordered = sorted(samples)
+            item = {
+                "name": name,
+                "count": count,
+                "mean": total / count * 1000 if count else 0.0,
+                "last": samples[-1] * 1000 if samples else 0.0,
+                "max": ordered[-1] * 1000 if ordered else 0.0,
+            }
+            for pct in PERCENTILES:
+                item[f"p{pct}"] = percentile(ordered, pct) * 1000
+            result.append(item)
+        return result
+
+    def reset(self) -> None:
+        """清空所有样本和事件"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+            self._events.clear()
+
+    def export_chrome_trace(self, path) -> int:
+        """
+        把内存中的事件导出为 Chrome trace JSON 文件
+
+        Args:
+            path: 输出文件路径
+
+        Returns:
+            int: 导出的事件数
+        """
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+
+        # 线程名元数据事件，让查看器显示 MainThread 等名称而不是线程ID
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": tname}}
+            for tid, tname in thread_names.items()
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        logger.info("已导出 %s 个追踪事件到 %s", len(events), path)
+        return len(events)
+
+
+# 创建默认实例
+default_tracer = PerfTracer.get_instance()
+
+
+def trace(name, category="app", **args):
+    """使用默认追踪器创建计时上下文，参见 PerfTracer.span"""
+    return default_tracer.span(name, category, **args)
+
+
+def traced(name=None, category="app"):
+    """使用默认追踪器的函数计时装饰器，参见 PerfTracer.traced"""
+    return default_tracer.traced(name, category)
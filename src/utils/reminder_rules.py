@@ -0,0 +1,251 @@
+"""
+提醒规则模块 - 支持按星期、多个时间点、工作时段和节假日的周期性提醒规则
+"""
+
+import bisect
+import datetime
+from typing import Iterable, List, Optional
+
+from src.utils.time_utils import parse_time_string
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 规则类型
+RULE_DAILY = "daily"        # 每天的若干固定时间点
+RULE_INTERVAL = "interval"  # 工作时段内按固定间隔
+
+# 查找下一次触发时间时最多向后检查的天数
+MAX_LOOKAHEAD_DAYS = 400
+
+WEEKDAY_NAMES = ["一", "二", "三", "四", "五", "六", "日"]
+ALL_WEEKDAYS = [0, 1, 2, 3, 4, 5, 6]
+WORKDAYS = [0, 1, 2, 3, 4]
+
+
+def parse_minutes(time_str):
+    """
+    把 HH:MM 格式的时间转换为当天的分钟数
+
+    Args:
+        time_str: 时间字符串
+
+    Returns:
+        int: 从0点起的分钟数，格式无效时返回None
+    """
+    result = parse_time_string(time_str)
+    if not result:
+        return None
+    return result[0] * 60 + result[1]
+
+
+def parse_date_list(values):
+    """
+    解析日期列表（YYYY-MM-DD），忽略无效项
+
+    Args:
+        values: 日期字符串列表，或以逗号/空白分隔的字符串
+
+    Returns:
+        set: datetime.date 集合
+    """
+    if isinstance(values, str):
+        values = values.replace("，", ",").replace(",", " ").split()
+    dates = set()
+    for value in values or []:
+        try:
+            dates.add(datetime.datetime.strptime(value.strip(), "%Y-%m-%d").date())
+        except (ValueError, AttributeError):
+            logger.warning("忽略无效日期: %s", value)
+    return dates
+
+
+def format_weekdays(weekdays):
+    """
+    格式化星期列表用于显示
+
+    Args:
+        weekdays: 星期序号列表 (0=周一)
+
+    Returns:
+        str: 例如 "周一至周五"、"每天"、"周一,三,五"
+    """
+    days = sorted(set(weekdays))
+    if days == ALL_WEEKDAYS:
+        return "每天"
+    if days == WORKDAYS:
+        return "周一至周五"
+    return "周" + ",".join(WEEKDAY_NAMES[d] for d in days)
+
+
+class ReminderRule:
+    """提醒规则类
+
+    daily 规则在允许的日期按 times 中的时间点触发；
+    interval 规则在允许日期的工作时段内每隔 interval_minutes 分钟触发，从时段开始时间对齐：
+    开始时间本身不触发，间隔正好落在结束时间时触发，即触发时间在 (start, end] 内。
+    """
+
+    def __init__(self, name="提醒", kind=RULE_DAILY, times=None, interval_minutes=25,
+                 start="09:00", end="18:00", weekdays=None, skip_holidays=True,
+                 message="", enabled=True):
+        """初始化提醒规则
+
+        Args:
+            name: 规则名称
+            kind: 规则类型 (daily / interval)
+            times: daily 规则的触发时间列表 ["HH:MM", ...]
+            interval_minutes: interval 规则的间隔分钟数
+            start: interval 规则的工作时段开始时间
+            end: interval 规则的工作时段结束时间
+            weekdays: 允许触发的星期（0=周一），为None时表示每天
+            skip_holidays: 是否跳过节假日
+            message: 提醒消息
+            enabled: 是否启用
+        """
+        self.name = name
+        self.kind = kind if kind in (RULE_DAILY, RULE_INTERVAL) else RULE_DAILY
+        self.times = list(times or [])
+        self.interval_minutes = max(1, int(interval_minutes))
+        self.start = start
+        self.end = end
+        self.weekdays = sorted(set(ALL_WEEKDAYS if weekdays is None else weekdays))
+        self.skip_holidays = skip_holidays
+        self.message = message
+        self.enabled = enabled
+
+        # 预先计算每天的触发分钟数（已排序），查找时只需二分
+        self._day_minutes = self._build_day_minutes()
+        self._weekday_mask = [d in self.weekdays for d in range(7)]
+
+    def _build_day_minutes(self) -> List[int]:
+        """计算一天内所有触发时间点（分钟数，升序）"""
+        if self.kind == RULE_DAILY:
+            minutes = {parse_minutes(t) for t in self.times}
+            minutes.discard(None)
+            return sorted(minutes)
+
+        start = parse_minutes(self.start)
+        end = parse_minutes(self.end)
+        if start is None or end is None or end <= start:
+            return []
+        # 时段开始后第一个间隔才提醒，包括正好落在结束时间的一次
+        return list(range(start + self.interval_minutes, end + 1, self.interval_minutes))
+
+    @classmethod
+    def from_dict(cls, data):
+        """从配置字典创建规则
+
+        Args:
+            data: 规则配置字典
+
+        Returns:
+            ReminderRule: 规则实例
+        """
+        return cls(
+            name=data.get("name", "提醒"),
+            kind=data.get("kind", RULE_DAILY),
+            times=data.get("times", []),
+            interval_minutes=data.get("interval_minutes", 25),
+            start=data.get("start", "09:00"),
+            end=data.get("end", "18:00"),
+            weekdays=data.get("weekdays"),
+            skip_holidays=data.get("skip_holidays", True),
+            message=data.get("message", ""),
+            enabled=data.get("enabled", True),
+        )
+
+    def to_dict(self):
+        """转换为可保存到配置文件的字典"""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "times": self.times,
+            "interval_minutes": self.interval_minutes,
+            "start": self.start,
+            "end": self.end,
+            "weekdays": self.weekdays,
+            "skip_holidays": self.skip_holidays,
+            "message": self.message,
+            "enabled": self.enabled,
+        }
+
+    def describe(self):
+        """生成规则的简短描述，用于列表显示"""
+        days = format_weekdays(self.weekdays)
+        if self.kind == RULE_DAILY:
+            return f"{days} {', '.join(self.times)}"
+        return f"{days} {self.start}-{self.end} 每{self.interval_minutes}分钟"
+
+    def is_active_day(self, day: datetime.date, holidays=frozenset()) -> bool:
+        """判断某天是否允许触发
+
+        Args:
+            day: 日期
+            holidays: 节假日集合
+
+        Returns:
+            bool: 是否允许触发
+        """
+        if not self._weekday_mask[day.weekday()]:
+            return False
+        return not (self.skip_holidays and day in holidays)
+
+    def next_fire(self, after: datetime.datetime, holidays=frozenset()) -> Optional[datetime.datetime]:
+        """计算严格晚于 after 的下一次触发时间
+
+        Args:
+            after: 起始时间
+            holidays: 节假日集合
+
+        Returns:
+            datetime: 下一次触发时间，规则无效或已禁用时返回None
+        """
+        if not self.enabled or not self._day_minutes or not any(self._weekday_mask):
+            return None
+
+        day = after.date()
+        # 当天只查找晚于当前分钟的时间点，之后的日期从第一个时间点开始
+        current_minute = after.hour * 60 + after.minute
+        index = bisect.bisect_right(self._day_minutes, current_minute)
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if index < len(self._day_minutes) and self.is_active_day(day, holidays):
+                minute = self._day_minutes[index]
+                return datetime.datetime.combine(day, datetime.time(minute // 60, minute % 60))
+            day += datetime.timedelta(days=1)
+            index = 0
+        return None
+
+
+class ReminderRuleSet:
+    """提醒规则集合，统一加载规则和节假日；每条规则由调度器按 next_fire 各自安排，最近的触发由调度器的堆决定"""
+
+    def __init__(self, rules: Iterable[ReminderRule] = (), holidays=()):
+        """初始化规则集合
+
+        Args:
+            rules: 规则列表
+            holidays: 节假日（日期集合或日期字符串列表）
+        """
+        self.rules = list(rules)
+        self.holidays = frozenset(holidays if isinstance(holidays, (set, frozenset)) else parse_date_list(holidays))
+
+    @classmethod
+    def from_config(cls, config_manager=None):
+        """从配置管理器加载规则集合
+
+        Args:
+            config_manager: 配置管理器，默认使用 default_config_manager
+
+        Returns:
+            ReminderRuleSet: 规则集合
+        """
+        if config_manager is None:
+            from src.utils.config_manager import default_config_manager
+            config_manager = default_config_manager
+        rules = [ReminderRule.from_dict(d) for d in config_manager.get_value("reminder", "rules", []) or []]
+        return cls(rules, config_manager.get_value("reminder", "holidays", []))
+
+    def next_fire(self, rule: ReminderRule, after: datetime.datetime) -> Optional[datetime.datetime]:
+        """计算单条规则的下一次触发时间（应用本集合的节假日）"""
+        return rule.next_fire(after, self.holidays)
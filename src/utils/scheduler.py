@@ -0,0 +1,377 @@
+"""
+定时调度模块 - 基于最小堆的定时器队列，由单个 Tk after 回调驱动
+"""
+
+import datetime
+import heapq
+import itertools
+from typing import Callable, Optional
+
+from src.utils.time_utils import get_clock
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+# 有定时器时 after 最长等待的秒数，到点后检查一次系统时间是否跳变（休眠恢复、手动改时）
+MAX_SLEEP_SECONDS = 60
+# 墙上时间与单调时间的偏差超过该秒数时视为时间跳变
+CLOCK_JUMP_THRESHOLD = 5
+# 定时器延迟超过该秒数才算错过（正常的调度抖动不算）
+MISFIRE_GRACE_SECONDS = 60
+# catch_up 策略下最多补发的次数
+MAX_CATCH_UP_FIRES = 10
+# 已取消的定时器超过该数量且占一半以上时压缩堆
+COMPACT_THRESHOLD = 64
+
+# 错过触发时间（休眠、时间跳变）后的处理策略
+MISSED_FIRE_ONCE = "fire_once"  # 只补发一次
+MISSED_SKIP = "skip"            # 不补发，直接安排下一次
+MISSED_CATCH_UP = "catch_up"    # 逐次补发错过的每一次（有上限）
+MISSED_POLICIES = (MISSED_FIRE_ONCE, MISSED_SKIP, MISSED_CATCH_UP)
+
+
+class TimerHandle:
+    """定时器句柄，可用于取消尚未触发的定时器
+
+    when 是墙上时间戳，用于显示和按日历时间触发；deadline 是单调时间，用于实际等待。
+    """
+
+    __slots__ = ("when", "deadline", "wall_anchored", "callback", "args",
+                 "next_fire", "interval", "policy", "cancelled", "_in_heap", "_scheduler")
+
+    def __init__(self, scheduler: "TimerScheduler", callback: Callable, args: tuple,
+                 wall_anchored: bool, next_fire=None, interval=None, policy=None):
+        """初始化定时器句柄
+
+        Args:
+            scheduler: 所属调度器
+            callback: 回调函数
+            args: 回调参数
+            wall_anchored: 是否按墙上时间触发（否则按单调时间间隔）
+            next_fire: 周期定时器计算下一次触发时间的函数 (datetime) -> datetime
+            interval: 固定间隔周期定时器的间隔秒数
+            policy: 错过触发时间后的处理策略，为None时使用调度器默认策略
+        """
+        self.when = 0.0
+        self.deadline = 0.0
+        self.wall_anchored = wall_anchored
+        self.callback = callback
+        self.args = args
+        self.next_fire = next_fire
+        self.interval = interval
+        self.policy = policy
+        self.cancelled = False
+        self._in_heap = False
+        self._scheduler = scheduler
+
+    @property
+    def recurring(self) -> bool:
+        """是否为周期定时器"""
+        return self.next_fire is not None or self.interval is not None
+
+    @property
+    def due_datetime(self) -> datetime.datetime:
+        """下一次触发时间对应的datetime对象"""
+        return datetime.datetime.fromtimestamp(self.when)
+
+    def cancel(self) -> None:
+        """取消定时器（重复取消无副作用）"""
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._on_cancelled(self)
+
+
+class TimerScheduler:
+    """定时调度器类
+
+    所有定时器按单调时间的截止点放入最小堆，只在最早的截止点注册一个 after 回调，
+    不需要额外线程。每次唤醒时比较墙上时间和单调时间的流逝量，发现休眠或改时后
+    重新计算按日历触发的定时器，并按错过策略处理。所有方法都应在Tk主线程中调用。
+    """
+
+    def __init__(self, root, clock=None, policy=MISSED_FIRE_ONCE):
+        """初始化调度器
+
+        Args:
+            root: Tk根窗口（或任何提供 after/after_cancel 的控件）
+            clock: 时钟对象，默认使用 time_utils 中的当前时钟
+            policy: 周期定时器错过触发时间后的默认处理策略
+        """
+        self.root = root
+        self.clock = clock or get_clock()
+        self.policy = policy if policy in MISSED_POLICIES else MISSED_FIRE_ONCE
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled_count = 0
+        self._after_id = None
+        self._after_deadline = None
+        # 上次检查时的 (墙上时间, 单调时间)，用于检测时间跳变
+        self._last_check = (self.clock.time(), self.clock.monotonic())
+
+    def call_at(self, when, callback: Callable, *args) -> TimerHandle:
+        """在指定的墙上时间调用一次回调
+
+        Args:
+            when: datetime对象或墙上时间戳
+            callback: 回调函数
+            *args: 回调参数
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        handle = TimerHandle(self, callback, args, wall_anchored=True)
+        self._set_when(handle, when)
+        self._push(handle)
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """在指定秒数后调用一次回调（按单调时间计算，不受改时影响）
+
+        Args:
+            delay: 延迟秒数
+            callback: 回调函数
+            *args: 回调参数
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        handle = TimerHandle(self, callback, args, wall_anchored=False)
+        self._set_delay(handle, delay)
+        self._push(handle)
+        return handle
+
+    def call_every(self, interval: float, callback: Callable, *args, policy=None) -> TimerHandle:
+        """每隔固定秒数调用回调（按单调时间计算）
+
+        Args:
+            interval: 间隔秒数
+            callback: 回调函数
+            *args: 回调参数
+            policy: 错过触发时间后的处理策略
+
+        Returns:
+            TimerHandle: 定时器句柄，取消后不再触发
+        """
+        handle = TimerHandle(self, callback, args, wall_anchored=False,
+                             interval=max(1.0, float(interval)), policy=policy)
+        self._set_delay(handle, handle.interval)
+        self._push(handle)
+        return handle
+
+    def call_recurring(self, next_fire: Callable, callback: Callable, *args, policy=None) -> TimerHandle:
+        """按日历规则周期调用回调
+
+        Args:
+            next_fire: 函数 (after: datetime) -> datetime，返回严格晚于 after 的下一次触发时间，
+                       返回None表示不再触发
+            callback: 回调函数
+            *args: 回调参数
+            policy: 错过触发时间后的处理策略
+
+        Returns:
+            TimerHandle: 定时器句柄，取消后不再触发
+        """
+        handle = TimerHandle(self, callback, args, wall_anchored=True, next_fire=next_fire, policy=policy)
+        when = next_fire(self.clock.now())
+        if when is None:
+            handle.cancelled = True
+            return handle
+        self._set_when(handle, when)
+        self._push(handle)
+        return handle
+
+    def cancel(self, handle: Optional[TimerHandle]) -> None:
+        """取消定时器，handle为None时忽略
+
+        Args:
+            handle: 定时器句柄
+        """
+        if handle is not None:
+            handle.cancel()
+
+    def pending_count(self) -> int:
+        """获取尚未触发且未取消的定时器数量"""
+        return len(self._heap) - self._cancelled_count
+
+    def next_deadline(self) -> Optional[float]:
+        """获取最早的有效截止点（单调时间），没有定时器时返回None"""
+        self._drop_cancelled_head()
+        return self._heap[0][0] if self._heap else None
+
+    def shutdown(self) -> None:
+        """取消所有定时器并注销 after 回调"""
+        for _deadline, _seq, handle in self._heap:
+            handle.cancelled = True
+            handle._in_heap = False
+        self._heap.clear()
+        self._cancelled_count = 0
+        self._cancel_after()
+
+    def _set_when(self, handle: TimerHandle, when) -> None:
+        """按墙上时间设置触发时间，并换算为单调时间截止点"""
+        if isinstance(when, datetime.datetime):
+            when = when.timestamp()
+        handle.when = float(when)
+        handle.deadline = self.clock.monotonic() + (handle.when - self.clock.time())
+
+    def _set_delay(self, handle: TimerHandle, delay: float) -> None:
+        """按相对秒数设置触发时间"""
+        delay = max(0.0, delay)
+        handle.deadline = self.clock.monotonic() + delay
+        handle.when = self.clock.time() + delay
+
+    def _push(self, handle: TimerHandle) -> None:
+        """把定时器放入堆中并更新 after 回调"""
+        # 计数器保证截止点相同的定时器按加入顺序执行
+        heapq.heappush(self._heap, (handle.deadline, next(self._counter), handle))
+        handle._in_heap = True
+        self._reschedule()
+
+    def _on_cancelled(self, handle: TimerHandle) -> None:
+        """定时器被取消时的处理（惰性删除）"""
+        if not handle._in_heap:
+            return
+        self._cancelled_count += 1
+        if self._cancelled_count > COMPACT_THRESHOLD and self._cancelled_count * 2 > len(self._heap):
+            self._rebuild_heap()
+        self._reschedule()
+
+    def _rebuild_heap(self) -> None:
+        """去掉已取消的定时器并按当前截止点重建堆"""
+        for _deadline, _seq, handle in self._heap:
+            if handle.cancelled:
+                handle._in_heap = False
+        self._heap = [(h.deadline, seq, h) for _d, seq, h in self._heap if not h.cancelled]
+        heapq.heapify(self._heap)
+        self._cancelled_count = 0
+
+    def _drop_cancelled_head(self) -> None:
+        """弹出堆顶已取消的定时器"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)[2]._in_heap = False
+            self._cancelled_count -= 1
+
+    def _cancel_after(self) -> None:
+        """注销当前的 after 回调"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+            self._after_deadline = None
+
+    def _reschedule(self) -> None:
+        """按最早的截止点重新注册 after 回调（最长等待 MAX_SLEEP_SECONDS）"""
+        deadline = self.next_deadline()
+        if deadline is None:
+            self._cancel_after()
+            return
+        wake_at = min(deadline, self.clock.monotonic() + MAX_SLEEP_SECONDS)
+        if self._after_id is not None and self._after_deadline is not None and self._after_deadline <= wake_at:
+            return
+        self._cancel_after()
+        delay_ms = int(max(0.0, wake_at - self.clock.monotonic()) * 1000)
+        self._after_deadline = wake_at
+        self._after_id = self.root.after(delay_ms, self._run)
+
+    def check_clock_jump(self) -> float:
+        """检查自上次检查以来墙上时间是否发生跳变
+
+        发生跳变时（休眠恢复或手动改时）按墙上时间重新计算日历定时器的截止点。
+
+        Returns:
+            float: 墙上时间相对单调时间多走的秒数，未检测到跳变时返回0
+        """
+        wall, mono = self.clock.time(), self.clock.monotonic()
+        last_wall, last_mono = self._last_check
+        self._last_check = (wall, mono)
+        skew = (wall - last_wall) - (mono - last_mono)
+        if abs(skew) < CLOCK_JUMP_THRESHOLD:
+            return 0.0
+
+        logger.info("检测到系统时间跳变 %+.0f 秒，重新计算定时器", skew)
+        for _deadline, _seq, handle in self._heap:
+            if handle.wall_anchored:
+                handle.deadline = mono + (handle.when - wall)
+            else:
+                # 按间隔计时的定时器截止点不变，只更新显示用的墙上时间
+                handle.when = wall + (handle.deadline - mono)
+        self._rebuild_heap()
+        return skew
+
+    def _run(self) -> None:
+        """after 回调：检查时间跳变并执行所有已到期的定时器"""
+        self._after_id = None
+        self._after_deadline = None
+        self.check_clock_jump()
+
+        now_mono = self.clock.monotonic()
+        while True:
+            self._drop_cancelled_head()
+            if not self._heap or self._heap[0][0] > now_mono:
+                break
+            _deadline, _seq, handle = heapq.heappop(self._heap)
+            handle._in_heap = False
+            self._dispatch(handle, now_mono - handle.deadline)
+        self._reschedule()
+
+    def _dispatch(self, handle: TimerHandle, lateness: float) -> None:
+        """执行到期的定时器，并按错过策略安排周期定时器的下一次触发
+
+        Args:
+            handle: 到期的定时器
+            lateness: 相对截止点延迟的秒数
+        """
+        if not handle.recurring:
+            # 一次性定时器即使错过也补发一次
+            handle.cancelled = True
+            self._invoke(handle)
+            return
+
+        fires = 1
+        if lateness > MISFIRE_GRACE_SECONDS:
+            policy = handle.policy or self.policy
+            if policy == MISSED_SKIP:
+                fires = 0
+            elif policy == MISSED_CATCH_UP:
+                fires = self._count_missed(handle)
+            logger.info("定时任务错过 %.0f 秒，按 %s 策略补发 %s 次", lateness, policy, fires)
+
+        for _ in range(fires):
+            self._invoke(handle)
+            if handle.cancelled:
+                return
+
+        # 从当前时间起安排下一次，错过的部分已按策略处理
+        if handle.interval is not None:
+            self._set_delay(handle, handle.interval)
+        else:
+            when = handle.next_fire(self.clock.now())
+            if when is None:
+                handle.cancelled = True
+                return
+            self._set_when(handle, when)
+        heapq.heappush(self._heap, (handle.deadline, next(self._counter), handle))
+        handle._in_heap = True
+
+    def _count_missed(self, handle: TimerHandle) -> int:
+        """计算周期定时器错过的触发次数（不超过 MAX_CATCH_UP_FIRES）"""
+        if handle.interval is not None:
+            missed = int((self.clock.monotonic() - handle.deadline) // handle.interval) + 1
+            return min(missed, MAX_CATCH_UP_FIRES)
+
+        now = self.clock.now()
+        count = 0
+        when = handle.due_datetime
+        while when is not None and when <= now and count < MAX_CATCH_UP_FIRES:
+            count += 1
+            when = handle.next_fire(when)
+        return max(1, count)
+
+    def _invoke(self, handle: TimerHandle) -> None:
+        """调用定时器回调，捕获异常避免中断调度"""
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            logger.exception("定时任务执行失败: %s", e)
@@ -15,6 +15,9 @@ from src.config import (
     DARK_COLOR_DANGER, DARK_COLOR_NEUTRAL, DARK_COLOR_BACKGROUND, 
     DARK_COLOR_PREVIEW_BG
 )
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
 
 class ThemeManager:
     """
@@ -163,7 +166,7 @@ class ThemeManager:
                 if hasattr(window, '_update_theme'):
                     window._update_theme(self.is_dark_mode)
             except Exception as e:
-                print(f"更新窗口主题失败: {e}")
+                logger.warning("更新窗口主题失败: %s", e)
                 # 如果窗口已不存在，加入待删除列表
                 windows_to_remove.append(window)
         
@@ -196,10 +199,10 @@ class ThemeManager:
                     "last_updated": datetime.datetime.now().isoformat()
                 }, f, ensure_ascii=False, indent=2)
                 
-            print(f"主题设置已保存到: {config_path}")
+            logger.debug("主题设置已保存到: %s", config_path)
             return True
         except Exception as e:
-            print(f"保存主题设置失败: {e}")
+            logger.error("保存主题设置失败: %s", e)
             return False
     
     def load_theme_settings(self):
@@ -208,7 +211,7 @@ class ThemeManager:
             config_path = self.get_config_path()
             
             if not os.path.exists(config_path):
-                print("没有找到主题配置文件，使用默认主题")
+                logger.info("没有找到主题配置文件，使用默认主题")
                 # 尝试检测系统主题
                 self.is_dark_mode = self.detect_system_theme()
                 return False
@@ -217,10 +220,10 @@ class ThemeManager:
                 config = json.load(f)
                 self.is_dark_mode = config.get("is_dark_mode", False)
                 
-            print(f"已加载主题设置，当前使用{'深色' if self.is_dark_mode else '浅色'}主题")
+            logger.info("已加载主题设置，当前使用%s主题", '深色' if self.is_dark_mode else '浅色')
             return True
         except Exception as e:
-            print(f"加载主题设置失败: {e}")
+            logger.error("加载主题设置失败: %s", e)
             # 出错时默认使用浅色主题
             self.is_dark_mode = False
             return False
@@ -242,7 +245,7 @@ class ThemeManager:
                     value, _ = winreg.QueryValueEx(key, "AppsUseLightTheme")
                     return value == 0  # 0表示使用深色主题
                 except Exception as e:
-                    print(f"检测Windows主题失败: {e}")
+                    logger.debug("检测Windows主题失败: %s", e)
                     return False
                 
             # macOS系统
@@ -256,7 +259,7 @@ class ThemeManager:
                     )
                     return result.stdout.strip() == 'Dark'
                 except Exception as e:
-                    print(f"检测macOS主题失败: {e}")
+                    logger.debug("检测macOS主题失败: %s", e)
                     return False
                 
             # Linux系统 (GNOME)
@@ -270,10 +273,10 @@ class ThemeManager:
                     )
                     return 'dark' in result.stdout.lower()
                 except Exception as e:
-                    print(f"检测Linux主题失败: {e}")
+                    logger.debug("检测Linux主题失败: %s", e)
                     return False
         except Exception as e:
-            print(f"检测系统主题失败: {e}")
+            logger.debug("检测系统主题失败: %s", e)
         
         # 默认返回浅色主题
         return False
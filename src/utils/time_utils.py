@@ -7,6 +7,86 @@ import time
 from src.config import TIME_FORMAT, INTERVAL_REMINDER_MINUTES
 
 
+class SystemClock:
+    """系统时钟，提供墙上时间和单调时间"""
+    
+    def now(self):
+        """当前本地时间 (datetime)"""
+        return datetime.datetime.now()
+    
+    def time(self):
+        """当前墙上时间戳（秒），会受系统改时和休眠影响"""
+        return time.time()
+    
+    def monotonic(self):
+        """单调时间（秒），只用于计算时间间隔"""
+        return time.monotonic()
+
+
+class FakeClock:
+    """可手动推进的假时钟，用于模拟休眠恢复和系统改时"""
+    
+    def __init__(self, start=None):
+        """初始化假时钟
+        
+        Args:
+            start: 初始本地时间 (datetime)，默认为当前时间
+        """
+        start = start or datetime.datetime.now()
+        self._wall = start.timestamp()
+        self._mono = 1000.0
+    
+    def now(self):
+        """当前本地时间 (datetime)"""
+        return datetime.datetime.fromtimestamp(self._wall)
+    
+    def time(self):
+        """当前墙上时间戳（秒）"""
+        return self._wall
+    
+    def monotonic(self):
+        """单调时间（秒）"""
+        return self._mono
+    
+    def advance(self, seconds):
+        """正常流逝指定秒数（墙上时间和单调时间同时前进）"""
+        self._wall += seconds
+        self._mono += seconds
+    
+    def suspend(self, seconds):
+        """模拟系统休眠指定秒数（墙上时间前进，单调时间不变）"""
+        self._wall += seconds
+    
+    def jump(self, seconds):
+        """模拟系统改时（只调整墙上时间，可为负数）"""
+        self._wall += seconds
+
+
+# 当前使用的时钟，可通过 set_clock 替换为 FakeClock
+_clock = SystemClock()
+
+
+def get_clock():
+    """
+    获取当前时钟
+    
+    Returns:
+        SystemClock 或 FakeClock: 时钟对象
+    """
+    return _clock
+
+
+def set_clock(clock=None):
+    """
+    替换当前时钟
+    
+    Args:
+        clock: 时钟对象，为None时恢复系统时钟
+    """
+    global _clock
+    _clock = clock or SystemClock()
+
+
 def get_current_time_str():
     """
     获取当前时间的格式化字符串
@@ -14,7 +94,7 @@ def get_current_time_str():
     Returns:
         str: 格式化的时间字符串
     """
-    return datetime.datetime.now().strftime(TIME_FORMAT)
+    return _clock.now().strftime(TIME_FORMAT)
 
 
 def format_timestamp(timestamp, format_str=TIME_FORMAT):
@@ -58,18 +138,19 @@ def parse_time_string(time_str):
     return None
 
 
-def calculate_next_reminder_time(hours, minutes):
+def calculate_next_reminder_time(hours, minutes, after=None):
     """
     计算下一次提醒的时间
     
     Args:
         hours: 小时 (0-23)
         minutes: 分钟 (0-59)
+        after: 从该时间之后计算，默认为当前时间
         
     Returns:
         datetime: 下一次提醒的时间
     """
-    now = datetime.datetime.now()
+    now = after or _clock.now()
     target_time = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
     
     # 如果目标时间已经过去，则设置为明天的这个时间
@@ -86,7 +167,7 @@ def calculate_next_interval_reminder():
     Returns:
         datetime: 下一次间隔提醒的时间
     """
-    now = datetime.datetime.now()
+    now = _clock.now()
     # 添加指定的分钟数
     target_time = now + datetime.timedelta(minutes=INTERVAL_REMINDER_MINUTES)
     return target_time
@@ -102,7 +183,7 @@ def time_until_next_reminder(next_reminder_time):
     Returns:
         int: 距离下一次提醒的秒数
     """
-    now = datetime.datetime.now()
+    now = _clock.now()
     time_delta = next_reminder_time - now
     return time_delta.total_seconds()
 
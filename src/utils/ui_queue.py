@@ -0,0 +1,101 @@
+"""
+后台任务事件队列 - 工作线程只往队列里放事件，由界面线程定时取出处理
+
+Tk 不是线程安全的：工作线程里连 winfo_exists() / after() 都不能调用。
+后台任务（导出、扫描、迁移等）的进度和完成回调应只调用 post()，
+界面线程在任务运行期间用 after 轮询队列并分发给对应的处理函数。
+"""
+
+import queue
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+
+class UIEventQueue:
+    """工作线程 -> 界面线程的事件队列
+
+    用法：界面线程注册处理函数后在启动任务前调用 start()，任务回调中调用
+    post(kind, payload)，完成事件的处理函数里调用 finish()。没有运行中的任务时停止轮询。
+    """
+
+    def __init__(self, widget, interval_ms: int = 100):
+        """初始化事件队列
+
+        Args:
+            widget: 用于注册 after 回调的 Tk 控件
+            interval_ms: 轮询间隔（毫秒）
+        """
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self._events = queue.SimpleQueue()
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+        self._jobs = 0
+        self._after_id: Optional[str] = None
+
+    def on(self, kind: str, handler: Callable[[Any], None]) -> None:
+        """注册事件处理函数（界面线程中调用）
+
+        Args:
+            kind: 事件类型
+            handler: 处理函数，参数为事件数据
+        """
+        self._handlers[kind] = handler
+
+    def post(self, kind: str, payload: Any = None) -> None:
+        """放入一个事件，可在任意线程中调用
+
+        Args:
+            kind: 事件类型
+            payload: 事件数据
+        """
+        self._events.put((kind, payload))
+
+    def start(self) -> None:
+        """登记一个运行中的任务并开始轮询（界面线程中调用）"""
+        self._jobs += 1
+        if self._after_id is None:
+            self._schedule()
+
+    def finish(self) -> None:
+        """登记一个任务已结束，没有运行中的任务时在本轮处理完后停止轮询"""
+        self._jobs = max(0, self._jobs - 1)
+
+    def close(self) -> None:
+        """停止轮询并丢弃未处理的事件（窗口关闭时调用）"""
+        self._jobs = 0
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule(self) -> None:
+        """注册下一次轮询"""
+        try:
+            self._after_id = self.widget.after(self.interval_ms, self._poll)
+        except Exception:
+            # 控件已销毁
+            self._after_id = None
+
+    def _poll(self) -> None:
+        """after 回调：取出并分发所有已到达的事件"""
+        self._after_id = None
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            handler = self._handlers.get(kind)
+            if handler is None:
+                logger.warning("未注册的后台事件: %s", kind)
+                continue
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.exception("处理后台事件 %s 失败: %s", kind, e)
+        if self._jobs > 0:
+            self._schedule()
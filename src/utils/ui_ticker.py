@@ -0,0 +1,183 @@
+"""
+界面刷新模块 - 所有周期性界面刷新共用一个 Tk after 循环，窗口最小化时暂停
+"""
+
+from typing import Callable, List
+
+from src.utils.time_utils import get_clock
+from src.utils.log_manager import get_logger
+
+logger = get_logger(__name__)
+
+
+class TickSubscription:
+    """刷新订阅，调用 unsubscribe() 后不再回调"""
+
+    __slots__ = ("callback", "period", "align", "run_when_hidden", "next_due", "active", "_ticker")
+
+    def __init__(self, ticker: "UITicker", callback: Callable, period: float, align: bool, run_when_hidden: bool):
+        """初始化订阅
+
+        Args:
+            ticker: 所属刷新器
+            callback: 回调函数（无参数）
+            period: 刷新周期（秒）
+            align: 是否对齐到墙上时间的整周期（如时钟对齐到整秒）
+            run_when_hidden: 窗口最小化时是否继续刷新
+        """
+        self.callback = callback
+        self.period = period
+        self.align = align
+        self.run_when_hidden = run_when_hidden
+        self.next_due = 0.0
+        self.active = True
+        self._ticker = ticker
+
+    def unsubscribe(self) -> None:
+        """取消订阅（重复调用无副作用）"""
+        if self.active:
+            self.active = False
+            self._ticker._remove(self)
+
+
+class UITicker:
+    """界面刷新器类
+
+    订阅者按各自周期注册回调，刷新器只在最近的到期时间注册一个 after 回调；
+    主窗口最小化后只保留 run_when_hidden 的订阅，恢复显示时立即刷新一次。
+    """
+
+    def __init__(self, root, clock=None):
+        """初始化刷新器
+
+        Args:
+            root: Tk根窗口
+            clock: 时钟对象，默认使用 time_utils 中的当前时钟
+        """
+        self.root = root
+        self.clock = clock or get_clock()
+        self._subscriptions: List[TickSubscription] = []
+        self._after_id = None
+        self._after_due = None
+        self._hidden = False
+
+        # 通过映射事件判断主窗口是否最小化，add="+" 不覆盖已有绑定
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+
+    def subscribe(self, callback: Callable, period: float, align: bool = False,
+                  run_when_hidden: bool = False, immediate: bool = True) -> TickSubscription:
+        """注册周期性刷新
+
+        Args:
+            callback: 回调函数（无参数）
+            period: 刷新周期（秒）
+            align: 是否对齐到墙上时间的整周期
+            run_when_hidden: 窗口最小化时是否继续刷新
+            immediate: 是否立即执行一次回调
+
+        Returns:
+            TickSubscription: 订阅对象
+        """
+        subscription = TickSubscription(self, callback, max(0.05, float(period)), align, run_when_hidden)
+        self._subscriptions.append(subscription)
+        if immediate:
+            self._invoke(subscription)
+        self._set_next_due(subscription, self.clock.monotonic())
+        self._reschedule()
+        return subscription
+
+    @property
+    def hidden(self) -> bool:
+        """主窗口当前是否处于最小化（不可见）状态"""
+        return self._hidden
+
+    def stop(self) -> None:
+        """取消所有订阅并注销 after 回调"""
+        for subscription in self._subscriptions:
+            subscription.active = False
+        self._subscriptions.clear()
+        self._cancel_after()
+
+    def _remove(self, subscription: TickSubscription) -> None:
+        """移除订阅"""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        self._reschedule()
+
+    def _set_next_due(self, subscription: TickSubscription, now: float) -> None:
+        """计算订阅的下一次到期时间（单调时间）"""
+        if subscription.align:
+            # 对齐到墙上时间的下一个整周期，例如时钟在整秒时刷新
+            wall = self.clock.time()
+            delay = subscription.period - (wall % subscription.period)
+            subscription.next_due = now + delay
+        else:
+            subscription.next_due = now + subscription.period
+
+    def _visible_subscriptions(self) -> List[TickSubscription]:
+        """获取当前需要刷新的订阅"""
+        if not self._hidden:
+            return self._subscriptions
+        return [s for s in self._subscriptions if s.run_when_hidden]
+
+    def _cancel_after(self) -> None:
+        """注销当前的 after 回调"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+            self._after_due = None
+
+    def _reschedule(self) -> None:
+        """在最近的到期时间注册 after 回调，没有需要刷新的订阅时不注册"""
+        subscriptions = self._visible_subscriptions()
+        if not subscriptions:
+            self._cancel_after()
+            return
+        due = min(s.next_due for s in subscriptions)
+        if self._after_id is not None and self._after_due is not None and self._after_due <= due:
+            return
+        self._cancel_after()
+        self._after_due = due
+        self._after_id = self.root.after(int(max(0.0, due - self.clock.monotonic()) * 1000), self._tick)
+
+    def _tick(self) -> None:
+        """after 回调：执行所有到期的订阅"""
+        self._after_id = None
+        self._after_due = None
+        now = self.clock.monotonic()
+        # 复制列表，回调中可以安全地订阅或取消订阅
+        for subscription in list(self._visible_subscriptions()):
+            if subscription.active and subscription.next_due <= now + 0.001:
+                self._invoke(subscription)
+                self._set_next_due(subscription, now)
+        self._reschedule()
+
+    def _invoke(self, subscription: TickSubscription) -> None:
+        """调用订阅回调，捕获异常避免中断刷新循环"""
+        try:
+            subscription.callback()
+        except Exception as e:
+            logger.exception("界面刷新失败: %s", e)
+
+    def _on_unmap(self, event) -> None:
+        """主窗口最小化时暂停不需要后台刷新的订阅"""
+        if event.widget is not self.root:
+            return
+        self._hidden = True
+        self._reschedule()
+
+    def _on_map(self, event) -> None:
+        """主窗口恢复显示时立即刷新一次，再恢复正常周期"""
+        if event.widget is not self.root or not self._hidden:
+            return
+        self._hidden = False
+        now = self.clock.monotonic()
+        for subscription in list(self._subscriptions):
+            if subscription.active and not subscription.run_when_hidden:
+                self._invoke(subscription)
+                self._set_next_due(subscription, now)
+        self._reschedule()
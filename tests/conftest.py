@@ -0,0 +1,10 @@
+"""
+测试公共配置 - 把项目根目录加入导入路径，测试中可以直接 import src.xxx
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,140 @@
+"""
+记录库并发压力测试 - benchmarks/bench_concurrency.py 的确定性版本
+
+写线程和读线程各执行固定次数的操作（随机数种子固定），同一进程内共用一个 RecordStore，
+另一组用两个 RecordStore 实例打开同一个记录文件模拟两个进程。检查与基准测试相同的不变量：
+读到的快照 ID 严格递增且不重复，写入的记录 task_name 与 notes 始终相同，结束后重新加载的
+记录文件与内存一致，记录数等于 初始 + 添加 - 删除。
+"""
+
+import random
+import threading
+
+from src.core.records import RecordStore
+
+PREFIX = "stress:"
+INITIAL_RECORDS = 200
+WRITE_OPERATIONS = 60
+READ_OPERATIONS = 150
+SEARCHES = [{}, {"keyword": "base"}, {"keyword": PREFIX}]
+
+
+def check_snapshot(records):
+    """检查一次读到的记录，返回发现的问题"""
+    problems = []
+    last_id = 0
+    for record in records:
+        if record["id"] <= last_id:
+            problems.append(f"ID顺序错误: {last_id} -> {record['id']}")
+        last_id = record["id"]
+        if record["task_name"].startswith(PREFIX) and record["task_name"] != record["notes"]:
+            problems.append(f"记录 {record['id']} 不完整: {record['task_name']!r} / {record['notes']!r}")
+    return problems
+
+
+def writer(store, index, counts):
+    """添加、更新、删除自己写入的记录，更新时同时修改 task_name 和 notes"""
+    rng = random.Random(index)
+    own = []
+    for step in range(WRITE_OPERATIONS):
+        roll = rng.random()
+        if roll < 0.5 or not own:
+            token = f"{PREFIX}{index}-{step}"
+            own.append(store.add_record(token, "/tmp/liuhen_test/stress.png", token))
+            counts["add"] += 1
+        elif roll < 0.85:
+            token = f"{PREFIX}{index}-u{step}"
+            assert store.update_record(rng.choice(own), task_name=token, notes=token)
+            counts["update"] += 1
+        else:
+            deleted, _ = store.delete_record(own.pop(rng.randrange(len(own))))
+            assert deleted
+            counts["delete"] += 1
+
+
+def reader(store, index, problems):
+    """搜索并检查快照，再按ID读取其中一条"""
+    rng = random.Random(1000 + index)
+    for _ in range(READ_OPERATIONS):
+        records = store.search_records(**rng.choice(SEARCHES))
+        problems.extend(check_snapshot(records))
+        if records:
+            record = store.get_record_by_id(rng.choice(records)["id"])
+            if record is not None:
+                problems.extend(check_snapshot([record]))
+
+
+def run_stress(stores, writers_per_store, readers_per_store):
+    """在每个记录库实例上运行写线程和读线程，返回 (各类写操作次数, 问题列表, 异常列表)"""
+    counts = {"add": 0, "update": 0, "delete": 0}
+    problems, errors = [], []
+    counts_lock = threading.Lock()
+
+    def run_writer(store, index):
+        own_counts = {"add": 0, "update": 0, "delete": 0}
+        writer(store, index, own_counts)
+        with counts_lock:
+            for key, value in own_counts.items():
+                counts[key] += value
+
+    def guarded(target, *args):
+        try:
+            target(*args)
+        except Exception as e:  # 线程中的异常不会让测试失败，收集后统一检查
+            errors.append(f"{type(e).__name__}: {e}")
+
+    threads = []
+    for store_index, store in enumerate(stores):
+        for i in range(writers_per_store):
+            threads.append(threading.Thread(target=guarded, args=(run_writer, store, store_index * 100 + i)))
+        for i in range(readers_per_store):
+            threads.append(threading.Thread(target=guarded, args=(reader, store, store_index * 100 + i, problems)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=120)
+        assert not thread.is_alive(), "压力测试线程没有结束（可能死锁）"
+    return counts, problems, errors
+
+
+def make_store(tmp_path):
+    """创建含初始记录的记录文件，返回文件路径"""
+    db_file = str(tmp_path / "records.json")
+    store = RecordStore(db_file)
+    with store.batch():
+        for i in range(INITIAL_RECORDS):
+            store.add_record(f"base {i}", f"/tmp/liuhen_test/{i}.png", "")
+    return db_file
+
+
+def test_threads_sharing_one_store(tmp_path):
+    db_file = make_store(tmp_path)
+    store = RecordStore(db_file)
+
+    counts, problems, errors = run_stress([store], writers_per_store=4, readers_per_store=6)
+
+    assert errors == []
+    assert problems == []
+    assert counts["add"] + counts["update"] + counts["delete"] == 4 * WRITE_OPERATIONS
+    reloaded = RecordStore(db_file).get_all_records()
+    assert len(reloaded) == INITIAL_RECORDS + counts["add"] - counts["delete"]
+    assert reloaded == store.get_all_records()
+    assert check_snapshot(reloaded) == []
+
+
+def test_two_stores_on_one_file(tmp_path):
+    db_file = make_store(tmp_path)
+    stores = [RecordStore(db_file), RecordStore(db_file)]
+
+    counts, problems, errors = run_stress(stores, writers_per_store=2, readers_per_store=3)
+
+    assert errors == []
+    assert problems == []
+    reloaded = RecordStore(db_file).get_all_records()
+    assert len(reloaded) == INITIAL_RECORDS + counts["add"] - counts["delete"]
+    assert check_snapshot(reloaded) == []
+    # 另一个实例刷新后看到同样的记录，新记录的ID没有冲突
+    for store in stores:
+        store.refresh()
+        assert store.get_all_records() == reloaded
+    assert len({record["id"] for record in reloaded}) == len(reloaded)
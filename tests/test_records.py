@@ -0,0 +1,34 @@
+"""
+记录库事务测试
+"""
+
+import pytest
+
+from src.core.records import RecordStore
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    db_file = str(tmp_path / "records.json")
+    store = RecordStore(db_file)
+    kept = store.add_record("kept", "/tmp/liuhen_test/kept.png")
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.add_record("partial", "/tmp/liuhen_test/partial.png")
+            store.update_record(kept, task_name="changed")
+            raise RuntimeError("复制截图失败")
+
+    assert [r["task_name"] for r in store.get_all_records()] == ["kept"]
+    assert [r["task_name"] for r in RecordStore(db_file).get_all_records()] == ["kept"]
+    # 撤销后ID计数器也回到事务前，下一条记录的ID连续
+    assert store.add_record("next", "/tmp/liuhen_test/next.png") == kept + 1
+
+
+def test_successful_batch_writes_once(tmp_path):
+    db_file = str(tmp_path / "records.json")
+    store = RecordStore(db_file)
+    with store.batch():
+        first = store.add_record("a", "/tmp/liuhen_test/a.png")
+        store.add_record("b", "/tmp/liuhen_test/b.png")
+        store.delete_record(first)
+    assert [r["task_name"] for r in RecordStore(db_file).get_all_records()] == ["b"]
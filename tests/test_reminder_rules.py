@@ -0,0 +1,33 @@
+"""
+提醒规则测试 - interval 规则的时段边界
+"""
+
+import datetime
+
+from src.utils.reminder_rules import RULE_INTERVAL, ReminderRule
+
+MONDAY = datetime.date(2024, 3, 4)
+
+
+def at(hour, minute, day=MONDAY):
+    return datetime.datetime.combine(day, datetime.time(hour, minute))
+
+
+def test_interval_rule_fires_at_end_but_not_at_start():
+    rule = ReminderRule(kind=RULE_INTERVAL, interval_minutes=60, start="09:00", end="12:00")
+
+    # 开始时间本身不触发，第一次在一个间隔之后
+    assert rule.next_fire(at(8, 59)) == at(10, 0)
+    assert rule.next_fire(at(9, 0)) == at(10, 0)
+    # 间隔正好落在结束时间时触发
+    assert rule.next_fire(at(11, 0)) == at(12, 0)
+    # 结束时间之后到第二天
+    assert rule.next_fire(at(12, 0)) == at(10, 0, MONDAY + datetime.timedelta(days=1))
+
+
+def test_interval_rule_does_not_fire_after_end():
+    rule = ReminderRule(kind=RULE_INTERVAL, interval_minutes=25, start="09:00", end="10:00")
+
+    # 09:25、09:50 触发；10:15 超出时段
+    assert rule.next_fire(at(9, 30)) == at(9, 50)
+    assert rule.next_fire(at(9, 50)) == at(9, 25, MONDAY + datetime.timedelta(days=1))
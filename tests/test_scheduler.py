@@ -0,0 +1,192 @@
+"""
+定时调度器测试 - 用可注入的 FakeClock 驱动 TimerScheduler，不需要Tk和真实等待
+"""
+
+import datetime
+
+import pytest
+
+from src.utils.scheduler import (
+    CLOCK_JUMP_THRESHOLD, MAX_CATCH_UP_FIRES, MISSED_CATCH_UP, MISSED_FIRE_ONCE, MISSED_SKIP, TimerScheduler
+)
+from src.utils.time_utils import FakeClock, calculate_next_reminder_time, set_clock
+
+START = datetime.datetime(2024, 3, 4, 8, 0, 0)
+
+
+class FakeRoot:
+    """代替Tk根窗口，只记录调度器注册的 after 回调"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.callback = None
+        self.due = None
+
+    def after(self, delay_ms, callback):
+        self.callback = callback
+        self.due = self.clock.monotonic() + delay_ms / 1000.0
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        self.callback = None
+        self.due = None
+
+    def fire(self):
+        """执行已注册的 after 回调（休眠恢复后 Tk 会立即执行到期的回调）"""
+        callback, self.callback, self.due = self.callback, None, None
+        if callback is not None:
+            callback()
+
+    def run_for(self, seconds):
+        """时钟正常流逝指定秒数，期间到期的 after 回调依次执行"""
+        end = self.clock.monotonic() + seconds
+        while self.callback is not None and self.due <= end:
+            self.clock.advance(max(0.0, self.due - self.clock.monotonic()))
+            self.fire()
+        self.clock.advance(max(0.0, end - self.clock.monotonic()))
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock(START)
+    set_clock(fake)
+    yield fake
+    set_clock(None)
+
+
+@pytest.fixture
+def root(clock):
+    return FakeRoot(clock)
+
+
+def daily_at(hours, minutes):
+    """每天固定时间触发的 next_fire 函数"""
+    return lambda after: calculate_next_reminder_time(hours, minutes, after)
+
+
+def test_timers_fire_in_deadline_order(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    scheduler.call_later(30, fired.append, "later-30")
+    scheduler.call_at(START + datetime.timedelta(seconds=10), fired.append, "at-10")
+    scheduler.call_later(20, fired.append, "later-20-first")
+    scheduler.call_later(20, fired.append, "later-20-second")
+
+    assert scheduler.next_deadline() == clock.monotonic() + 10
+    root.run_for(25)
+    assert fired == ["at-10", "later-20-first", "later-20-second"]
+    root.run_for(10)
+    assert fired[-1] == "later-30"
+    assert scheduler.pending_count() == 0
+    assert root.callback is None
+
+
+def test_cancelled_timer_does_not_fire(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    handle = scheduler.call_later(10, fired.append, "cancelled")
+    scheduler.call_later(20, fired.append, "kept")
+    handle.cancel()
+
+    assert scheduler.pending_count() == 1
+    root.run_for(30)
+    assert fired == ["kept"]
+
+
+def test_wakes_at_most_every_max_sleep(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    scheduler.call_later(3600, lambda: None)
+    # 远期定时器也要定期唤醒检查时间跳变
+    assert root.due - clock.monotonic() <= 60
+
+
+@pytest.mark.parametrize("policy, expected", [
+    (MISSED_FIRE_ONCE, 1),
+    (MISSED_SKIP, 0),
+    (MISSED_CATCH_UP, 5),
+])
+def test_missed_interval_policies(clock, root, policy, expected):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    scheduler.call_every(60, fired.append, "tick", policy=policy)
+
+    # 界面线程被阻塞 5 分钟，after 回调直到现在才执行
+    clock.advance(300)
+    root.fire()
+    assert len(fired) == expected
+    # 错过的部分处理完后从当前时间起安排下一次
+    assert scheduler.next_deadline() == clock.monotonic() + 60
+
+
+def test_catch_up_is_capped(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    scheduler.call_every(60, fired.append, "tick", policy=MISSED_CATCH_UP)
+    clock.advance(3600)
+    root.fire()
+    assert len(fired) == MAX_CATCH_UP_FIRES
+
+
+def test_on_time_fire_ignores_policy(clock, root):
+    scheduler = TimerScheduler(root, clock, policy=MISSED_SKIP)
+    fired = []
+    scheduler.call_every(60, fired.append, "tick")
+    root.run_for(185)
+    assert len(fired) == 3
+
+
+@pytest.mark.parametrize("policy, expected", [
+    (MISSED_FIRE_ONCE, 1),
+    (MISSED_SKIP, 0),
+    (MISSED_CATCH_UP, 3),
+])
+def test_missed_calendar_policies_after_suspend(clock, root, policy, expected):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    handle = scheduler.call_recurring(daily_at(9, 0), fired.append, "daily", policy=policy)
+    assert handle.due_datetime == START.replace(hour=9)
+
+    # 休眠三天：墙上时间前进，单调时间不变；唤醒后 after 回调执行
+    clock.suspend(3 * 24 * 3600)
+    root.fire()
+    assert len(fired) == expected
+    assert handle.due_datetime == (START + datetime.timedelta(days=3)).replace(hour=9)
+
+
+def test_clock_jump_detection(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    assert scheduler.check_clock_jump() == 0.0
+
+    clock.advance(30)
+    clock.jump(CLOCK_JUMP_THRESHOLD - 1)
+    # 小于阈值的偏差视为正常误差
+    assert scheduler.check_clock_jump() == 0.0
+
+    clock.jump(3600)
+    assert scheduler.check_clock_jump() == pytest.approx(3600)
+    clock.jump(-7200)
+    assert scheduler.check_clock_jump() == pytest.approx(-7200)
+
+
+def test_clock_jump_reanchors_wall_timers_only(clock, root):
+    scheduler = TimerScheduler(root, clock)
+    fired = []
+    wall = scheduler.call_at(START + datetime.timedelta(hours=2), fired.append, "wall")
+    interval = scheduler.call_later(3 * 3600, fired.append, "interval")
+    mono = clock.monotonic()
+
+    # 手动把系统时间调快一小时：按墙上时间的定时器提前，按间隔的定时器不变
+    clock.jump(3600)
+    root.fire()
+    assert wall.deadline == pytest.approx(mono + 3600)
+    assert interval.deadline == pytest.approx(mono + 3 * 3600)
+    assert interval.when == pytest.approx(clock.time() + 3 * 3600)
+
+    root.run_for(3600)
+    assert fired == ["wall"]
+
+    # 调慢时间后按墙上时间的定时器相应推迟
+    later = scheduler.call_at(clock.now() + datetime.timedelta(hours=1), fired.append, "later")
+    clock.jump(-1800)
+    root.fire()
+    assert later.deadline == pytest.approx(clock.monotonic() + 5400)
@@ -0,0 +1,83 @@
+"""
+后台任务事件队列测试 - 工作线程只放入事件，界面线程的 after 轮询负责分发
+"""
+
+import threading
+
+from src.utils.ui_queue import UIEventQueue
+
+
+class FakeWidget:
+    """代替Tk控件，记录注册的 after 回调和调用线程"""
+
+    def __init__(self):
+        self.callback = None
+        self.threads = set()
+
+    def after(self, delay_ms, callback):
+        self.threads.add(threading.get_ident())
+        self.callback = callback
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        self.callback = None
+
+    def fire(self):
+        callback, self.callback = self.callback, None
+        if callback is not None:
+            callback()
+
+
+def test_worker_events_are_dispatched_on_polling_thread():
+    widget = FakeWidget()
+    events = UIEventQueue(widget)
+    seen = []
+    events.on("progress", lambda count: seen.append(("progress", count, threading.get_ident())))
+    events.on("done", lambda payload: (seen.append(("done", payload, threading.get_ident())), events.finish()))
+
+    events.start()
+
+    def work():
+        for count in range(3):
+            events.post("progress", count)
+        events.post("done", "ok")
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    worker.join()
+
+    # 工作线程不接触控件
+    assert widget.threads == {threading.get_ident()}
+    assert seen == []
+
+    widget.fire()
+    ui_thread = threading.get_ident()
+    assert seen == [
+        ("progress", 0, ui_thread), ("progress", 1, ui_thread), ("progress", 2, ui_thread), ("done", "ok", ui_thread)
+    ]
+    # 没有运行中的任务后停止轮询
+    assert widget.callback is None
+
+
+def test_polling_continues_until_every_job_finishes():
+    widget = FakeWidget()
+    events = UIEventQueue(widget)
+    events.on("done", lambda payload: events.finish())
+
+    events.start()
+    events.start()
+    events.post("done")
+    widget.fire()
+    assert widget.callback is not None
+
+    events.post("done")
+    widget.fire()
+    assert widget.callback is None
+
+
+def test_close_stops_polling():
+    widget = FakeWidget()
+    events = UIEventQueue(widget)
+    events.start()
+    events.close()
+    assert widget.callback is None